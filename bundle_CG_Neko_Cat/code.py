@@ -1,3 +1,5 @@
 import neko_code
 
-import cedargrove_touchcalibrator.featherwing
+# neko_code runs until reset. To calibrate a FeatherWing touchscreen, replace
+#   the import above with:
+# import cedargrove_touchcalibrator.featherwing
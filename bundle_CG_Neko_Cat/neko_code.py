@@ -5,32 +5,126 @@
 
 import gc
 import time
+from neko_helpers.boot_profiler import BootProfiler
+
+# Time each startup step; the report is printed once startup is complete
+boot = BootProfiler()
+
 import board
 import random
 import displayio
 import vectorio
 import neopixel
-import adafruit_imageload
-from neko_helpers.neko import NekoAnimatedSprite
-from cedargrove_rgb_spectrumtools.n_color import Spectrum
+# Helpers that only some configurations use (the herd engine, palette
+#   dimming, the animation tick, cat scaling and the frame profiler) are
+#   imported where their setting enables them; the background color table is
+#   imported by its deferred startup step after the first frame
+from neko_helpers.sprite_cache import SpriteSheetCache
+from neko_helpers.depth_order import DepthOrder
+from neko_helpers.render_controller import RenderController
+from neko_helpers.gc_scheduler import GcScheduler
+from neko_helpers.fade_engine import FadeEngine
+from neko_helpers.peripheral_output import BacklightOutput, PixelOutput
 from neko_configuration import Configuration as config
 import neko_helpers.cedargrove_display as cedargrove_display
 
+try:
+    # Light sleep between touch checks while the display is dark
+    import alarm
+except ImportError:
+    alarm = None
+boot.step("imports")
+
+
+def home_moving_to():
+    """The location HomeNeko (the first cat) is moving to, the head of its
+    waypoint path, or None."""
+    if herd is not None:
+        return herd.moving_to(0)
+    return nekos[0].moving_to
+
+
+def home_path_changes():
+    """HomeNeko's path change count; see `NekoAnimatedSprite.path_changes`."""
+    if herd is not None:
+        return herd.path_changes(0)
+    return nekos[0].path_changes
+
+
+def next_animation_time():
+    """The monotonic time of the next cat animation frame, or None."""
+    if herd is not None:
+        return herd.next_animation_time()
+    _next = None
+    for i in range(len(nekos)):
+        if _next is None or nekos[i].next_animation_time < _next:
+            _next = nekos[i].next_animation_time
+    return _next
+
+
+def dormant_nap(seconds):
+    """Sleep for a while using the lowest power mode available."""
+    if alarm:
+        try:
+            alarm.light_sleep_until_alarms(
+                alarm.time.TimeAlarm(monotonic_time=time.monotonic() + seconds)
+            )
+            return
+        except (NotImplementedError, ValueError):
+            pass
+    time.sleep(seconds)
+
+
 # Instantiate the display and touchscreen
 display = cedargrove_display.Display(
     name=config.DISPLAY_NAME,
     rotation=config.ROTATION,
     calibration=config.CALIBRATION,
     brightness=config.DISPLAY_BRIGHTNESS,
+    use_built_in=config.USE_BUILT_IN_DISPLAY,
+)
+boot.step("display")
+
+# Refresh the display only when something on it changes
+render = RenderController(display, max_fps=config.REFRESH_MAX_FPS)
+
+# Collect garbage when memory is low or when there is time to spare
+gc_scheduler = GcScheduler(
+    watermark=config.GC_FREE_WATERMARK,
+    idle_slack=config.GC_IDLE_SLACK,
+    interval=config.GC_IDLE_INTERVAL,
 )
-ts = display.ts
 
-# Instantiate the neopixel; set the background color and relative brightness
+# Time each phase of the main loop (debug only)
+PHASE_GC, PHASE_UPDATE, PHASE_SORT, PHASE_TOUCH, PHASE_SCREENSAVER, PHASE_REFRESH = range(6)
+profiler = None
+if config.PROFILE_FRAMES:
+    from neko_helpers.frame_profiler import FrameProfiler
+
+    profiler = FrameProfiler(
+        ("gc", "update", "sort", "touch", "saver", "refresh"),
+        depth=config.PROFILE_DEPTH,
+        report_interval=config.PROFILE_REPORT_INTERVAL,
+    )
+
+# Instantiate the neopixel; set the background color and relative brightness.
+#   NeoPixel and backlight writes are coalesced and flushed once per main loop
+#   iteration, only when the value changed and at most OUTPUT_MAX_RATE times
+#   a second
 neo = neopixel.NeoPixel(board.NEOPIXEL, 1)
-neo[0] = display.color_brightness(config.DISPLAY_BRIGHTNESS / 8, config.BKG_SPECTRUM[0])
+pixel_output = PixelOutput(neo, max_rate=config.OUTPUT_MAX_RATE)
+pixel_output.value = display.color_brightness(config.DISPLAY_BRIGHTNESS / 8, config.BKG_SPECTRUM[0])
+pixel_output.flush()
+backlight_output = BacklightOutput(display, max_rate=config.OUTPUT_MAX_RATE)
+
+# Panels without backlight control are dimmed by scaling the cat, background
+#   and laser dot palettes; each palette is added to the dimmer once its
+#   colors are set
+dimmer = None
+if config.SOFTWARE_DIMMING or not display.brightness_adjustable:
+    from neko_helpers.palette_dimmer import PaletteDimmer
 
-# Instantiate the background color spectrum
-spectrum = Spectrum(config.BKG_SPECTRUM, mode="continuous", gamma=0.5)
+    dimmer = PaletteDimmer(levels=config.SOFTWARE_DIM_LEVELS)
 
 # Variable to store the timestamp of previous touch event
 LAST_TOUCH_TIME = -1
@@ -46,11 +140,13 @@ background_group = displayio.Group(scale=max(display.width, display.height) // 2
 # Create bitmap to hold solid color background
 background_bitmap = displayio.Bitmap(20, 15, 1)
 
-# Create background palette
+# Create background palette with the first spectrum color; the spectrum color
+#   table is built after the first frame (see build_background)
 background_palette = displayio.Palette(1)
-
-# Set the background color into the palette
 background_palette[0] = config.BKG_SPECTRUM[0]
+background = None
+if dimmer:
+    dimmer.add(background_palette)
 
 # Create a tilegrid to show the background bitmap
 background_tilegrid = displayio.TileGrid(
@@ -62,53 +158,169 @@ background_group.append(background_tilegrid)
 
 # Add background_group to main_group
 main_group.append(background_group)
+boot.step("background")
 
-gc.collect()
+# The source of every random choice made by the cats and the main loop;
+#   seeding it repeats the same session
+rng = random
+if config.RANDOM_SEED is not None:
+    rng.seed(config.RANDOM_SEED)
 
-# Create a herd of cats (maximum of 6)
+# Create a herd of cats (maximum of 6, or HERD_MAX_QUANTITY with the herd engine)
 nekos = []
 nekos_paletts = []
-config.CAT_QUANTITY = min(max(0, config.CAT_QUANTITY), 6)
-for i in range(config.CAT_QUANTITY):
-    # Load the sprite sheet bitmap and palette
-    sprite_sheet, _ = adafruit_imageload.load(
-        "/neko_helpers/neko_cat_spritesheet.bmp",
-        bitmap=displayio.Bitmap,
-        palette=displayio.Palette,
+herd = None
+if config.USE_HERD_ENGINE:
+    config.CAT_QUANTITY = min(max(0, config.CAT_QUANTITY), config.HERD_MAX_QUANTITY)
+else:
+    config.CAT_QUANTITY = min(max(0, config.CAT_QUANTITY), 6)
+
+# Optionally animate every cat on a shared tick so that the sprite changes due
+#   in a tick are pushed in one display refresh
+tick = None
+if config.USE_ANIMATION_TICK:
+    from neko_helpers.animation_tick import AnimationTick
+
+    tick = AnimationTick(config.ANIMATION_TICK_TIME)
+
+# The sprite sheet bitmap is decoded once and shared by every cat
+SPRITE_SHEET = config.SPRITE_SHEET
+sprite_cache = SpriteSheetCache()
+sprite_sheet = None
+
+# Cats are drawn CAT_SCALE times larger either from a sprite sheet enlarged
+#   once (SHEET_SCALE) or by scaling the cat group (GROUP_SCALE); see
+#   cat_scale.choose. Cat locations are in cat group units.
+SHEET_SCALE = GROUP_SCALE = 1
+if config.CAT_SCALE > 1:
+    from neko_helpers import cat_scale
+
+    # preload the sheet to measure it; its reference is only released when
+    #   an enlarged sheet, which keeps its own preload reference, replaces it
+    sprite_cache.preload(SPRITE_SHEET)
+    if cat_scale.choose(
+        config.CAT_SCALE,
+        sprite_cache.bytes_held,
+        gc.mem_free(),
+        config.GC_FREE_WATERMARK + config.CAT_SCALE_HEADROOM,
+        config.CAT_SCALE_MODE,
+    ) == cat_scale.SHEET:
+        SHEET_SCALE = config.CAT_SCALE
+        sprite_cache.preload(SPRITE_SHEET, SHEET_SCALE)
+        sprite_cache.release(SPRITE_SHEET, preload=True)
+    else:
+        GROUP_SCALE = config.CAT_SCALE
+        cat_group.scale = GROUP_SCALE
+    print(f"* Cat scale {config.CAT_SCALE} by {'sprite sheet' if SHEET_SCALE > 1 else 'group'}")
+CAT_AREA = (display.width // GROUP_SCALE, display.height // GROUP_SCALE)
+
+if config.USE_HERD_ENGINE:
+    from neko_helpers.neko_herd import NekoHerd
+
+    # Animate the whole herd in one pass using lightweight TileGrids
+    herd = NekoHerd(
+        config.CAT_QUANTITY,
+        CAT_AREA,
+        behaviors=(NekoHerd.AVOID if config.HERD_AVOID else 0)
+        | (NekoHerd.FOLLOW if config.HERD_FOLLOW else 0)
+        | (NekoHerd.GATHER if config.HERD_GATHER else 0),
+        rng=rng,
+        scale=SHEET_SCALE,
     )
-    # Create a unique palette for each cat
-    nekos_paletts.append(_)
+    depth_order = DepthOrder(cat_group, key=herd.sort_key)
+else:
+    from neko_helpers.neko import NekoAnimatedSprite
+
+    # Keep the cat group ordered by sort_key (y coordinate and color)
+    depth_order = DepthOrder(cat_group)
+
+
+def add_cat(i):
+    """Add cat number i to the herd in the middle of the display."""
+    global sprite_sheet
+    if config.USE_HERD_ENGINE:
+        color = config.CAT_COLORS[i % len(config.CAT_COLORS)]
+        if i < len(config.CAT_COLORS):
+            # Get the shared sprite sheet bitmap and a palette for each cat color;
+            #   larger herds reuse the color palettes
+            sprite_sheet, palette = sprite_cache.acquire(SPRITE_SHEET, SHEET_SCALE)
+            palette[5] = color
+            # Set dimmed outline color based on inverted fill color
+            palette[1] = display.color_brightness(0.6, color ^ 0xFFFFFF)
+            palette.make_transparent(0)
+            nekos_paletts.append(palette)
+            if dimmer:
+                dimmer.add(palette)
+        cat = displayio.TileGrid(
+            sprite_sheet,
+            pixel_shader=nekos_paletts[i % len(nekos_paletts)],
+            width=1,
+            height=1,
+            tile_width=herd.TILE_WIDTH,
+            tile_height=herd.TILE_HEIGHT,
+        )
+        cat.x = CAT_AREA[0] // 2 - herd.TILE_WIDTH // 2
+        cat.y = CAT_AREA[1] // 2 - herd.TILE_HEIGHT // 2
+        # Slightly randomize animation time
+        animation_time = config.ANIMATION_TIME + (rng.randrange(-15, 15) / 100)
+        if tick:
+            animation_time = tick.animation_time(animation_time)
+        herd.add(cat, animation_time=animation_time, fill=color)
+        # Insert the cat into the group in depth order
+        depth_order.add(cat)
+        return
+
+    # Get the shared sprite sheet bitmap and a unique palette for each cat
+    sprite_sheet, palette = sprite_cache.acquire(SPRITE_SHEET, SHEET_SCALE)
+    nekos_paletts.append(palette)
     color = config.CAT_COLORS[i]
     # Set dimmed outline color based on inverted fill color
     outline = display.color_brightness(0.6, color ^ 0xFFFFFF)
     # Instantiate Neko sprite class for each cat and slighly randomize animation time
-    animation_time = config.ANIMATION_TIME + (random.randrange(-15, 15) / 100)
+    animation_time = config.ANIMATION_TIME + (rng.randrange(-15, 15) / 100)
+    if tick:
+        animation_time = tick.animation_time(animation_time)
     nekos.append(NekoAnimatedSprite(
-        animation_time=animation_time, display_size=(display.width, display.height),
+        animation_time=animation_time, display_size=CAT_AREA,
         fill=color,
         outline=outline,
         sprites=sprite_sheet,
-        palette=nekos_paletts[i],
+        palette=palette,
+        rng=rng,
+        scale=SHEET_SCALE,
     ))
-    nekos[i].x = display.width // 2 - nekos[i].TILE_WIDTH // 2
-    nekos[i].y = display.height // 2 - nekos[i].TILE_HEIGHT // 2
-    cat_group.append(nekos[i])
-
-# Sort the group based on sort_key (y coordinate and color)
-cat_group.sort(key=lambda cat: cat.sort_key)
-# Add the cat group
-main_group.append(cat_group)
+    if dimmer:
+        dimmer.add(palette)
+    nekos[i].x = CAT_AREA[0] // 2 - nekos[i].TILE_WIDTH // 2
+    nekos[i].y = CAT_AREA[1] // 2 - nekos[i].TILE_HEIGHT // 2
+    # Insert the cat into the group in depth order
+    depth_order.add(nekos[i])
+
+
+def build_background(_):
+    """Sample the background color spectrum into a table for the cross-fades."""
+    global background
+    from neko_helpers.background_colors import BackgroundColors
+
+    background = BackgroundColors(
+        background_palette,
+        config.BKG_SPECTRUM,
+        size=config.BKG_TABLE_SIZE,
+        step_time=config.BKG_FADE_STEP_TIME,
+    )
+    if dimmer:
+        dimmer.recolor(background_palette, 0, background.color)
 
-# Darken the display and NeoPixel then show the main_group
-display.brightness = 0
-neo[0] = display.color_brightness(display.brightness / 5, background_palette[0])
-display.show(main_group)
 
-if config.USE_TOUCH_OVERLAY:
+def add_laser_dot(_):
+    """Create the laser dot that HomeNeko chases."""
+    global circle
     # initialize laser palette
     laser_dot_palette = displayio.Palette(1)
     # set the hex color code for the laser dot
     laser_dot_palette[0] = config.LASER_DOT_COLOR
+    if dimmer:
+        dimmer.add(laser_dot_palette)
 
     # create a circle to be the laser dot
     circle = vectorio.Circle(
@@ -121,35 +333,138 @@ if config.USE_TOUCH_OVERLAY:
     # add it to the main_group so it gets shown on the display when ready
     main_group.append(circle)
 
-gc.collect()
-print(f"free memory {gc.mem_free()/1000} kb")
+
+# Show HomeNeko first; the rest of the herd joins after the first frame
+if config.CAT_QUANTITY:
+    add_cat(0)
+main_group.append(cat_group)
+boot.step("first cat")
+
+# Darken the display and NeoPixel then show the main_group; the screensaver
+#   fades both together over SCREENSAVER_FADE_TIME seconds
+fade = FadeEngine(
+    backlight_output,
+    pixel_output,
+    max_brightness=config.DISPLAY_BRIGHTNESS,
+    fade_time=config.SCREENSAVER_FADE_TIME,
+    steps=config.SCREENSAVER_FADE_STEPS,
+    dimmer=dimmer,
+)
+fade.color = config.BKG_SPECTRUM[0]
+backlight_output.flush(force=True)
+pixel_output.flush(force=True)
+display.show(main_group)
+render.mark_dirty()
+render.refresh()
+boot.first_frame()
+boot.step("show")
+
+# HomeNeko's path change count when the laser dot was last placed
+_laser_path_changes = -1
+
+# Startup steps that wait until the first frame is on the display; one runs
+#   per main loop iteration while the display fades in: (name, function, argument)
+circle = None
+_deferred = [("cats", add_cat, i) for i in range(1, config.CAT_QUANTITY)]
+if config.USE_TOUCH_OVERLAY:
+    _deferred.append(("laser dot", add_laser_dot, None))
+_deferred.append(("spectrum", build_background, None))
 
 _screensaver_start_time = time.monotonic()
 _screensaver_state = "RESTORE"
+# The dim level on the display when the palettes are dimmed
+_shown_dim_level = dimmer.level if dimmer else None
 
 while True:
-    gc.collect()
-    # update Nekos to do animations and movements
-    for i in range(config.CAT_QUANTITY):
-        nekos[i].update()
-
-    # Bring lowest cats to the front; sort by y coordinate + color
-    cat_group.sort(key=lambda cat: cat.sort_key)
+    if _deferred:
+        _name, _function, _argument = _deferred.pop(0)
+        boot.start()
+        _function(_argument)
+        boot.step(_name)
+        if not _deferred:
+            gc.collect()
+            boot.step("collect")
+            print(f"sprite cache {sprite_cache.bytes_held/1000} kb, saved {sprite_cache.bytes_saved/1000} kb")
+            boot.report()
+
+    if _screensaver_state == "DIMMED":
+        # The display is dark; stop animating and doze until the wake time or a touch
+        if dimmer and render.dirty:
+            # the darkest palette level is still waiting for its refresh
+            display.refresh()
+        # and the dark backlight and NeoPixel values for their writes
+        backlight_output.flush(force=True)
+        pixel_output.flush(force=True)
+        _dormant_start = time.monotonic()
+        _wake_time = _screensaver_start_time + config.DISPLAY_ACTIVE_TIME + config.DISPLAY_SLEEP_TIME
+        while time.monotonic() < _wake_time:
+            dormant_nap(min(config.DORMANT_POLL_TIME, max(_wake_time - time.monotonic(), 0)))
+            if config.USE_TOUCH_OVERLAY and display.touch_event():
+                break
+
+        # Catch up on the time the herd spent in the dark in a single step
+        _dormant_time = time.monotonic() - _dormant_start
+        if herd is not None:
+            herd.fast_forward(_dormant_time, depth_order.moved)
+        for i in range(len(nekos)):
+            nekos[i].fast_forward(_dormant_time)
+            depth_order.moved(nekos[i])
+        render.mark_dirty()
+        _screensaver_state = "RESTORE"
 
-    if config.USE_TOUCH_OVERLAY:
-        # If HomeNeko (nekos[0]) is not moving to a location
-        if not nekos[0].moving_to:
-            # Hide the laser dot circle by moving it off of the display
-            circle.x = -10
-            circle.y = -10
+    if profiler:
+        profiler.start()
+
+    gc_scheduler.service(next_animation_time)
+    if profiler:
+        profiler.mark(PHASE_GC)
+
+    # update Nekos to do animations and movements; with the animation tick
+    #   every cat sees the time of the latest tick
+    _tick_time = tick.now() if tick else None
+    if herd is not None and herd.update(depth_order.moved, _tick_time):
+        render.mark_dirty()
+    for i in range(len(nekos)):
+        if nekos[i].update(_tick_time):
+            depth_order.moved(nekos[i])
+            render.mark_dirty()
+    if profiler:
+        profiler.mark(PHASE_UPDATE)
+
+    # Bring lowest cats that moved to the front; ordered by y coordinate + color
+    depth_order.restore()
+    if profiler:
+        profiler.mark(PHASE_SORT)
+
+    if config.USE_TOUCH_OVERLAY and circle:
+        # Keep the laser dot on the location HomeNeko (nekos[0]) is heading
+        #   for; the path is only read again after its head changes
+        if home_path_changes() != _laser_path_changes:
+            _laser_path_changes = home_path_changes()
+            _laser_location = home_moving_to()
+            if _laser_location is None:
+                if circle.x != -10:
+                    # Hide the laser dot circle by moving it off of the display
+                    circle.x = -10
+                    circle.y = -10
+                    render.mark_dirty()
+            elif (
+                circle.x != _laser_location[0] * GROUP_SCALE
+                or circle.y != _laser_location[1] * GROUP_SCALE
+            ):
+                # the laser dot is drawn outside of the scaled cat group
+                circle.x = _laser_location[0] * GROUP_SCALE
+                circle.y = _laser_location[1] * GROUP_SCALE
+                render.mark_dirty()
 
         _now = time.monotonic()
 
         # If the touch cooldown has elapsed since previous touch event
         if _now > LAST_TOUCH_TIME + config.TOUCH_COOLDOWN:
 
-            # Read current touch data from overlay
-            touch_location = ts.touch_point
+            # Read the latest touch event; queued samples are drained and
+            #   filtered only when the overlay has recorded a touch
+            touch_location = display.touch_event()
 
             # If anything is being touched
             if touch_location:
@@ -157,46 +472,77 @@ while True:
                     # Restore screen brightness if touched if dimming or dimmed
                     _screensaver_state = "RESTORE"
                 else:
+                    # A touch soon after the previous one continues a drag;
+                    #   otherwise it starts a new path
+                    _dragging = _now - LAST_TOUCH_TIME <= config.TOUCH_DRAG_TIME
+
                     # update the timestamp for touch cooldown enforcement
                     #   and reset the screensaver timer
                     LAST_TOUCH_TIME = _screensaver_start_time = _now
 
-                    # move the laser dot circle to the x/y coordinates being touched
-                    circle.x = touch_location[0]
-                    circle.y = touch_location[1]
-
-                    # print("placing laser dot at: {}".format(touch_location))
-
-                    # Tell Neko to move to the x/y coordinates being touched
-                    nekos[0].moving_to = (touch_location[0], touch_location[1])
+                    # Tell Neko to move to the x/y coordinates being touched, in
+                    #   cat group units; the laser dot follows the head of
+                    #   Neko's path
+                    _touch_x = touch_location[0] // GROUP_SCALE
+                    _touch_y = touch_location[1] // GROUP_SCALE
+                    if herd is not None:
+                        if not _dragging:
+                            herd.clear_path(0)
+                        herd.add_waypoint(0, _touch_x, _touch_y)
+                        # and the cats near the laser dot gather around it
+                        herd.gather((_touch_x, _touch_y), config.HERD_GATHER_RADIUS // GROUP_SCALE)
+                    else:
+                        if not _dragging:
+                            nekos[0].clear_path()
+                        nekos[0].add_waypoint(_touch_x, _touch_y)
+    if profiler:
+        profiler.mark(PHASE_TOUCH)
 
     # Check the screensaver timer to see if it's time to dim display brightness
     if _screensaver_state == "ACTIVE" and time.monotonic() - _screensaver_start_time >= config.DISPLAY_ACTIVE_TIME:
         _screensaver_state = "DIM"
-    # Check the screensaver timer to see if the display brightness should be restored
-    if _screensaver_state == "DIMMED" and time.monotonic() - _screensaver_start_time >= config.DISPLAY_ACTIVE_TIME + config.DISPLAY_SLEEP_TIME:
-        _screensaver_state = "RESTORE"
 
     # Gradually reduce display brightness while animating
     if _screensaver_state == "DIM":
-        _new_brightness = max(display.brightness - 0.01, 0)
-        display.brightness = _new_brightness
-        neo[0] = display.color_brightness(_new_brightness / 5, background_palette[0])
+        fade.fade_to(0)
         # When the target brightness is reached, set the state to DIMMED
-        if display.brightness == 0:
+        if not fade.update():
             _screensaver_state = "DIMMED"
-            # Change the background color randomly each time display is DIMMED
-            background_palette[0] = spectrum.color(random.randrange(0, 100)/100)
+            print(
+                f"gc: {gc_scheduler.collections} collections ({gc_scheduler.forced} forced), "
+                + f"pause mean {gc_scheduler.mean_pause * 1000:.1f} ms, max {gc_scheduler.max_pause * 1000:.1f} ms"
+            )
+            # Cross-fade to a random background color each time display is DIMMED
+            if background:
+                background.pick(rng.randrange(0, 100)/100)
 
     # Gradually increase display brightness while animating
     if _screensaver_state == "RESTORE":
-        _new_brightness = min(display.brightness + 0.01, config.DISPLAY_BRIGHTNESS)
-        display.brightness = _new_brightness
-        neo[0] = display.color_brightness(_new_brightness / 5, background_palette[0])
+        fade.fade_to(1)
         # When the target brightness is reached, set the state to ACTIVE
-        if display.brightness == config.DISPLAY_BRIGHTNESS:
+        if not fade.update():
             _screensaver_start_time = time.monotonic()
             _screensaver_state = "ACTIVE"
 
-    # Print the display frame refresh rate (debug only)
-    #print(f"frame: {time.monotonic() - _now} sec")
+    # Step the background color cross-fade
+    if background and background.update():
+        fade.color = background.color
+        if dimmer:
+            # show the new background color at the current dim level
+            dimmer.recolor(background_palette, 0, background.color)
+        render.mark_dirty()
+    # A new dim level changed the palettes; show them
+    if dimmer and dimmer.level != _shown_dim_level:
+        _shown_dim_level = dimmer.level
+        render.mark_dirty()
+    # Write the latest backlight and NeoPixel values if they changed
+    backlight_output.flush()
+    pixel_output.flush()
+    if profiler:
+        profiler.mark(PHASE_SCREENSAVER)
+
+    # Push everything that changed this iteration to the display in one refresh
+    render.refresh()
+    if profiler:
+        profiler.mark(PHASE_REFRESH)
+        profiler.end()
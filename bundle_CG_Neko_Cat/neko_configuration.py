@@ -8,9 +8,24 @@ class Configuration:
     # specify display and touchscreen device using some unique characters
     #   from the display name
 
-    # Number of on-screen cats; maximum of 6
+    # Number of on-screen cats; 0 to 6 as individual sprites, or 0 to
+    #   HERD_MAX_QUANTITY with USE_HERD_ENGINE. Values outside the limit for
+    #   the engine in use are clamped.
     CAT_QUANTITY = 6
 
+    # Animate the cats with the NekoHerd engine rather than individual sprites;
+    #   permits up to HERD_MAX_QUANTITY cats. Cat colors repeat for large herds.
+    USE_HERD_ENGINE = False
+    HERD_MAX_QUANTITY = 100
+
+    # Herd engine behaviors: walking cats turn away from cats in their path
+    #   and sometimes follow a nearby walking cat; cats within
+    #   HERD_GATHER_RADIUS pixels of the laser dot gather at it
+    HERD_AVOID = True
+    HERD_FOLLOW = True
+    HERD_GATHER = True
+    HERD_GATHER_RADIUS = 96
+
     # Cat color table; use hex notation
     #   color reference: https://en.wikipedia.org/wiki/Web_colors
     CAT_COLORS = [
@@ -23,6 +38,17 @@ class Configuration:
         0xF000A0,  # purple
         ]
 
+    # Cat sprite sheet; the .raw sheet made from the .bmp by
+    #   tools/convert_sprite_sheet.py loads much faster at startup
+    SPRITE_SHEET = "/neko_helpers/neko_cat_spritesheet.raw"
+
+    # How a CAT_SCALE above 1 (see the display settings below) is drawn:
+    #   "sheet" enlarges the sprite sheet once at startup, "group" scales the
+    #   cat group, and "auto" enlarges the sheet only if at least
+    #   GC_FREE_WATERMARK + CAT_SCALE_HEADROOM bytes stay free
+    CAT_SCALE_MODE = "auto"
+    CAT_SCALE_HEADROOM = 16000
+
     # Laser dot color; use hex notation
     LASER_DOT_COLOR = 0xFF0000
 
@@ -34,35 +60,114 @@ class Configuration:
         0xDA70D6,  # Orchid
     ]
 
+    # Number of background colors sampled from BKG_SPECTRUM and the time
+    #   between background cross-fade steps (seconds)
+    BKG_TABLE_SIZE = 48
+    BKG_FADE_STEP_TIME = 0.5
+
     # How long to wait between animation frames (seconds)
     ANIMATION_TIME = 0.3
 
+    # Seed for the cats' random choices, the animation time jitter and the
+    #   background colors so that a session can be repeated; None to leave
+    #   the random number generator unseeded
+    RANDOM_SEED = None
+
+    # Animate every cat on a shared tick (seconds) so that all of the sprite
+    #   changes in a tick are pushed in one display refresh; each cat's
+    #   animation time is rounded to a whole number of ticks
+    USE_ANIMATION_TICK = False
+    ANIMATION_TICK_TIME = 0.1
+
+    # Display refresh upper limit (frames per second); refreshes are only
+    #   pushed when something on the display changed
+    REFRESH_MAX_FPS = 30
+
     # How long before the display sleeps (seconds)
     DISPLAY_ACTIVE_TIME = 10 * 60  # ten minutes
 
     # How long before the automatically reawakens (seconds)
     DISPLAY_SLEEP_TIME = 20 * 60  # twenty minutes
 
+    # How long the screensaver takes to fade the display fully out or in
+    #   (seconds) and the number of brightness levels in the fade
+    SCREENSAVER_FADE_TIME = 2.0
+    SCREENSAVER_FADE_STEPS = 64
+
+    # Dim levels cached for each palette when the screensaver dims the
+    #   palettes instead of the backlight (see SOFTWARE_DIMMING below)
+    SOFTWARE_DIM_LEVELS = 16
+
+    # Most NeoPixel and backlight writes per second; a write is only made when
+    #   the value changes (0 for no limit)
+    OUTPUT_MAX_RATE = 30
+
+    # How often to check for a touch while the display is asleep (seconds)
+    DORMANT_POLL_TIME = 0.25
+
+    # Minimum time between garbage collections made during idle time (seconds);
+    #   see GC_FREE_WATERMARK and GC_IDLE_SLACK in the display settings below
+    GC_IDLE_INTERVAL = 1.0
+
+    # Print per-phase main loop timing to the serial console (debug only);
+    #   PROFILE_DEPTH loop iterations are summarized every
+    #   PROFILE_REPORT_INTERVAL seconds
+    PROFILE_FRAMES = False
+    PROFILE_DEPTH = 64
+    PROFILE_REPORT_INTERVAL = 10
+
+    # A board with its own resistive touch display (board.DISPLAY and
+    #   board.TOUCH_XL), such as the PyPortal, uses it whatever DISPLAY_NAME
+    #   selects below; set False to drive the DISPLAY_NAME FeatherWing from
+    #   such a board instead
+    USE_BUILT_IN_DISPLAY = True
+
     """# built-in display
     DISPLAY_NAME = "built-in"
     CALIBRATION = ((5200, 59000), (5800, 57000))
     ROTATION = 0
-    DISPLAY_BRIGHTNESS = 1.0"""
+    DISPLAY_BRIGHTNESS = 1.0
+    # Palettes are dimmed automatically if the backlight isn't adjustable
+    SOFTWARE_DIMMING = False
+    CAT_SCALE = 1
+    GC_FREE_WATERMARK = 24000
+    GC_IDLE_SLACK = 0.010"""
 
     # TFT FeatherWing - 2.4" 320x240 Touchscreen
     DISPLAY_NAME = "2.4-inch"
     CALIBRATION = ((406, 3607), (412, 3711))
     ROTATION = 180
     DISPLAY_BRIGHTNESS = 1.0
+    # Dim the palettes instead of the backlight; use when D4 isn't connected
+    #   to the Wing's LITE pad
+    SOFTWARE_DIMMING = False
+    # Cat size in multiples of the 32x32 sprite sheet tiles
+    CAT_SCALE = 1
+    # Collect when free memory drops below this many bytes or when the next
+    #   animation frame is at least GC_IDLE_SLACK seconds away
+    GC_FREE_WATERMARK = 24000
+    GC_IDLE_SLACK = 0.010
 
     """# TFT FeatherWing - 3.5" 480x320 Touchscreen
     DISPLAY_NAME = "3.5-inch"
     CALIBRATION = ((214, 3879), (421, 3775))
     ROTATION = 0
-    DISPLAY_BRIGHTNESS = 1.0"""
+    DISPLAY_BRIGHTNESS = 1.0
+    # Dim the palettes instead of the backlight; use when D4 isn't connected
+    #   to the Wing's Lite pad
+    SOFTWARE_DIMMING = False
+    # Cat size in multiples of the 32x32 sprite sheet tiles
+    CAT_SCALE = 2
+    # The larger panel takes about twice as long to refresh; keep more headroom
+    GC_FREE_WATERMARK = 32000
+    GC_IDLE_SLACK = 0.020"""
 
     # Whether to use a touch overlay
     USE_TOUCH_OVERLAY = True
 
     # How long to wait for next valid touch event in seconds
     TOUCH_COOLDOWN = 0.1
+
+    # Touches less than this many seconds apart are a drag; HomeNeko follows
+    #   the dragged path through its waypoints
+    TOUCH_DRAG_TIME = 0.3
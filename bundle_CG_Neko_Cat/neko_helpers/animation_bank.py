@@ -0,0 +1,71 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# animation_bank.py  2023-01-11 1.0.0 Cedar Grove Studios
+
+"""Load an animation bank made by `tools/compile_animations.py`. Each state's
+animation is a run of (sprite, hold) entries: the sprite index shown and the
+number of animation frames it is held for, so a pose held for several frames
+is one entry rather than a repeated sprite index."""
+
+from array import array
+
+MAGIC = b"CGAB"
+VERSION = 1
+# magic, version, state count, entry count (little-endian)
+_HEADER_SIZE = 8
+
+
+class AnimationBank:
+    """The AnimationBank class holds the animations of every state in one
+    buffer read from a bank file. Entries are stored as two byte runs, the
+    sprite indexes and the hold counts, that are indexed directly.
+
+    :param bytearray data: The contents of a bank file."""
+
+    def __init__(self, data):
+        if data[0:4] != MAGIC or data[4] != VERSION:
+            raise ValueError("not an animation bank")
+        _states = data[5]
+        _entries = data[6] | data[7] << 8
+        if len(data) < _HEADER_SIZE + _states + 2 * _entries:
+            raise ValueError("animation bank is truncated")
+
+        self._data = data
+        _view = memoryview(data)
+        # entry count of each state, indexed by state ID
+        self.entry_count = _view[_HEADER_SIZE:_HEADER_SIZE + _states]
+        # sprite index and hold count of every entry, state after state
+        _start = _HEADER_SIZE + _states
+        self.sprite = _view[_start:_start + _entries]
+        self.hold = _view[_start + _entries:_start + 2 * _entries]
+
+        # first entry of each state
+        self.entry_start = array("H", [0] * _states)
+        _first = 0
+        for _state in range(_states):
+            self.entry_start[_state] = _first
+            _first += self.entry_count[_state]
+
+    @property
+    def state_count(self):
+        """The number of states in the bank."""
+        return len(self.entry_count)
+
+    def frame_count(self, state_id):
+        """The number of animation frames in a state's animation: the sum of
+        its entries' holds.
+        :param integer state_id: The state ID.
+        """
+        _start = self.entry_start[state_id]
+        return sum(self.hold[_start:_start + self.entry_count[state_id]])
+
+
+def load(path):
+    """Read an animation bank file.
+    :param str path: The animation bank file path.
+    :return AnimationBank: The bank.
+    """
+    with open(path, "rb") as _file:
+        _data = bytearray(_file.read())
+    return AnimationBank(_data)
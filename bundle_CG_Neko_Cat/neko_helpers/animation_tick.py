@@ -0,0 +1,44 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# animation_tick.py  2023-01-07 1.0.0 Cedar Grove Studios
+
+import time
+
+
+class AnimationTick:
+    """The AnimationTick class is a shared frame clock for the herd. `now` is
+    the monotonic time rounded down to the latest tick and is passed to each
+    cat's `update`, so every animation deadline falls on a tick and all of the
+    sprite changes due in a tick land in the same display refresh. Each cat
+    keeps its own pace by animating every few ticks rather than at its own
+    offset: `animation_time` converts a cat's animation time to whole ticks,
+    less half a tick so that rounding of the tick times cannot push a frame
+    into the following tick.
+
+    :param float period: The time between ticks. Unit is seconds."""
+
+    def __init__(self, period=0.1):
+        self._period = period
+        self._start = time.monotonic()
+
+    @property
+    def period(self):
+        """The time between ticks. Unit is seconds."""
+        return self._period
+
+    def ticks(self, animation_time):
+        """The number of ticks between a cat's animation frames.
+        :param float animation_time: The cat's time between frames in seconds.
+        """
+        return max(1, int(animation_time / self._period + 0.5))
+
+    def animation_time(self, animation_time):
+        """The animation time to give a cat so that its frames land on ticks.
+        :param float animation_time: The cat's time between frames in seconds.
+        """
+        return (self.ticks(animation_time) - 0.5) * self._period
+
+    def now(self):
+        """The monotonic time of the latest tick."""
+        return self._start + int((time.monotonic() - self._start) / self._period) * self._period
@@ -0,0 +1,74 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# background_colors.py  2023-01-03 1.0.0 Cedar Grove Studios
+
+import time
+from array import array
+
+
+class BackgroundColors:
+    """The BackgroundColors class samples a continuous color spectrum once into
+    a small table of 24-bit colors and cross-fades a palette color around it.
+    The Spectrum object is only used while the table is built. `pick` chooses a
+    new target color; `update`, called once per main loop iteration, steps the
+    palette one table entry toward the target every `step_time` seconds along
+    the shorter way around the spectrum.
+
+    :param displayio.Palette palette: The background palette; color 0 is set.
+    :param list colors: The spectrum's reference colors; use hex notation.
+    :param integer size: Number of colors sampled from the spectrum.
+    :param float step_time: Time between cross-fade steps. Unit is seconds.
+    :param float gamma: The spectrum's gamma."""
+
+    def __init__(self, palette, colors, size=48, step_time=0.5, gamma=0.5):
+        # the spectrum library is only needed to build the table
+        from cedargrove_rgb_spectrumtools.n_color import Spectrum
+
+        _spectrum = Spectrum(colors, mode="continuous", gamma=gamma)
+        self._table = array("L", [_spectrum.color(_i / size) for _i in range(size)])
+        del _spectrum
+
+        self._palette = palette
+        self._step_time = step_time
+        self._index = 0
+        self._target = 0
+        self._next_step = 0
+        self._palette[0] = self._table[0]
+
+    @property
+    def color(self):
+        """The current background color."""
+        return self._table[self._index]
+
+    @property
+    def fading(self):
+        """True until the target color is reached."""
+        return self._index != self._target
+
+    def pick(self, position):
+        """Start a cross-fade to a new spectrum color.
+        :param float position: Position in the spectrum from 0.0 to 1.0.
+        """
+        self._target = int(position * len(self._table)) % len(self._table)
+        self._next_step = time.monotonic() + self._step_time
+
+    def update(self):
+        """Take the next cross-fade step if one is due.
+        :return bool: True if the palette color changed.
+        """
+        if self._index == self._target:
+            return False
+        _now = time.monotonic()
+        if _now < self._next_step:
+            return False
+        self._next_step = _now + self._step_time
+
+        # step the shorter way around the spectrum
+        _size = len(self._table)
+        if (self._target - self._index) % _size <= _size // 2:
+            self._index = (self._index + 1) % _size
+        else:
+            self._index = (self._index - 1) % _size
+        self._palette[0] = self._table[self._index]
+        return True
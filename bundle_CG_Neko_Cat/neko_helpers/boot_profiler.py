@@ -0,0 +1,79 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# boot_profiler.py  2023-01-05 1.0.0 Cedar Grove Studios
+
+import gc
+import time
+
+
+class BootProfiler:
+    """The BootProfiler class measures the startup sequence one step at a time.
+    `step` records the time and the change in allocated heap since the previous
+    step; steps that share a name, such as adding each cat, are added together.
+    `start` excludes time spent elsewhere since the previous step.
+    `report` prints one line per step followed by the time of the first frame
+    and of the end of startup:
+
+        boot display         412 ms   +3.2 kb
+        boot cats x5          96 ms  +11.0 kb
+        boot first frame 655 ms, ready 871 ms, free 82.4 kb
+
+    The heap change includes garbage that has not been collected yet."""
+
+    # Step entry indexes
+    _TIME = 0
+    _BYTES = 1
+    _COUNT = 2
+
+    def __init__(self):
+        self._start = time.monotonic_ns()
+        self._mark = self._start
+        self._heap = gc.mem_alloc()
+        self._names = []
+        self._steps = {}
+        self._first_frame = None
+
+    def start(self):
+        """Start timing the next step from now. Use when other work ran since
+        the previous step, such as main loop iterations between deferred steps.
+        """
+        self._mark = time.monotonic_ns()
+        self._heap = gc.mem_alloc()
+
+    def step(self, name):
+        """Record the time and heap change since the previous step.
+        :param str name: The step's name.
+        """
+        _now = time.monotonic_ns()
+        _heap = gc.mem_alloc()
+        _step = self._steps.get(name)
+        if _step is None:
+            _step = [0, 0, 0]
+            self._steps[name] = _step
+            self._names.append(name)
+        _step[self._TIME] += (_now - self._mark) // 1000
+        _step[self._BYTES] += _heap - self._heap
+        _step[self._COUNT] += 1
+        self._mark = _now
+        self._heap = _heap
+
+    def first_frame(self):
+        """Record that the first frame is on the display."""
+        self._first_frame = (time.monotonic_ns() - self._start) // 1000
+
+    def report(self):
+        """Print the boot-timing report to the serial console."""
+        for _name in self._names:
+            _step = self._steps[_name]
+            if _step[self._COUNT] > 1:
+                _name = _name + " x" + str(_step[self._COUNT])
+            print(
+                f"boot {_name:16s}{_step[self._TIME] // 1000:5d} ms "
+                + f"{_step[self._BYTES] / 1000:+6.1f} kb"
+            )
+        print(
+            f"boot first frame {(self._first_frame or 0) // 1000} ms, "
+            + f"ready {(self._mark - self._start) // 1000000} ms, "
+            + f"free {gc.mem_free() / 1000} kb"
+        )
@@ -0,0 +1,44 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# cat_scale.py  2023-01-14 1.0.0 Cedar Grove Studios
+
+"""Choose how cats are drawn larger than their 32x32 sprite sheet tiles on
+large panels. Both ways push the same pixels to the display:
+
+GROUP scales the group holding the cats. It holds no extra RAM, but cat
+locations, steps and touches are in group units of `scale` pixels.
+
+SHEET draws the cats from a copy of the sprite sheet enlarged once at
+startup. It holds `scale` squared times the sheet's RAM, adds the enlarging
+to the startup time and lengthens garbage collection pauses, but cats are
+placed to the display pixel.
+
+`simulator/scale_benchmark.py` measures both; the refresh times are the
+same, so AUTO only spends the RAM when it is left over."""
+
+GROUP = "group"
+SHEET = "sheet"
+AUTO = "auto"
+
+
+def choose(scale, sheet_bytes, mem_free, headroom, mode=AUTO):
+    """Choose the scaling method for a cat scale.
+    :param integer scale: The cat scale; 1 draws the sheet as it is.
+    :param integer sheet_bytes: RAM held by the unscaled sprite sheet.
+    :param integer mem_free: Free RAM with the unscaled sheet loaded.
+    :param integer headroom: Free RAM to keep after the sheet is enlarged.
+    :param str mode: GROUP, SHEET or AUTO; AUTO picks SHEET when the enlarged
+     sheet fits within the free RAM less `headroom`, otherwise GROUP.
+    :return str: GROUP or SHEET, or None when `scale` is 1.
+    """
+    if scale == 1:
+        return None
+    if mode in (GROUP, SHEET):
+        return mode
+    if mode != AUTO:
+        raise ValueError(f"cat scale mode {mode!r} is not {GROUP!r}, {SHEET!r} or {AUTO!r}")
+    # the unscaled sheet is still held while the enlarged copy is made
+    if mem_free - sheet_bytes * scale * scale >= headroom:
+        return SHEET
+    return GROUP
@@ -9,21 +9,197 @@ import displayio
 import time
 
 
+class TouchInput:
+    """The TouchInput class turns the STMPE610 touch controller's queued samples
+    into touch events. `event` first reads the controller's FIFO fill level,
+    a single register read; only when samples are waiting is the FIFO drained in
+    one burst. The burst is median-filtered into a single calibrated display
+    location, so a touch costs one SPI burst per call rather than a full
+    `touch_point` exchange on the bus shared with the display. The location is
+    mapped with the driver's own `map_range`, exactly as `touch_point` maps it.
+
+    :param adafruit_stmpe610.Adafruit_STMPE610_SPI controller: The touch controller.
+    :param tuple calibration: Raw (min, max) values for the touch axes, as
+     given to the driver.
+    :param tuple size: Width and height of the display in pixels.
+    :param integer rotation: Display rotation in degrees.
+    :param tuple flip: Whether the x and y touch axes are reversed.
+    :param integer max_samples: The most samples read in one burst; the FIFO is
+     flushed of any more."""
+
+    def __init__(self, controller, calibration, size, rotation=0,
+        flip=(False, False), max_samples=16,
+        ):
+        # only boards with an STMPE610 load its driver
+        from adafruit_stmpe610 import map_range
+
+        self._controller = controller
+        self._map_range = map_range
+        # The axis ranges and display ranges that the driver's `touch_point`
+        #   maps the raw samples through, in the driver's order: flip the
+        #   calibration ranges, then map to the rotated display.
+        if not calibration:
+            calibration = ((0, 4095), (0, 4095))
+        _cal_0 = tuple(calibration[0][::-1] if flip[0] else calibration[0])
+        _cal_1 = tuple(calibration[1][::-1] if flip[1] else calibration[1])
+        _width, _height = size
+        # at 0 and 180 degrees, the display's x axis is the raw y axis
+        self._swap = rotation in (0, 180)
+        if rotation == 0:
+            self._x_range = _cal_0 + (0, _width)
+            self._y_range = _cal_1 + (0, _height)
+        elif rotation == 90:
+            self._x_range = _cal_1 + (0, _width)
+            self._y_range = _cal_0 + (_height, 0)
+        elif rotation == 180:
+            self._x_range = _cal_0 + (_width, 0)
+            self._y_range = _cal_1 + (_height, 0)
+        else:
+            self._x_range = _cal_1 + (_width, 0)
+            self._y_range = _cal_0 + (0, _height)
+        # reusable sample buffers for the median filter
+        self._x = [0] * max_samples
+        self._y = [0] * max_samples
+        # number of bursts read and samples drained
+        self.bursts = 0
+        self.samples = 0
+
+    def _to_display(self, raw_x, raw_y):
+        """Convert a raw sample to display coordinates as the driver's
+        `touch_point` does."""
+        if self._swap:
+            raw_x, raw_y = raw_y, raw_x
+        return (
+            int(self._map_range(raw_x, *self._x_range)),
+            int(self._map_range(raw_y, *self._y_range)),
+        )
+
+    def event(self):
+        """Read any queued touch samples and coalesce them into one event.
+        :return tuple: The (x, y) display location touched since the previous
+         call, or None if there was no touch.
+        """
+        # the FIFO fill level is a single register read
+        _queued = self._controller.buffer_size
+        if not _queued:
+            return None
+
+        # drain the queued samples in one burst
+        _read = 0
+        for _ in range(min(_queued, len(self._x))):
+            _sample = self._controller.read_data()
+            if _sample is None:
+                break
+            self._x[_read] = _sample[0]
+            self._y[_read] = _sample[1]
+            _read += 1
+        if _queued > len(self._x):
+            # more were queued than a burst holds; skip to the latest touch
+            while not self._controller.buffer_empty:
+                self._controller.read_data()
+        if not _read:
+            return None
+        self.bursts += 1
+        self.samples += _read
+
+        # the median of each axis rejects single-sample glitches
+        _xs = sorted(self._x[:_read])
+        _ys = sorted(self._y[:_read])
+        return self._to_display(_xs[_read // 2], _ys[_read // 2])
+
+
+# Display profiles, one per supported board or FeatherWing. Pins are `board`
+#   pin names. The baudrate is the fastest SPI clock the panel runs reliably
+#   at; the RP2040 divides its 125MHz peripheral clock by an even number, so
+#   both FeatherWings actually run at 31.25MHz rather than displayio's default
+#   24MHz (20.8MHz).
+DISPLAY_PROFILES = (
+    {
+        "name": "built-in",
+        # board.DISPLAY is set up by the board; resistive touchscreen pins
+        "driver": None,
+        "size": None,
+        "touch_flip": (False, False),
+    },
+    {
+        "name": "TFT FeatherWing - 2.4-inch 320x240 Touchscreen",
+        "driver": ("adafruit_ili9341", "ILI9341"),
+        "size": (320, 240),
+        "command": "D10",
+        "chip_select": "D9",
+        "touch_chip_select": "D6",
+        "backlight": "D4",
+        # Brightness PWM frequency is not critical for this display
+        "backlight_frequency": 500,
+        "baudrate": 40000000,
+        "touch_flip": (False, False),
+    },
+    {
+        "name": "TFT FeatherWing - 3.5-inch 480x320 Touchscreen",
+        "driver": ("adafruit_hx8357", "HX8357"),
+        "size": (480, 320),
+        "command": "D10",
+        "chip_select": "D9",
+        "touch_chip_select": "D6",
+        "backlight": "D4",
+        # For brightness linearity, PWM frequency must be less than 1000Hz
+        #   per the FAN5333B backlight LED controller datasheet
+        "backlight_frequency": 500,
+        "baudrate": 32000000,
+        "touch_flip": (False, True),
+    },
+)
+
+
+def find_profile(name="", use_built_in=True):
+    """Find the display profile for a display name. A board with its own
+    resistive touch display (`board.DISPLAY` and the `board.TOUCH_XL` pins,
+    e.g. the PyPortal) uses the built-in profile whatever the name, unless
+    `use_built_in` is False. Other boards with a display use the name given.
+    :param str name: Some unique characters from the profile name, e.g.
+     "2.4-inch". An empty name selects the built-in display when the board has
+     one.
+    :param bool use_built_in: Use the board's own touch display if it has one.
+    :return dict: The display profile.
+    """
+    _pins = dir(board)
+    if "DISPLAY" in _pins and (not name or (use_built_in and "TOUCH_XL" in _pins)):
+        name = "built-in"
+    _found = [_profile for _profile in DISPLAY_PROFILES if name and name in _profile["name"]]
+    if len(_found) != 1:
+        raise ValueError(
+            f"display name {name!r} matches {len(_found)} of: "
+            + ", ".join(_profile["name"] for _profile in DISPLAY_PROFILES)
+        )
+    return _found[0]
+
+
 class Display:
     """ The Display class permits add-on displays to appear and act the same as
-    built-in displays. Instantiates the display and touchscreen as specified by
-    the `name` string and the touchscreen zero-rotation `calibration` value.
-    Display brightness may not be supported on some displays.
+    built-in displays. Instantiates the display and touchscreen described by
+    the display profile that `name` selects (see `DISPLAY_PROFILES`) and the
+    touchscreen zero-rotation `calibration` value. Display brightness may not
+    be supported on some displays; `brightness_adjustable` is False when the
+    built-in display's brightness can't be set.
+
+    Touches are read as events with `touch_event`; on the TFT FeatherWings the
+    STMPE610 sample queue is read through a TouchInput layer.
 
     To do: Change touchscreen initialization for various rotation values.
-           Use list or dictionary approach for display names and parameters."""
 
-    def __init__(self, name="", rotation=0, calibration=None, brightness=1):
+    :param str name: Some unique characters from the display profile name.
+    :param integer rotation: Display rotation in degrees.
+    :param tuple calibration: Touchscreen calibration at zero rotation.
+    :param float brightness: Initial display brightness.
+    :param integer baudrate: SPI bus clock; overrides the profile's value.
+    :param bool use_built_in: Use the board's own resistive touch display, if
+     it has one, whatever the name; False to use the named FeatherWing on such
+     a board."""
 
-        if "DISPLAY" and "TOUCH" in dir(board):
-            display_name = "built-in"
-        else:
-            display_name = name
+    def __init__(self, name="", rotation=0, calibration=None, brightness=1,
+        baudrate=None, use_built_in=True,
+        ):
+        self.profile = find_profile(name, use_built_in)
 
         _calibration = calibration
         _brightness = brightness
@@ -32,14 +208,23 @@ class Display:
         # 0-degree rotation.
         _rotation = rotation
 
+        # Batched touch event layer; None reads `ts.touch_point` directly
+        self.touch = None
+
+        # False if the display has no backlight control
+        self.brightness_adjustable = True
+
         # Instantiate the screen
-        print(f"* Instantiate the {display_name} display")
-        if display_name in "built-in":
+        print(f"* Instantiate the {self.profile['name']} display")
+        if self.profile["driver"] is None:
             import adafruit_touchscreen
 
             self.display = board.DISPLAY
             self.display.rotation = _rotation
-            self.display.brightness = _brightness
+            try:
+                self.display.brightness = _brightness
+            except RuntimeError:
+                self.brightness_adjustable = False
 
             # add rotation stuff here
             self.ts = adafruit_touchscreen.Touchscreen(
@@ -50,59 +235,47 @@ class Display:
                 calibration=_calibration,
                 size=(self.display.width, self.display.height),
             )
+            return
 
-        elif display_name in 'TFT FeatherWing - 2.4-inch 320x240 Touchscreen':
-            import adafruit_ili9341
-            import adafruit_stmpe610
-            import pwmio
+        import adafruit_stmpe610
+        import pwmio
 
-            # Brightness PWM frequency is not critical for this display
-            self.lite = pwmio.PWMOut(board.D4, frequency=500)
-            self.lite.duty_cycle = int(_brightness * 0xFFFF)
+        _driver_module, _driver_class = self.profile["driver"]
+        _driver = getattr(__import__(_driver_module), _driver_class)
+        _width, _height = self.profile["size"]
 
-            displayio.release_displays()  # Release display resources
-            display_bus = displayio.FourWire(
-                board.SPI(), command=board.D10, chip_select=board.D9, reset=None
-            )
-            self.display = adafruit_ili9341.ILI9341(display_bus, width=320, height=240)
-            self.display.rotation = rotation
-            ts_cs = digitalio.DigitalInOut(board.D6)
-            self.ts = adafruit_stmpe610.Adafruit_STMPE610_SPI(
-                board.SPI(),
-                ts_cs,
-                calibration=_calibration,
-                size=(self.display.width, self.display.height),
-                disp_rotation=_rotation,
-                touch_flip=(False, False),
-            )
-
-        elif display_name in 'TFT FeatherWing - 3.5-inch 480x320 Touchscreen':
-            import adafruit_hx8357
-            import adafruit_stmpe610
-            import pwmio
+        self.lite = pwmio.PWMOut(
+            getattr(board, self.profile["backlight"]),
+            frequency=self.profile["backlight_frequency"],
+        )
+        self.lite.duty_cycle = int(_brightness * 0xFFFF)
 
-            # For brightness linearity, PWM frequency must be less than 1000Hz
-            #   per the FAN5333B backlight LED controller datasheet
-            self.lite = pwmio.PWMOut(board.D4, frequency=500)
-            self.lite.duty_cycle = int(_brightness * 0xFFFF)
-
-            displayio.release_displays()  # Release display resources
-            display_bus = displayio.FourWire(
-                board.SPI(), command=board.D10, chip_select=board.D9, reset=None
-            )
-            self.display = adafruit_hx8357.HX8357(display_bus, width=480, height=320)
-            self.display.rotation = _rotation
-            ts_cs = digitalio.DigitalInOut(board.D6)
-            self.ts = adafruit_stmpe610.Adafruit_STMPE610_SPI(
-                board.SPI(),
-                ts_cs,
-                calibration=_calibration,
-                size=(self.display.width, self.display.height),
-                disp_rotation=_rotation,
-                touch_flip=(False, True),
-            )
-        else:
-            print(f"*** ERROR: display {display_name} not defined")
+        displayio.release_displays()  # Release display resources
+        display_bus = displayio.FourWire(
+            board.SPI(),
+            command=getattr(board, self.profile["command"]),
+            chip_select=getattr(board, self.profile["chip_select"]),
+            reset=None,
+            baudrate=baudrate or self.profile["baudrate"],
+        )
+        self.display = _driver(display_bus, width=_width, height=_height)
+        self.display.rotation = _rotation
+        ts_cs = digitalio.DigitalInOut(getattr(board, self.profile["touch_chip_select"]))
+        self.ts = adafruit_stmpe610.Adafruit_STMPE610_SPI(
+            board.SPI(),
+            ts_cs,
+            calibration=_calibration,
+            size=(self.display.width, self.display.height),
+            disp_rotation=_rotation,
+            touch_flip=self.profile["touch_flip"],
+        )
+        self.touch = TouchInput(
+            self.ts,
+            _calibration,
+            (self.display.width, self.display.height),
+            rotation=_rotation,
+            flip=self.profile["touch_flip"],
+        )
 
     @property
     def brightness(self):
@@ -163,6 +336,39 @@ class Display:
     def rotation(self, new_rotation):
         self.display.rotation = new_rotation
 
+    @property
+    def auto_refresh(self):
+        """True if displayio refreshes the display automatically.
+        :param bool new_auto_refresh:
+        """
+        return self.display.auto_refresh
+
+    @auto_refresh.setter
+    def auto_refresh(self, new_auto_refresh):
+        self.display.auto_refresh = new_auto_refresh
+
+    def refresh(self, minimum_frames_per_second=0):
+        """Refresh the display now when auto refresh is off. No target frame
+        rate is passed, so displayio neither skips a late refresh nor waits
+        for the next frame period; the caller paces refreshes.
+        :return bool: True if the display was refreshed.
+        """
+        return self.display.refresh(
+            target_frames_per_second=None,
+            minimum_frames_per_second=minimum_frames_per_second,
+        )
+
+    def touch_event(self):
+        """The location of a new touch, if any.
+        :return tuple: The touched (x, y) display location or None.
+        """
+        if self.touch:
+            return self.touch.event()
+        _point = self.ts.touch_point
+        if _point:
+            return _point[0], _point[1]
+        return None
+
     def dim(self, new_brightness):
         """Gradually dim the display to a new brightness level.
         :param float new_brightness:
@@ -0,0 +1,125 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# depth_order.py  2022-12-21 1.0.0 Cedar Grove Studios
+
+from array import array
+
+
+def _sort_key(sprite):
+    return sprite.sort_key
+
+
+class DepthOrder:
+    """The DepthOrder class keeps the sprites of a displayio group ordered by
+    each sprite's integer sort key so that lower sprites are drawn in front.
+    Rather than sorting the whole group every frame, sprites that moved are
+    reported with `moved` and `restore` slides only those sprites to their new
+    position. The group is only changed when the order actually changes.
+
+    Each sprite added gets a slot. The group position of every slot and the
+    slot at every group position are kept in arrays, and a moved flag per slot
+    keeps each sprite from being queued twice, so neither `moved` nor
+    `restore` has to search the group; a slide costs the distance moved.
+
+    :param displayio.Group group: The group of sprites to keep in order.
+    :param function key: Returns the integer sort key of a sprite. Defaults to
+     the sprite's `sort_key` property."""
+
+    def __init__(self, group, key=None):
+        self._group = group
+        self._key = key or _sort_key
+        # slot of each sprite added
+        self._slot = {}
+        # group position of each slot and slot at each group position
+        self._position = array("H")
+        self._order = array("H")
+        # moved flag for each slot and the moved slots queued for restore
+        self._is_moved = bytearray()
+        self._moved = array("H")
+        self._moved_count = 0
+        # number of times a sprite was moved within the group
+        self.reorders = 0
+
+    def add(self, sprite):
+        """Insert a sprite into the group at its ordered position.
+        :param sprite: A TileGrid object that can be given a sort key.
+        """
+        _key = self._key(sprite)
+        _index = len(self._group)
+        while _index > 0 and self._key(self._group[_index - 1]) > _key:
+            _index -= 1
+        self._group.insert(_index, sprite)
+
+        _slot = len(self._position)
+        self._slot[sprite] = _slot
+        self._position.append(_index)
+        # open a place in the order for the new slot
+        self._order.append(_slot)
+        for _j in range(len(self._order) - 1, _index, -1):
+            self._order[_j] = self._order[_j - 1]
+            self._position[self._order[_j]] = _j
+        self._order[_index] = _slot
+        self._is_moved.append(0)
+        self._moved.append(0)
+
+    def moved(self, sprite):
+        """Note that a sprite's position changed this frame.
+        :param sprite: A TileGrid object in the group.
+        """
+        _slot = self._slot[sprite]
+        if not self._is_moved[_slot]:
+            self._is_moved[_slot] = 1
+            self._moved[self._moved_count] = _slot
+            self._moved_count += 1
+
+    def restore(self):
+        """Slide each moved sprite to its ordered position using a localized
+        insertion pass. Sprites that are still in order are left alone. When
+        several moved sprites are out of place together the pass repeats until
+        no sprite needs to move; each slide removes at least one inversion.
+        :return integer: The number of sprites that changed position.
+        """
+        _group = self._group
+        _sort_key = self._key
+        _position = self._position
+        _order = self._order
+        _moved = self._moved
+        _last = len(_group) - 1
+        _reorders = 0
+        _changed = self._moved_count > 0
+        while _changed:
+            _changed = False
+            for _m in range(self._moved_count):
+                _slot = _moved[_m]
+                sprite = _group[_position[_slot]]
+                _key = _sort_key(sprite)
+                _start = _index = _position[_slot]
+                # slide towards the back while the sprite is below the one behind it
+                while _index > 0 and _sort_key(_group[_index - 1]) > _key:
+                    _index -= 1
+                if _index == _start:
+                    # otherwise slide towards the front
+                    while _index < _last and _sort_key(_group[_index + 1]) < _key:
+                        _index += 1
+                if _index != _start:
+                    _group.pop(_start)
+                    _group.insert(_index, sprite)
+                    # the sprites passed over shift one place the other way
+                    if _index < _start:
+                        for _j in range(_start, _index, -1):
+                            _order[_j] = _order[_j - 1]
+                            _position[_order[_j]] = _j
+                    else:
+                        for _j in range(_start, _index):
+                            _order[_j] = _order[_j + 1]
+                            _position[_order[_j]] = _j
+                    _order[_index] = _slot
+                    _position[_slot] = _index
+                    _reorders += 1
+                    _changed = True
+        for _m in range(self._moved_count):
+            self._is_moved[_moved[_m]] = 0
+        self._moved_count = 0
+        self.reorders += _reorders
+        return _reorders
@@ -0,0 +1,126 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# fade_engine.py  2023-01-02 1.0.0 Cedar Grove Studios
+
+import time
+from array import array
+
+
+class FadeEngine:
+    """The FadeEngine class fades the display backlight and the NeoPixel
+    together over a fixed wall-clock time, independent of the main loop rate.
+    Brightness is quantized into `steps` levels; a gamma-corrected table of
+    backlight duty cycles and NeoPixel color scales is built once, and new
+    values are set on the outputs only when the level changes; the outputs
+    write the hardware when they are flushed. `update` is called once per main
+    loop iteration. With a PaletteDimmer the display is dimmed by swapping in
+    scaled palette colors and the backlight is left alone.
+
+    :param peripheral_output.BacklightOutput backlight: The display backlight.
+    :param peripheral_output.PixelOutput pixel: The NeoPixel that follows the
+     backlight.
+    :param float max_brightness: Backlight brightness at the top level.
+    :param float fade_time: Time to fade across the full range. Unit is seconds.
+    :param integer steps: Number of brightness levels above off.
+    :param float gamma: Perceptual gamma of the brightness ramp.
+    :param float pixel_scale: NeoPixel brightness relative to the backlight.
+    :param palette_dimmer.PaletteDimmer dimmer: Dims the display's palettes
+     instead of the backlight. Defaults to None."""
+
+    def __init__(self, backlight, pixel, max_brightness=1.0, fade_time=2.0,
+        steps=64, gamma=2.2, pixel_scale=0.2, dimmer=None,
+        ):
+        self._backlight = backlight
+        self._pixel = pixel
+        self._dimmer = dimmer
+        self._rate = steps / fade_time
+        self._steps = steps
+
+        # backlight duty cycle and NeoPixel color scale (0 to 256) for each level
+        self._duty = array("H", [0] * (steps + 1))
+        self._pixel_scale = array("H", [0] * (steps + 1))
+        for _level in range(1, steps + 1):
+            _brightness = max_brightness * (_level / steps) ** gamma
+            self._duty[_level] = int(_brightness * 0xFFFF)
+            self._pixel_scale[_level] = int(_brightness * pixel_scale * 256)
+
+        # the dimmer's own levels are gamma-spaced; map each fade level to the
+        #   nearest one
+        if dimmer:
+            self._dim_level = bytearray(
+                (_level * dimmer.levels + steps // 2) // steps for _level in range(steps + 1)
+            )
+
+        self._color = 0
+        self._level = 0
+        self._from = 0
+        self._target = 0
+        self._start = time.monotonic()
+        self._write()
+
+    @property
+    def level(self):
+        """The current brightness level, 0 (off) to `steps` (full)."""
+        return self._level
+
+    @property
+    def fading(self):
+        """True until the level reaches the fade target."""
+        return self._level != self._target
+
+    @property
+    def color(self):
+        """The full-brightness NeoPixel color, e.g. the background color.
+        :param integer new_color: 24-bit RGB color.
+        """
+        return self._color
+
+    @color.setter
+    def color(self, new_color):
+        if new_color != self._color:
+            self._color = new_color
+            self._write_pixel()
+
+    def fade_to(self, fraction):
+        """Start fading toward a brightness. Repeating the current target does
+        not restart the fade.
+        :param float fraction: Target brightness from 0.0 (off) to 1.0 (full).
+        """
+        _target = int(fraction * self._steps + 0.5)
+        if _target != self._target:
+            self._target = _target
+            self._from = self._level
+            self._start = time.monotonic()
+
+    def update(self):
+        """Advance the fade to the level due at the current time.
+        :return bool: True while fading. False once the target is reached.
+        """
+        if self._level == self._target:
+            return False
+        _moved = int((time.monotonic() - self._start) * self._rate)
+        if self._target > self._from:
+            _level = min(self._from + _moved, self._target)
+        else:
+            _level = max(self._from - _moved, self._target)
+        if _level != self._level:
+            self._level = _level
+            self._write()
+        return self._level != self._target
+
+    def _write(self):
+        if self._dimmer:
+            self._dimmer.level = self._dim_level[self._level]
+        else:
+            self._backlight.value = self._duty[self._level]
+        self._write_pixel()
+
+    def _write_pixel(self):
+        _scale = self._pixel_scale[self._level]
+        _color = self._color
+        self._pixel.value = (
+            (((_color >> 16) & 0xFF) * _scale >> 8) << 16
+            | (((_color >> 8) & 0xFF) * _scale >> 8) << 8
+            | (_color & 0xFF) * _scale >> 8
+        )
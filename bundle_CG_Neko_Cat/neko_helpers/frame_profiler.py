@@ -0,0 +1,79 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# frame_profiler.py  2022-12-30 1.0.0 Cedar Grove Studios
+
+import time
+from array import array
+
+
+class FrameProfiler:
+    """The FrameProfiler class times each phase of the main loop. `start` is
+    called at the top of the loop and `mark` at the end of each phase; the time
+    since the previous mark is stored in a fixed-size ring buffer per phase.
+    Every `report_interval` seconds a compact line with the min/avg/p95/max
+    phase times in microseconds is printed to the serial console:
+
+        prof n=64 gc=0/41/212/305 update=88/120/180/240 ...
+
+    :param tuple phases: Phase names in the order they are marked.
+    :param integer depth: Number of loop iterations kept for each phase.
+    :param float report_interval: Time between reports. Unit is seconds."""
+
+    def __init__(self, phases, depth=64, report_interval=10.0):
+        self._phases = phases
+        self._depth = depth
+        self._report_interval = report_interval
+        # phase times in microseconds; one row of `depth` entries per phase
+        self._times = array("L", [0] * (depth * len(phases)))
+        self._slot = 0
+        self._count = 0
+        self._mark = 0
+        self._next_report = time.monotonic() + report_interval
+
+    def start(self):
+        """Begin timing a loop iteration."""
+        self._mark = time.monotonic_ns()
+
+    def mark(self, phase):
+        """Record the time since the previous mark as the duration of a phase.
+        :param integer phase: The phase's index in `phases`.
+        """
+        _now = time.monotonic_ns()
+        self._times[phase * self._depth + self._slot] = (_now - self._mark) // 1000
+        self._mark = _now
+
+    def end(self):
+        """Finish the loop iteration and print a report if one is due."""
+        self._slot = (self._slot + 1) % self._depth
+        if self._count < self._depth:
+            self._count += 1
+        _now = time.monotonic()
+        if _now >= self._next_report:
+            # schedule from now so that a long sleep, such as the dormant
+            #   screensaver, doesn't leave a backlog of reports to catch up
+            self._next_report = _now + self._report_interval
+            print(self.report())
+
+    def stats(self, phase):
+        """Summary of the recorded times of a phase.
+        :param integer phase: The phase's index in `phases`.
+        :return tuple: (min, avg, p95, max) in microseconds.
+        """
+        if not self._count:
+            return (0, 0, 0, 0)
+        _start = phase * self._depth
+        _times = sorted(self._times[_start:_start + self._count])
+        return (
+            _times[0],
+            sum(_times) // self._count,
+            _times[min(self._count * 95 // 100, self._count - 1)],
+            _times[-1],
+        )
+
+    def report(self):
+        """The compact report line for the recorded loop iterations."""
+        _line = "prof n=" + str(self._count)
+        for _phase, _name in enumerate(self._phases):
+            _line += " {}={}/{}/{}/{}".format(_name, *self.stats(_phase))
+        return _line
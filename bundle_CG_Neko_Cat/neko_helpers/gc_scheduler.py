@@ -0,0 +1,92 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# gc_scheduler.py  2022-12-29 1.0.0 Cedar Grove Studios
+
+import gc
+import time
+
+
+class GcScheduler:
+    """The GcScheduler class decides when the main loop runs a garbage
+    collection instead of collecting on every pass. `service` is called once
+    per main loop iteration and collects only when free memory has dropped
+    below `watermark` or, at most once every `interval` seconds, when the next
+    animation deadline is far enough away that the pause cannot delay a frame.
+    If a collection leaves free memory below `watermark`, the live data itself
+    is holding it there; low memory then forces a collection at most once
+    every `interval` seconds until a collection lifts it above `watermark`
+    again. Collection count and pause times are recorded for tuning.
+
+    :param integer watermark: Collect whenever `gc.mem_free()` falls below this
+     many bytes.
+    :param float idle_slack: Minimum time before the next animation deadline for
+     an opportunistic collection. Unit is seconds.
+    :param float interval: Minimum time between opportunistic collections. Unit
+     is seconds."""
+
+    def __init__(self, watermark=24000, idle_slack=0.010, interval=1.0):
+        self._watermark = watermark
+        self._idle_slack = idle_slack
+        self._interval = interval
+        self._last_collect = time.monotonic()
+        # whether low memory forces a collection on the next service call
+        self._armed = True
+        # number of collections; those forced by the watermark are also
+        #   counted separately
+        self.collections = 0
+        self.forced = 0
+        # collection pause times in nanoseconds
+        self.last_pause_ns = 0
+        self.max_pause_ns = 0
+        self.total_pause_ns = 0
+
+    @property
+    def mean_pause(self):
+        """Average collection pause. Unit is seconds."""
+        if not self.collections:
+            return 0.0
+        return self.total_pause_ns / self.collections / 1000000000
+
+    @property
+    def max_pause(self):
+        """Longest collection pause. Unit is seconds."""
+        return self.max_pause_ns / 1000000000
+
+    def collect(self):
+        """Run a collection now and record its pause."""
+        _start = time.monotonic_ns()
+        gc.collect()
+        _pause = time.monotonic_ns() - _start
+        self._last_collect = time.monotonic()
+        self._armed = gc.mem_free() >= self._watermark
+        self.collections += 1
+        self.last_pause_ns = _pause
+        self.total_pause_ns += _pause
+        if _pause > self.max_pause_ns:
+            self.max_pause_ns = _pause
+
+    def service(self, next_deadline=None):
+        """Collect if memory is low or if there is idle time to spare.
+        :param function next_deadline: Returns the monotonic time of the next
+         scheduled animation frame, or None if nothing is scheduled; only called
+         when an opportunistic collection is due. None disables opportunistic
+         collections.
+        :return bool: True if a collection ran.
+        """
+        _now = time.monotonic()
+        _due = _now >= self._last_collect + self._interval
+        if gc.mem_free() < self._watermark and (self._armed or _due):
+            self.forced += 1
+            self.collect()
+            return True
+
+        if next_deadline is None or not _due:
+            return False
+        # there must be room for the slack and for a pause as long as the last
+        _slack = max(self._idle_slack, self.last_pause_ns / 1000000000)
+        _deadline = next_deadline()
+        if _deadline is not None and _deadline - _now < _slack:
+            return False
+        self.collect()
+        return True
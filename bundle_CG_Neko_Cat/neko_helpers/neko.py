@@ -6,6 +6,9 @@
 import displayio
 import time
 import random
+from array import array
+from neko_helpers.neko_states import StateTable
+from neko_helpers import animation_bank
 
 
 class NekoAnimatedSprite(displayio.TileGrid):
@@ -23,95 +26,43 @@ class NekoAnimatedSprite(displayio.TileGrid):
     # Minimum time to stop and scratch in seconds. larger time means scratch for longer
     CONFIG_MIN_SCRATCH_TIME = 2
 
+    # Most waypoints held in the path that Neko follows
+    CONFIG_WAYPOINTS = 16
+
     TILE_WIDTH = 32
     TILE_HEIGHT = 32
 
+    # Animations of every state, compiled from neko_animations.txt by
+    #   tools/compile_animations.py
+    ANIMATION_BANK = "/neko_helpers/neko_animations.bank"
+
     # State object indexes
     _ID = 0
-    _ANIMATION_LIST = 1
-    _MOVEMENT_STEP = 2
-
-    # last time an animation occurred
-    LAST_ANIMATION_TIME = -1
-
-    # index of the sprite within the currently running animation
-    CURRENT_ANIMATION_INDEX = 0
-
-    # last time the cat changed states
-    # used to enforce minimum scratch time
-    LAST_STATE_CHANGE_TIME = -1
+    _MOVEMENT_STEP = 1
 
-    # State objects
-    # Format: (ID, (Animation List), (Step Sizes))
-    STATE_SITTING = (0, (0,), (0, 0))
+    # State objects; the animation of each state is in the ANIMATION_BANK
+    # Format: (ID, (Step Sizes))
+    STATE_SITTING = (0, (0, 0))
 
     # Moving states
-    STATE_MOVING_LEFT = (1, (20, 21), (-CONFIG_STEP_SIZE, 0))
-    STATE_MOVING_UP = (2, (16, 17), (0, -CONFIG_STEP_SIZE))
-    STATE_MOVING_RIGHT = (3, (12, 13), (CONFIG_STEP_SIZE, 0))
-    STATE_MOVING_DOWN = (4, (8, 9), (0, CONFIG_STEP_SIZE))
-    STATE_MOVING_UP_RIGHT = (
-        5,
-        (14, 15),
-        (CONFIG_STEP_SIZE // 2, -CONFIG_STEP_SIZE // 2),
-    )
-    STATE_MOVING_UP_LEFT = (
-        6,
-        (18, 19),
-        (-CONFIG_STEP_SIZE // 2, -CONFIG_STEP_SIZE // 2),
-    )
-    STATE_MOVING_DOWN_LEFT = (
-        7,
-        (22, 23),
-        (-CONFIG_STEP_SIZE // 2, CONFIG_STEP_SIZE // 2),
-    )
-    STATE_MOVING_DOWN_RIGHT = (
-        8,
-        (10, 11),
-        (CONFIG_STEP_SIZE // 2, CONFIG_STEP_SIZE // 2),
-    )
+    STATE_MOVING_LEFT = (1, (-CONFIG_STEP_SIZE, 0))
+    STATE_MOVING_UP = (2, (0, -CONFIG_STEP_SIZE))
+    STATE_MOVING_RIGHT = (3, (CONFIG_STEP_SIZE, 0))
+    STATE_MOVING_DOWN = (4, (0, CONFIG_STEP_SIZE))
+    STATE_MOVING_UP_RIGHT = (5, (CONFIG_STEP_SIZE // 2, -CONFIG_STEP_SIZE // 2))
+    STATE_MOVING_UP_LEFT = (6, (-CONFIG_STEP_SIZE // 2, -CONFIG_STEP_SIZE // 2))
+    STATE_MOVING_DOWN_LEFT = (7, (-CONFIG_STEP_SIZE // 2, CONFIG_STEP_SIZE // 2))
+    STATE_MOVING_DOWN_RIGHT = (8, (CONFIG_STEP_SIZE // 2, CONFIG_STEP_SIZE // 2))
 
     # Scratching states
-    STATE_SCRATCHING_LEFT = (9, (30, 31), (0, 0))
-    STATE_SCRATCHING_RIGHT = (10, (26, 27), (0, 0))
-    STATE_SCRATCHING_DOWN = (11, (24, 25), (0, 0))
-    STATE_SCRATCHING_UP = (12, (28, 29), (0, 0))
+    STATE_SCRATCHING_LEFT = (9, (0, 0))
+    STATE_SCRATCHING_RIGHT = (10, (0, 0))
+    STATE_SCRATCHING_DOWN = (11, (0, 0))
+    STATE_SCRATCHING_UP = (12, (0, 0))
 
     # Other states
-    STATE_CLEANING = (13, (0, 0, 1, 1, 2, 3, 2, 3, 1, 1, 2, 3, 2, 3, 0, 0, 0), (0, 0))
-    STATE_SLEEPING = (
-        14,
-        (
-            0,
-            0,
-            4,
-            4,
-            4,
-            0,
-            0,
-            4,
-            4,
-            4,
-            0,
-            0,
-            5,
-            6,
-            5,
-            6,
-            5,
-            6,
-            5,
-            6,
-            5,
-            6,
-            7,
-            7,
-            0,
-            0,
-            0,
-        ),
-        (0, 0),
-    )
+    STATE_CLEANING = (13, (0, 0))
+    STATE_SLEEPING = (14, (0, 0))
 
     # these states count as "moving"
     # used to alternate between moving and non-moving states
@@ -126,11 +77,32 @@ class NekoAnimatedSprite(displayio.TileGrid):
         STATE_MOVING_DOWN_RIGHT,
     )
 
-    # current state private field
-    _CURRENT_STATE = STATE_SITTING
+    # state machine compiled into integer-indexed lookup tables
+    STATE_TABLE = StateTable(
+        (
+            STATE_SITTING,
+            STATE_MOVING_LEFT,
+            STATE_MOVING_UP,
+            STATE_MOVING_RIGHT,
+            STATE_MOVING_DOWN,
+            STATE_MOVING_UP_RIGHT,
+            STATE_MOVING_UP_LEFT,
+            STATE_MOVING_DOWN_LEFT,
+            STATE_MOVING_DOWN_RIGHT,
+            STATE_SCRATCHING_LEFT,
+            STATE_SCRATCHING_RIGHT,
+            STATE_SCRATCHING_DOWN,
+            STATE_SCRATCHING_UP,
+            STATE_CLEANING,
+            STATE_SLEEPING,
+        ),
+        MOVING_STATES,
+        animation_bank.load(ANIMATION_BANK),
+    )
 
-    # list of sprite indexes for the currently running animation
-    CURRENT_ANIMATION = _CURRENT_STATE[_ANIMATION_LIST]
+    # state IDs for random choices of resting states
+    _REST_IDS = (STATE_CLEANING[_ID], STATE_SLEEPING[_ID])
+    _WAKE_IDS = (STATE_SLEEPING[_ID], STATE_CLEANING[_ID], STATE_SITTING[_ID])
 
     """
     Neko Animated Cat Sprite. Extends displayio.TileGrid manages changing the visible
@@ -146,14 +118,34 @@ class NekoAnimatedSprite(displayio.TileGrid):
     :param integer outline: Integer value representing 24-bit RGB outline color value.
     :param displayio.sprite_sheet sprites: Bitmap sprite sheet object.
     :param displayio.palette palette: Palette object for sprite sheet.
+    :param rng: Source of Neko's random choices; any object with `randint` and
+     `choice`, e.g. a seeded `random` module. Defaults to the `random` module.
+    :param integer scale: How many times larger than TILE_WIDTH x TILE_HEIGHT
+     the sprite sheet was pre-scaled. Tile size, step size and the edge clamps
+     follow it. Defaults to 1.
     """
 
     def __init__(self, animation_time=0.3, display_size=None, fill=None,
-        outline=None, sprites=None, palette=None,
+        outline=None, sprites=None, palette=None, rng=None, scale=1,
         ):
 
         self._display_size = display_size
-        self._moving_to = None
+        self._random = random if rng is None else rng
+
+        # a pre-scaled sprite sheet has larger tiles; Neko's steps and the
+        #   distances kept from the edges grow with them
+        self._scale = scale
+        if scale != 1:
+            self.TILE_WIDTH = self.TILE_WIDTH * scale
+            self.TILE_HEIGHT = self.TILE_HEIGHT * scale
+            self.CONFIG_STEP_SIZE = self.CONFIG_STEP_SIZE * scale
+
+        # waypoint path ring buffer: locations from the head (start) onward
+        self._path_x = array("h", [0] * self.CONFIG_WAYPOINTS)
+        self._path_y = array("h", [0] * self.CONFIG_WAYPOINTS)
+        self._path_start = 0
+        self._path_count = 0
+        self._path_changes = 0
 
         self._sprite_sheet = sprites
         self._neko_palette = palette
@@ -173,8 +165,8 @@ class NekoAnimatedSprite(displayio.TileGrid):
             pixel_shader=self._neko_palette,
             width=1,
             height=1,
-            tile_width=32,
-            tile_height=32,
+            tile_width=self.TILE_WIDTH,
+            tile_height=self.TILE_HEIGHT,
         )
 
         # default initial location is top left corner
@@ -184,69 +176,163 @@ class NekoAnimatedSprite(displayio.TileGrid):
         # set the animation time into a private field
         self._animation_time = animation_time
 
-    def _advance_animation_index(self):
+        # Per-instance animation state. Every field that update() writes is
+        #   created here so that the steady-state update path never adds
+        #   attributes (and so never grows the instance dictionary).
+        # current state private fields
+        self._CURRENT_STATE = self.STATE_SITTING
+        self._CURRENT_STATE_ID = self.STATE_SITTING[self._ID]
+
+        # index of the entry within the currently running animation and how
+        #   many animation frames that entry has been held for
+        self.CURRENT_ANIMATION_INDEX = 0
+        self._hold_count = 0
+
+        # last time an animation occurred
+        self.LAST_ANIMATION_TIME = -1.0
+
+        # last time the cat changed states
+        # used to enforce minimum scratch time
+        self.LAST_STATE_CHANGE_TIME = -1.0
+
+        # integer depth sort key: y coordinate in the upper bits with the fill
+        #   color as a tie-breaker; recomputed only when y changes
+        self._sort_rank = (self._neko_palette[5] >> 8) & 0xFFFF
+        self._sort_y = None
+        self._sort_key = 0
+
+    def _advance_animation_index(self, hold):
         """
-        Helper function to increment the animation index, and wrap it back around to
-        0 after it reaches the final animation in the list.
+        Helper function to count a frame of the current animation entry and,
+        once the entry has been held for `hold` frames, increment the animation
+        index, wrapping it back around to 0 after the final entry in the list.
+        :param integer hold: The number of frames the current entry is held.
         :return: None
         """
-        self.CURRENT_ANIMATION_INDEX += 1
-        if self.CURRENT_ANIMATION_INDEX >= len(self.CURRENT_ANIMATION):
-            self.CURRENT_ANIMATION_INDEX = 0
+        self._hold_count += 1
+        if self._hold_count >= hold:
+            self._hold_count = 0
+            self.CURRENT_ANIMATION_INDEX += 1
+            if self.CURRENT_ANIMATION_INDEX >= self.STATE_TABLE.entry_count[self._CURRENT_STATE_ID]:
+                self.CURRENT_ANIMATION_INDEX = 0
+
+    def _clamp_x(self, x):
+        # keep a target at least 1/2 tile size away from the left and right edges
+        return min(max(x, self.TILE_WIDTH // 2 + 1), self._display_size[0] - self.TILE_WIDTH // 2 - 1)
+
+    def _clamp_y(self, y):
+        # keep a target at least 1/2 tile size away from the top and bottom edges
+        return min(max(y, self.TILE_HEIGHT // 2 + 1), self._display_size[1] - self.TILE_HEIGHT // 2 - 1)
 
     @property
     def moving_to(self):
         """
-        Tuple with x/y location we are moving towards or none if
-        not moving to anywhere specific.
+        Tuple with x/y location we are moving towards (the head of the
+        waypoint path) or none if not moving to anywhere specific. Setting a
+        location replaces the whole path with that single waypoint.
 
         :return Optional(tuple): moving_to
         """
-        return self._moving_to
+        return self.path_head
 
     @moving_to.setter
     def moving_to(self, new_moving_to):
-
+        self.clear_path()
         # if new values is not None
         if new_moving_to:
-            # initially start with the new value that is passed in
-            _clamped_x = new_moving_to[0]
-            _clamped_y = new_moving_to[1]
-
-            # if x location of new value is within 1/2 tile size of left edge of display
-            if new_moving_to[0] < self.TILE_WIDTH // 2 + 1:
-                # override x to 1/2 tile size away from the left edge of display
-                _clamped_x = self.TILE_WIDTH // 2 + 1
-
-            # if x location of new value is within 1/2 tile size of right edge of display
-            if new_moving_to[0] > self._display_size[0] - self.TILE_WIDTH // 2 - 1:
-                # override x to 1/2 tile size away from right edge of display
-                _clamped_x = self._display_size[0] - self.TILE_WIDTH // 2 - 1
-
-            # if y location of new value is within 1/2 tile size of top edge of display
-            if new_moving_to[1] < self.TILE_HEIGHT // 2 + 1:
-                # override y to 1/2 tile size away from top edge
-                _clamped_y = self.TILE_HEIGHT // 2 + 1
-            # if y location of new value is within 1/2 tile size of bottom edge of display
-            if new_moving_to[1] > self._display_size[1] - self.TILE_HEIGHT // 2 - 1:
-                # override y to 1/2 tile size away from bottom edge
-                _clamped_y = self._display_size[1] - self.TILE_HEIGHT // 2 - 1
-
-            # update the moving to target location
-            self._moving_to = (_clamped_x, _clamped_y)
-        else:
-            # None means not moving to a target location
-            self._moving_to = None
+            self.add_waypoint(new_moving_to[0], new_moving_to[1])
+
+    @property
+    def path_head(self):
+        """
+        Tuple with the x/y location of the waypoint Neko is heading for, or
+        None if the path is empty.
+
+        :return Optional(tuple): path_head
+        """
+        if not self._path_count:
+            return None
+        return self._path_x[self._path_start], self._path_y[self._path_start]
+
+    @property
+    def waypoints(self):
+        """
+        The number of waypoints in the path, including the head.
+
+        :return integer: waypoints
+        """
+        return self._path_count
+
+    @property
+    def path_changes(self):
+        """
+        A count that changes whenever the path head changes, so that a caller
+        (e.g. the laser dot) can tell when to read `path_head` again.
+
+        :return integer: path_changes
+        """
+        return self._path_changes
+
+    def add_waypoint(self, x, y):
+        """
+        Add a location to the end of the waypoint path, e.g. from a touch drag.
+        The location is clamped to keep Neko on the display. Points closer than
+        CONFIG_STEP_SIZE to the previous waypoint are dropped; when the path is
+        full the oldest waypoint is dropped to make room.
+
+        :param integer x: The waypoint's x location.
+        :param integer y: The waypoint's y location.
+        :return bool: True if the waypoint was added.
+        """
+        _x = self._clamp_x(x)
+        _y = self._clamp_y(y)
+        _size = len(self._path_x)
+        if self._path_count:
+            _last = (self._path_start + self._path_count - 1) % _size
+            _dx = _x - self._path_x[_last]
+            _dy = _y - self._path_y[_last]
+            if _dx * _dx + _dy * _dy < self.CONFIG_STEP_SIZE * self.CONFIG_STEP_SIZE:
+                return False
+        if self._path_count == _size:
+            # full; skip ahead past the oldest waypoint
+            self._next_waypoint()
+        _end = (self._path_start + self._path_count) % _size
+        self._path_x[_end] = _x
+        self._path_y[_end] = _y
+        self._path_count += 1
+        if self._path_count == 1:
+            self._path_changes += 1
+        return True
+
+    def clear_path(self):
+        """
+        Remove every waypoint.
+
+        :return: None
+        """
+        if self._path_count:
+            self._path_count = 0
+            self._path_changes += 1
+
+    def _next_waypoint(self):
+        # drop the head of the path
+        self._path_start = (self._path_start + 1) % len(self._path_x)
+        self._path_count -= 1
+        self._path_changes += 1
 
     @property
     def sort_key(self):
         """
-        Generate a sort key value based upon vertical position and fill
-        color. Assumes that the color is unique to the class instance.
+        Integer sort key value based upon vertical position and fill
+        color. Assumes that the color is unique to the class instance. The
+        cached key is only recomputed when the y coordinate has changed.
 
         :return: sort_key
         """
-        return self.y + (self._neko_palette[5] / 0xF00000)
+        if self.y != self._sort_y:
+            self._sort_y = self.y
+            self._sort_key = (self.y << 16) | self._sort_rank
+        return self._sort_key
 
     @property
     def animation_time(self):
@@ -261,11 +347,20 @@ class NekoAnimatedSprite(displayio.TileGrid):
     def animation_time(self, new_time):
         self._animation_time = new_time
 
+    @property
+    def next_animation_time(self):
+        """
+        The monotonic time when the next animation frame is due.
+
+        :return float: next_animation_time
+        """
+        return self.LAST_ANIMATION_TIME + self._animation_time
+
     @property
     def current_state(self):
         """
         The current state object.
-        Format: (ID, (Animation List), (Step Sizes))
+        Format: (ID, (Step Sizes))
 
         :return tuple: current state object
         """
@@ -273,35 +368,52 @@ class NekoAnimatedSprite(displayio.TileGrid):
 
     @current_state.setter
     def current_state(self, new_state):
-        # only change if we aren't already in the new_state
-        if self.current_state != new_state:
-            # update the current state object
-            self._CURRENT_STATE = new_state
-            # update the current animation list
-            self.CURRENT_ANIMATION = new_state[self._ANIMATION_LIST]
+        self._set_state(new_state[self._ID])
+
+    def _set_state(self, state_id, now=None):
+        """
+        Change to a new state by state ID.
+
+        :param integer state_id: The ID of the new state.
+        :param float now: The current monotonic time, if already read.
+        :return: None
+        """
+        # only change if we aren't already in the new state
+        if self._CURRENT_STATE_ID != state_id:
+            # update the current state ID and state object
+            self._CURRENT_STATE_ID = state_id
+            self._CURRENT_STATE = self.STATE_TABLE.states[state_id]
             # reset current animation index to 0
             self.CURRENT_ANIMATION_INDEX = 0
-            # show the first sprite in the animation
-            self[0] = self.CURRENT_ANIMATION[self.CURRENT_ANIMATION_INDEX]
+            self._hold_count = 0
+            # show the first sprite in the animation if it isn't showing already
+            _sprite = self.STATE_TABLE.first_sprite(state_id)
+            if self[0] != _sprite:
+                self[0] = _sprite
             # update the last state change time
-            self.LAST_STATE_CHANGE_TIME = time.monotonic()
+            self.LAST_STATE_CHANGE_TIME = time.monotonic() if now is None else now
 
-    def animate(self):
+    def animate(self, now=None):
         """
         If enough time has passed since the previous animation then
         execute the next animation step by changing the currently visible sprite and
         advancing the animation index.
 
+        :param float now: The current monotonic time, if already read.
         :return bool: True if an animation frame occurred. False if it's not time yet
          for an animation frame.
         """
-        _now = time.monotonic()
+        _now = time.monotonic() if now is None else now
         # is it time to do an animation step?
-        if _now > self.LAST_ANIMATION_TIME + self.animation_time:
-            # update the visible sprite
-            self[0] = self.CURRENT_ANIMATION[self.CURRENT_ANIMATION_INDEX]
-            # advance the animation index
-            self._advance_animation_index()
+        if _now > self.LAST_ANIMATION_TIME + self._animation_time:
+            _table = self.STATE_TABLE
+            _entry = _table.entry_start[self._CURRENT_STATE_ID] + self.CURRENT_ANIMATION_INDEX
+            # update the visible sprite; a held sprite is only written once
+            _sprite = _table.sprite[_entry]
+            if self[0] != _sprite:
+                self[0] = _sprite
+            # advance the animation index once the entry's hold is over
+            self._advance_animation_index(_table.hold[_entry])
             # update the last animation time
             self.LAST_ANIMATION_TIME = _now
             return True
@@ -316,7 +428,7 @@ class NekoAnimatedSprite(displayio.TileGrid):
 
         :return bool: True if Neko is in a moving state. False otherwise.
         """
-        return self.current_state in self.MOVING_STATES
+        return bool(self.STATE_TABLE.flags[self._CURRENT_STATE_ID] & StateTable.MOVING)
 
     @property
     def center_point(self):
@@ -327,7 +439,46 @@ class NekoAnimatedSprite(displayio.TileGrid):
         """
         return (self.x + self.TILE_WIDTH // 2, self.y + self.TILE_HEIGHT // 2)
 
-    def update(self):
+    def fast_forward(self, elapsed):
+        """
+        Advance Neko by a period of time in a single catch-up step rather than
+        animating every frame, e.g. after the display has been dark. Neko is moved
+        to a random spot inside the walls within reach of the missed animation
+        frames and settles into a resting or walking state.
+
+        :param float elapsed: How much time to skip. Unit is seconds.
+        :return: None
+        """
+        _frames = int(elapsed / self._animation_time)
+        if _frames < 1:
+            return
+
+        _max_x = self._display_size[0] - self.TILE_WIDTH - 1
+        _max_y = self._display_size[1] - self.TILE_HEIGHT - 1
+        if self._path_count:
+            # Neko had plenty of time to walk the path; settle at its end
+            _last = (self._path_start + self._path_count - 1) % len(self._path_x)
+            _new_x = self._path_x[_last] - self.TILE_WIDTH // 2
+            _new_y = self._path_y[_last] - self.TILE_HEIGHT // 2
+            self.clear_path()
+        else:
+            # wander anywhere within the missed steps' reach that is inside
+            #   the walls; once the reach spans the display, anywhere on it
+            _reach = _frames * self.CONFIG_STEP_SIZE
+            _new_x = self._random.randint(max(self.x - _reach, 1), min(self.x + _reach, _max_x))
+            _new_y = self._random.randint(max(self.y - _reach, 1), min(self.y + _reach, _max_y))
+
+        # keep Neko inside the walls
+        self.x = min(max(_new_x, 1), _max_x)
+        self.y = min(max(_new_y, 1), _max_y)
+
+        # after a long while Neko is most likely to be resting
+        self._set_state(self._random.choice(self._WAKE_IDS))
+
+        # restart the animation timers from now
+        self.LAST_ANIMATION_TIME = self.LAST_STATE_CHANGE_TIME = time.monotonic()
+
+    def update(self, now=None):
         # pylint: disable=too-many-branches,too-many-statements
         """
         Do the Following:
@@ -335,178 +486,118 @@ class NekoAnimatedSprite(displayio.TileGrid):
          - Take a step if in a moving state.
          - Change states if needed.
 
-        :return: None
+        :param float now: The current monotonic time, e.g. the latest
+         `AnimationTick` time. Read from the clock if None.
+        :return bool: True if Neko's sprite or location changed. False otherwise.
         """
-        _now = time.monotonic()
-
-        # if neko is moving to a specific location (i.e. user touched a spot)
-        if self.moving_to:
-
-            # if the x of the target location is between the left and right edges of Neko
-            if self.x < self.moving_to[0] < self.x + self.TILE_WIDTH:
-                # if the y of the target location is between top and bottom edges of Neko
-                if self.y < self.moving_to[1] < self.y + self.TILE_HEIGHT:
-                    # change to either sleeping or cleaning states
-                    self.current_state = random.choice(
-                        (self.STATE_CLEANING, self.STATE_SLEEPING)
-                    )
-                    # clear the moving to target location
-                    self.moving_to = None
-
-            # if neko is moving to a specific location (i.e. user touched a spot)
-            if self.moving_to:
-                # if the target location is right of Neko
-                if (
-                    self.moving_to[0]
-                    > self.center_point[0] + self.CONFIG_STEP_SIZE // 2
-                ):
-                    # if the target location is below Neko
-                    if (
-                        self.moving_to[1]
-                        > self.center_point[1] + self.CONFIG_STEP_SIZE // 2
-                    ):
-                        # move down and to the right
-                        self.current_state = self.STATE_MOVING_DOWN_RIGHT
-
-                    # if the target location is above Neko
-                    elif (
-                        self.moving_to[1]
-                        < self.center_point[1] - self.CONFIG_STEP_SIZE // 2
-                    ):
-                        # move up and to the right
-                        self.current_state = self.STATE_MOVING_UP_RIGHT
-
-                    # same Y position
-                    else:
-                        # move to the right
-                        self.current_state = self.STATE_MOVING_RIGHT
-
-                # if the target location is left of Neko
-                elif (
-                    self.moving_to[0]
-                    < self.center_point[0] - self.CONFIG_STEP_SIZE // 2
-                ):
-                    # if the target location is below Neko
-                    if (
-                        self.moving_to[1]
-                        > self.center_point[1] + self.CONFIG_STEP_SIZE // 2
-                    ):
-                        # move down and to the left
-                        self.current_state = self.STATE_MOVING_DOWN_LEFT
-                    # if the target location is above Neko
-                    elif (
-                        self.moving_to[1]
-                        < self.center_point[1] - self.CONFIG_STEP_SIZE // 2
-                    ):
-                        # move up and to the left
-                        self.current_state = self.STATE_MOVING_UP_LEFT
-
-                    # same Y position
-                    else:
-                        # move to the left
-                        self.current_state = self.STATE_MOVING_LEFT
-
-                # same X position
-                else:
-                    # if the target location is below Neko
-                    if (
-                        self.moving_to[1]
-                        > self.center_point[1] + self.CONFIG_STEP_SIZE // 2
-                    ):
-                        # move downwards
-                        self.current_state = self.STATE_MOVING_DOWN
-                    # if the target location is above Neko
-                    elif (
-                        self.moving_to[1]
-                        < self.center_point[1] - self.CONFIG_STEP_SIZE // 2
-                    ):
-                        # move upwards
-                        self.current_state = self.STATE_MOVING_UP
+        # read the clock once; every state change and the animation step share it
+        _now = time.monotonic() if now is None else now
+        _start_x = self.x
+        _start_y = self.y
+        _start_tile = self[0]
+
+        _table = self.STATE_TABLE
+
+        # if neko is following a path (i.e. user touched or dragged) and is
+        #   about to take a step, steer for the head of the path
+        if self._path_count and _now > self.LAST_ANIMATION_TIME + self._animation_time:
+            _target_x = self._path_x[self._path_start]
+            _target_y = self._path_y[self._path_start]
+
+            # while the head waypoint is between the left/right and top/bottom
+            #   edges of Neko, move on to the next one
+            while (
+                self.x < _target_x < self.x + self.TILE_WIDTH
+                and self.y < _target_y < self.y + self.TILE_HEIGHT
+            ):
+                self._next_waypoint()
+                if not self._path_count:
+                    # reached the end; change to either sleeping or cleaning states
+                    self._set_state(self._random.choice(self._REST_IDS), _now)
+                    break
+                _target_x = self._path_x[self._path_start]
+                _target_y = self._path_y[self._path_start]
+
+            if self._path_count:
+                # steer from Neko's center point toward the head waypoint;
+                #   within half a step counts as the same position
+                _state_id = _table.heading(
+                    _target_x - (self.x + self.TILE_WIDTH // 2),
+                    _target_y - (self.y + self.TILE_HEIGHT // 2),
+                    self.CONFIG_STEP_SIZE // 2,
+                )
+                if _state_id != _table.NO_STATE:
+                    self._set_state(_state_id, _now)
 
         # attempt animation
-        did_animate = self.animate()
+        did_animate = self.animate(_now)
 
         # if we did do an animation step
         if did_animate:
+            _flags = _table.flags[self._CURRENT_STATE_ID]
+
             # if Neko is in a moving state
-            if self.is_moving:
+            if _flags & _table.MOVING:
                 # random chance to start sleeping or cleaning
-                _roll = random.randint(0, self.CONFIG_STOP_CHANCE_FACTOR - 1)
+                _roll = self._random.randint(0, self.CONFIG_STOP_CHANCE_FACTOR - 1)
                 if _roll == 0:
                     # change to new state: sleeping or cleaning
-                    _chosen_state = random.choice(
-                        (self.STATE_CLEANING, self.STATE_SLEEPING)
-                    )
-                    self.current_state = _chosen_state
-            else:  # cat is not moving
-
-                # if we are currently in a scratching state
-                if len(self.current_state[self._ANIMATION_LIST]) <= 2:
-
-                    # check if we have scratched the minimum time
-                    if (
-                        _now
-                        >= self.LAST_STATE_CHANGE_TIME + self.CONFIG_MIN_SCRATCH_TIME
-                    ):
-                        # minimum scratch time has elapsed
-
-                        # random chance to start moving
-                        _roll = random.randint(0, self.CONFIG_START_CHANCE_FACTOR - 1)
-                        if _roll == 0:
-                            # start moving in a random direction
-                            _chosen_state = random.choice(self.MOVING_STATES)
-                            self.current_state = _chosen_state
-
-                else:  # if we are sleeping or cleaning
-
-                    # if we have done every step of the animation
-                    if self.CURRENT_ANIMATION_INDEX == 0:
-                        # change to a random moving state
-                        _chosen_state = random.choice(self.MOVING_STATES)
-                        self.current_state = _chosen_state
+                    self._set_state(self._random.choice(self._REST_IDS), _now)
+
+            # if we are currently in a scratching (or sitting) state
+            elif _flags & _table.SCRATCHING:
+
+                # check if we have scratched the minimum time
+                if _now >= self.LAST_STATE_CHANGE_TIME + self.CONFIG_MIN_SCRATCH_TIME:
+                    # minimum scratch time has elapsed
+
+                    # random chance to start moving
+                    _roll = self._random.randint(0, self.CONFIG_START_CHANCE_FACTOR - 1)
+                    if _roll == 0:
+                        # start moving in a random direction
+                        self._set_state(self._random.choice(_table.moving_ids), _now)
+
+            # if we are sleeping or cleaning and have done every step of the animation
+            elif self.CURRENT_ANIMATION_INDEX == 0 and self._hold_count == 0:
+                # change to a random moving state
+                self._set_state(self._random.choice(_table.moving_ids), _now)
 
             # If we are far enough away from side walls
             # to take a step in the current moving direction
-            if (
-                0
-                <= (self.x + self.current_state[self._MOVEMENT_STEP][0])
-                < (self._display_size[0] - self.TILE_WIDTH)
-            ):
-
+            _step = _table.step_x[self._CURRENT_STATE_ID] * self._scale
+            if 0 <= self.x + _step < self._display_size[0] - self.TILE_WIDTH:
                 # move the cat horizontally by current state step size x
-                self.x += self.current_state[self._MOVEMENT_STEP][0]
+                self.x += _step
 
             else:  # we ran into a side wall
                 if self.x > self.CONFIG_STEP_SIZE:
                     # ran into right wall
                     self.x = self._display_size[0] - self.TILE_WIDTH - 1
                     # change state to scratching right
-                    self.current_state = self.STATE_SCRATCHING_RIGHT
+                    self._set_state(self.STATE_SCRATCHING_RIGHT[self._ID], _now)
                 else:
                     # ran into left wall
                     self.x = 1
                     # change state to scratching left
-                    self.current_state = self.STATE_SCRATCHING_LEFT
+                    self._set_state(self.STATE_SCRATCHING_LEFT[self._ID], _now)
 
             # If we are far enough away from top and bottom walls
             # to step in the current moving direction
-            if (
-                0
-                <= (self.y + self.current_state[self._MOVEMENT_STEP][1])
-                < (self._display_size[1] - self.TILE_HEIGHT)
-            ):
-
+            _step = _table.step_y[self._CURRENT_STATE_ID] * self._scale
+            if 0 <= self.y + _step < self._display_size[1] - self.TILE_HEIGHT:
                 # move the cat vertically by current state step size y
-                self.y += self.current_state[self._MOVEMENT_STEP][1]
+                self.y += _step
 
             else:  # ran into top or bottom wall
                 if self.y > self.CONFIG_STEP_SIZE:
                     # ran into bottom wall
                     self.y = self._display_size[1] - self.TILE_HEIGHT - 1
                     # change state to scratching down
-                    self.current_state = self.STATE_SCRATCHING_DOWN
+                    self._set_state(self.STATE_SCRATCHING_DOWN[self._ID], _now)
                 else:
                     # ran into top wall
                     self.y = 1
                     # change state to scratching up
-                    self.current_state = self.STATE_SCRATCHING_UP
+                    self._set_state(self.STATE_SCRATCHING_UP[self._ID], _now)
+
+        return self.x != _start_x or self.y != _start_y or self[0] != _start_tile
@@ -0,0 +1,565 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# neko_herd.py  2022-12-23 1.0.0 Cedar Grove Studios
+
+import time
+import random
+from array import array
+from neko_helpers.neko import NekoAnimatedSprite as _Neko
+from neko_helpers.spatial_grid import SpatialGrid
+
+# Compiled state tables shared with NekoAnimatedSprite, indexed by state ID
+_TABLE = _Neko.STATE_TABLE
+_SPRITE = _TABLE.sprite
+_HOLD = _TABLE.hold
+_ENTRY_START = _TABLE.entry_start
+_ENTRY_COUNT = _TABLE.entry_count
+_FLAGS = _TABLE.flags
+_STEP_X = _TABLE.step_x
+_STEP_Y = _TABLE.step_y
+_DIRECTION = _TABLE.direction
+_MOVING = _TABLE.MOVING
+_SCRATCHING = _TABLE.SCRATCHING
+_NO_STATE = _TABLE.NO_STATE
+
+# State IDs; random choices use the same order as NekoAnimatedSprite
+_SITTING = _Neko.STATE_SITTING[_Neko._ID]
+_SCRATCHING_LEFT = _Neko.STATE_SCRATCHING_LEFT[_Neko._ID]
+_SCRATCHING_RIGHT = _Neko.STATE_SCRATCHING_RIGHT[_Neko._ID]
+_SCRATCHING_DOWN = _Neko.STATE_SCRATCHING_DOWN[_Neko._ID]
+_SCRATCHING_UP = _Neko.STATE_SCRATCHING_UP[_Neko._ID]
+_REST_IDS = _Neko._REST_IDS
+_MOVING_IDS = _TABLE.moving_ids
+_WAKE_IDS = _Neko._WAKE_IDS
+
+
+class NekoHerd:
+    """The NekoHerd class animates a whole herd of cats in a single pass with
+    the same behavior as `NekoAnimatedSprite.update`. Per-cat location, state,
+    animation index and timestamps are kept in compact parallel arrays and the
+    results are written back to plain displayio.TileGrid objects, which keeps
+    the per-cat RAM and per-frame cost low enough for large herds.
+
+    Optional herd behaviors make the cats aware of each other: a walking cat
+    turns away from a cat it is about to walk into (AVOID) or may fall in
+    behind a nearby walking cat (FOLLOW), and `gather` sends the cats near the
+    laser dot toward it (GATHER). Neighbors are found with a SpatialGrid of
+    TILE_WIDTH cells that is updated as cats move, so each cat's check costs
+    about the number of cats near it rather than the size of the herd. With
+    no behaviors the herd matches `NekoAnimatedSprite.update` exactly.
+
+    Like `NekoAnimatedSprite`, each cat follows a path of up to
+    CONFIG_WAYPOINTS waypoints, e.g. from a touch drag; the paths are held in
+    one flat ring buffer array with a slice per cat.
+
+    :param integer capacity: The maximum number of cats in the herd.
+    :param tuple display_size: Tuple containing width and height of display.
+    :param integer behaviors: Any of AVOID, FOLLOW and GATHER added together.
+    :param rng: Source of the herd's random choices; any object with `randint`
+     and `choice`. Defaults to the `random` module.
+    :param integer scale: How many times larger than TILE_WIDTH x TILE_HEIGHT
+     the sprite sheet was pre-scaled; see `NekoAnimatedSprite`."""
+
+    CONFIG_STEP_SIZE = _Neko.CONFIG_STEP_SIZE
+    CONFIG_STOP_CHANCE_FACTOR = _Neko.CONFIG_STOP_CHANCE_FACTOR
+    CONFIG_START_CHANCE_FACTOR = _Neko.CONFIG_START_CHANCE_FACTOR
+    CONFIG_MIN_SCRATCH_TIME = _Neko.CONFIG_MIN_SCRATCH_TIME
+    CONFIG_WAYPOINTS = _Neko.CONFIG_WAYPOINTS
+    TILE_WIDTH = _Neko.TILE_WIDTH
+    TILE_HEIGHT = _Neko.TILE_HEIGHT
+
+    # herd behavior flags
+    AVOID = 0x01
+    FOLLOW = 0x02
+    GATHER = 0x04
+
+    # how close (pixels) another cat must be before a walking cat turns away
+    CONFIG_AVOID_DISTANCE = TILE_WIDTH * 3 // 4
+
+    # how far (pixels) a walking cat looks for other cats
+    CONFIG_NEIGHBOR_DISTANCE = TILE_WIDTH
+
+    # how likely a walking cat is to follow a nearby walking cat.
+    # lower number means more likely to happen
+    CONFIG_FOLLOW_CHANCE_FACTOR = 4
+
+    # the most neighbors considered by one cat and the most cats gathered
+    CONFIG_MAX_NEIGHBORS = 8
+    CONFIG_MAX_GATHER = 16
+
+    # timestamps are float32 offsets from the herd's epoch, which moves ahead
+    #   by whole multiples of this many seconds (a power of two, so the
+    #   offsets shift exactly) once the clock passes it; a float32 offset
+    #   below 2048 resolves better than a quarter millisecond where the raw
+    #   clock would resolve only ~8 ms after a day of uptime
+    REBASE_TIME = 1024
+
+    def __init__(self, capacity, display_size, behaviors=0, rng=None, scale=1):
+        self._display_size = display_size
+        self._random = random if rng is None else rng
+
+        # a pre-scaled sprite sheet has larger tiles; steps and distances
+        #   grow with them
+        self._scale = scale
+        if scale != 1:
+            self.TILE_WIDTH = self.TILE_WIDTH * scale
+            self.TILE_HEIGHT = self.TILE_HEIGHT * scale
+            self.CONFIG_STEP_SIZE = self.CONFIG_STEP_SIZE * scale
+            self.CONFIG_AVOID_DISTANCE = self.CONFIG_AVOID_DISTANCE * scale
+            self.CONFIG_NEIGHBOR_DISTANCE = self.CONFIG_NEIGHBOR_DISTANCE * scale
+        self._count = 0
+        self.grids = []
+        # number of animation frames shown by all cats
+        self.frames_animated = 0
+        self._grid_index = {}
+
+        self._x = array("h", [0] * capacity)
+        self._y = array("h", [0] * capacity)
+        # waypoint path ring buffers, CONFIG_WAYPOINTS slots per cat:
+        #   locations from each cat's head (start) onward
+        self._path_x = array("h", [0] * (capacity * self.CONFIG_WAYPOINTS))
+        self._path_y = array("h", [0] * (capacity * self.CONFIG_WAYPOINTS))
+        self._path_start = bytearray(capacity)
+        self._path_count = bytearray(capacity)
+        self._path_changes = array("H", [0] * capacity)
+        self._state = bytearray(capacity)
+        self._anim_index = bytearray(capacity)
+        self._hold_count = bytearray(capacity)
+        self._tile = bytearray(capacity)
+        self._sort_rank = array("H", [0] * capacity)
+        self._animation_time = array("f", [0] * capacity)
+        # timestamps relative to _epoch; -1 is before the first animation
+        self._epoch = 0
+        self._last_animation = array("f", [-1] * capacity)
+        self._last_state_change = array("f", [-1] * capacity)
+
+        # neighbor index and reusable query results for the herd behaviors
+        self._behaviors = behaviors
+        self._grid = None
+        if behaviors:
+            self._grid = SpatialGrid(display_size, self.TILE_WIDTH, capacity)
+            self._found = array("h", [0] * self.CONFIG_MAX_NEIGHBORS)
+            self._gathered = array("h", [0] * self.CONFIG_MAX_GATHER)
+
+    def __len__(self):
+        return self._count
+
+    def add(self, grid, animation_time=0.3, fill=0):
+        """Add a cat to the herd. The cat starts sitting at the grid's location.
+        :param displayio.TileGrid grid: A 1x1 TileGrid of the Neko sprite sheet.
+        :param float animation_time: How long to wait in-between animation frames.
+        :param integer fill: The cat's fill color, used as a depth tie-breaker.
+        :return integer: The cat's index in the herd.
+        """
+        _i = self._count
+        self.grids.append(grid)
+        self._grid_index[grid] = _i
+        self._x[_i] = grid.x
+        self._y[_i] = grid.y
+        self._state[_i] = _SITTING
+        self._anim_index[_i] = 0
+        self._hold_count[_i] = 0
+        self._tile[_i] = grid[0]
+        self._sort_rank[_i] = (fill >> 8) & 0xFFFF
+        self._animation_time[_i] = animation_time
+        if self._grid:
+            self._grid.insert(_i, grid.x, grid.y)
+        self._count += 1
+        return _i
+
+    def location(self, index):
+        """The x/y location of a cat.
+        :param integer index: The cat's index in the herd.
+        """
+        return self._x[index], self._y[index]
+
+    def set_location(self, index, x, y):
+        """Move a cat to a new x/y location.
+        :param integer index: The cat's index in the herd.
+        """
+        self._x[index] = x
+        self._y[index] = y
+        self.grids[index].x = x
+        self.grids[index].y = y
+        if self._grid:
+            self._grid.move(index, x, y)
+
+    def state_id(self, index):
+        """The integer ID of a cat's current state.
+        :param integer index: The cat's index in the herd.
+        """
+        return self._state[index]
+
+    def next_animation_time(self):
+        """The monotonic time of the next animation frame of any cat in the herd,
+        or None if the herd is empty.
+        """
+        _next = None
+        for _i in range(self._count):
+            _time = self._last_animation[_i] + self._animation_time[_i]
+            if _next is None or _time < _next:
+                _next = _time
+        return None if _next is None else self._epoch + _next
+
+    def _herd_time(self, now):
+        """A monotonic time as an offset from the herd's epoch, first moving
+        the epoch and every stored timestamp ahead if `now` has passed
+        REBASE_TIME seconds beyond it.
+        :param float now: The current monotonic time.
+        :return float: Seconds since the epoch.
+        """
+        _offset = now - self._epoch
+        if _offset >= self.REBASE_TIME:
+            _shift = _offset // self.REBASE_TIME * self.REBASE_TIME
+            self._epoch += _shift
+            _offset -= _shift
+            for _i in range(self._count):
+                self._last_animation[_i] -= _shift
+                self._last_state_change[_i] -= _shift
+        return _offset
+
+    def sort_key(self, grid):
+        """Integer depth sort key for a cat's grid; matches
+        `NekoAnimatedSprite.sort_key`.
+        :param displayio.TileGrid grid: A grid that was added to the herd.
+        """
+        _i = self._grid_index[grid]
+        return (self._y[_i] << 16) | self._sort_rank[_i]
+
+    def moving_to(self, index):
+        """Tuple with x/y location a cat is moving towards (the head of its
+        waypoint path) or None.
+        :param integer index: The cat's index in the herd.
+        """
+        return self.path_head(index)
+
+    def set_moving_to(self, index, new_moving_to):
+        """Replace a cat's whole path with a single x/y location, clamped to
+        keep the cat on the display the same way as
+        `NekoAnimatedSprite.moving_to`.
+        :param integer index: The cat's index in the herd.
+        :param tuple new_moving_to: The x/y target location or None.
+        """
+        self.clear_path(index)
+        if new_moving_to:
+            self.add_waypoint(index, new_moving_to[0], new_moving_to[1])
+
+    def path_head(self, index):
+        """Tuple with the x/y location of the waypoint a cat is heading for,
+        or None if its path is empty.
+        :param integer index: The cat's index in the herd.
+        """
+        if not self._path_count[index]:
+            return None
+        _head = index * self.CONFIG_WAYPOINTS + self._path_start[index]
+        return self._path_x[_head], self._path_y[_head]
+
+    def waypoints(self, index):
+        """The number of waypoints in a cat's path, including the head.
+        :param integer index: The cat's index in the herd.
+        """
+        return self._path_count[index]
+
+    def path_changes(self, index):
+        """A count that changes whenever the head of a cat's path changes, so
+        that whatever shows it (e.g. the laser dot) can tell when to read
+        `path_head` again.
+        :param integer index: The cat's index in the herd.
+        """
+        return self._path_changes[index]
+
+    def add_waypoint(self, index, x, y):
+        """Add a location to the end of a cat's path; see
+        `NekoAnimatedSprite.add_waypoint`. The location is clamped to keep the
+        cat on the display, points closer than CONFIG_STEP_SIZE to the previous
+        waypoint are dropped and a full path drops its oldest waypoint.
+        :param integer index: The cat's index in the herd.
+        :param integer x: The waypoint's x location.
+        :param integer y: The waypoint's y location.
+        :return bool: True if the waypoint was added.
+        """
+        _half_w = self.TILE_WIDTH // 2 + 1
+        _half_h = self.TILE_HEIGHT // 2 + 1
+        _x = min(max(x, _half_w), self._display_size[0] - _half_w)
+        _y = min(max(y, _half_h), self._display_size[1] - _half_h)
+        _size = self.CONFIG_WAYPOINTS
+        _base = index * _size
+        _count = self._path_count[index]
+        if _count:
+            _last = _base + (self._path_start[index] + _count - 1) % _size
+            _dx = _x - self._path_x[_last]
+            _dy = _y - self._path_y[_last]
+            if _dx * _dx + _dy * _dy < self.CONFIG_STEP_SIZE * self.CONFIG_STEP_SIZE:
+                return False
+        if _count == _size:
+            # full; skip ahead past the oldest waypoint
+            self._next_waypoint(index)
+        _end = _base + (self._path_start[index] + self._path_count[index]) % _size
+        self._path_x[_end] = _x
+        self._path_y[_end] = _y
+        self._path_count[index] += 1
+        if self._path_count[index] == 1:
+            self._path_changes[index] = (self._path_changes[index] + 1) & 0xFFFF
+        return True
+
+    def clear_path(self, index):
+        """Remove every waypoint from a cat's path.
+        :param integer index: The cat's index in the herd.
+        """
+        if self._path_count[index]:
+            self._path_count[index] = 0
+            self._path_changes[index] = (self._path_changes[index] + 1) & 0xFFFF
+
+    def _next_waypoint(self, index):
+        # drop the head of a cat's path
+        self._path_start[index] = (self._path_start[index] + 1) % self.CONFIG_WAYPOINTS
+        self._path_count[index] -= 1
+        self._path_changes[index] = (self._path_changes[index] + 1) & 0xFFFF
+
+    def gather(self, location, radius):
+        """Send the cats near a location, e.g. the laser dot, toward it. The
+        cats aim for spots scattered within half a tile of the location.
+        HomeNeko (the first cat) is left to its own target.
+        :param tuple location: The x/y location to gather at.
+        :param integer radius: How far (pixels) to look for cats.
+        :return integer: The number of cats sent.
+        """
+        if not self._behaviors & self.GATHER:
+            return 0
+        _x = location[0] - self.TILE_WIDTH // 2
+        _y = location[1] - self.TILE_HEIGHT // 2
+        _count = self._grid.neighbors(_x, _y, radius, self._gathered, 0)
+        _spread = self.TILE_WIDTH // 2
+        for _k in range(_count):
+            self.set_moving_to(
+                self._gathered[_k],
+                (
+                    location[0] + self._random.randint(-_spread, _spread),
+                    location[1] + self._random.randint(-_spread, _spread),
+                ),
+            )
+        return _count
+
+    def _steer(self, index, x, y, now):
+        """Apply the herd behaviors to a walking cat before it takes a step."""
+        _found = self._found
+        _count = self._grid.neighbors(x, y, self.CONFIG_NEIGHBOR_DISTANCE, _found, index)
+        if not _count:
+            return
+
+        # the nearest other cat
+        _nearest = _found[0]
+        _nearest_distance = -1
+        for _k in range(_count):
+            _j = _found[_k]
+            _distance = (self._x[_j] - x) ** 2 + (self._y[_j] - y) ** 2
+            if _nearest_distance < 0 or _distance < _nearest_distance:
+                _nearest = _j
+                _nearest_distance = _distance
+
+        if self._behaviors & self.AVOID and _nearest_distance < self.CONFIG_AVOID_DISTANCE ** 2:
+            # turn directly away from the nearest cat
+            _dx = x - self._x[_nearest]
+            _dy = y - self._y[_nearest]
+            _state = _DIRECTION[((_dx > 0) - (_dx < 0) + 1) * 3 + (_dy > 0) - (_dy < 0) + 1]
+            if _state != _NO_STATE:
+                self._set_state(index, _state, now)
+        elif self._behaviors & self.FOLLOW and _FLAGS[self._state[_nearest]] & _MOVING:
+            # random chance to walk the same way as the nearest cat
+            if self._random.randint(0, self.CONFIG_FOLLOW_CHANCE_FACTOR - 1) == 0:
+                self._set_state(index, self._state[_nearest], now)
+
+    def _set_state(self, index, state_id, now):
+        # only change if the cat isn't already in the new state
+        if self._state[index] != state_id:
+            self._state[index] = state_id
+            self._anim_index[index] = 0
+            self._hold_count[index] = 0
+            self._tile[index] = _SPRITE[_ENTRY_START[state_id]]
+            self._last_state_change[index] = now
+
+    def update(self, moved=None, now=None):
+        # pylint: disable=too-many-branches,too-many-statements,too-many-locals
+        """Animate and move every cat in the herd, then write the changes to
+        the cats' TileGrids.
+
+        :param function moved: Called with each TileGrid whose sprite or
+         location changed, e.g. `DepthOrder.moved`.
+        :param float now: The current monotonic time, e.g. the latest
+         `AnimationTick` time. Read from the clock if None.
+        :return integer: The number of cats whose sprite or location changed.
+        """
+        # timestamps below are herd time, relative to the epoch
+        _now = self._herd_time(time.monotonic() if now is None else now)
+        _random = self._random
+        _xs = self._x
+        _ys = self._y
+        _path_x = self._path_x
+        _path_y = self._path_y
+        _path_start = self._path_start
+        _path_count = self._path_count
+        _waypoints = self.CONFIG_WAYPOINTS
+        _states = self._state
+        _anim_index = self._anim_index
+        _hold_count = self._hold_count
+        _tiles = self._tile
+        _last_animation = self._last_animation
+        _tile_w = self.TILE_WIDTH
+        _tile_h = self.TILE_HEIGHT
+        _half_step = self.CONFIG_STEP_SIZE // 2
+        _scale = self._scale
+        _max_x = self._display_size[0] - _tile_w
+        _max_y = self._display_size[1] - _tile_h
+        _changes = 0
+        _frames = 0
+
+        for _i in range(self._count):
+            _x = _xs[_i]
+            _y = _ys[_i]
+            _start_tile = _tiles[_i]
+
+            # if the cat is following a path (i.e. user touched or dragged)
+            #   and is about to take a step, steer for the head of the path
+            if _path_count[_i] and _now > _last_animation[_i] + self._animation_time[_i]:
+                _base = _i * _waypoints
+                _tx = _path_x[_base + _path_start[_i]]
+                _ty = _path_y[_base + _path_start[_i]]
+
+                # while the head waypoint is within the cat, move on to the
+                #   next one
+                while _x < _tx < _x + _tile_w and _y < _ty < _y + _tile_h:
+                    self._next_waypoint(_i)
+                    if not _path_count[_i]:
+                        # reached the end; change to either sleeping or cleaning states
+                        self._set_state(_i, _random.choice(_REST_IDS), _now)
+                        break
+                    _tx = _path_x[_base + _path_start[_i]]
+                    _ty = _path_y[_base + _path_start[_i]]
+
+                if _path_count[_i]:
+                    # steer from the cat's center toward the head waypoint
+                    _state = _TABLE.heading(
+                        _tx - _x - _tile_w // 2, _ty - _y - _tile_h // 2, _half_step
+                    )
+                    if _state != _NO_STATE:
+                        self._set_state(_i, _state, _now)
+
+            # is it time to do an animation step?
+            if _now > _last_animation[_i] + self._animation_time[_i]:
+                _state = _states[_i]
+                _entry = _ENTRY_START[_state] + _anim_index[_i]
+                _tiles[_i] = _SPRITE[_entry]
+                # move to the next entry once this one's hold is over
+                _index = _anim_index[_i]
+                _held = _hold_count[_i] + 1
+                if _held >= _HOLD[_entry]:
+                    _held = 0
+                    _index += 1
+                    if _index >= _ENTRY_COUNT[_state]:
+                        _index = 0
+                    _anim_index[_i] = _index
+                _hold_count[_i] = _held
+                _last_animation[_i] = _now
+                _frames += 1
+
+                _flags = _FLAGS[_state]
+                if _flags & _MOVING:
+                    # random chance to start sleeping or cleaning
+                    if _random.randint(0, self.CONFIG_STOP_CHANCE_FACTOR - 1) == 0:
+                        self._set_state(_i, _random.choice(_REST_IDS), _now)
+                elif _flags & _SCRATCHING:
+                    # scratching (or sitting); start moving after the minimum time
+                    if _now >= self._last_state_change[_i] + self.CONFIG_MIN_SCRATCH_TIME:
+                        if _random.randint(0, self.CONFIG_START_CHANCE_FACTOR - 1) == 0:
+                            self._set_state(_i, _random.choice(_MOVING_IDS), _now)
+                elif _index == 0 and _held == 0:
+                    # finished sleeping or cleaning; start moving
+                    self._set_state(_i, _random.choice(_MOVING_IDS), _now)
+
+                # a walking cat without a path reacts to the cats around it
+                if self._grid and _FLAGS[_states[_i]] & _MOVING and not _path_count[_i]:
+                    self._steer(_i, _x, _y, _now)
+
+                # take a step or scratch at a side wall
+                _step = _STEP_X[_states[_i]] * _scale
+                if 0 <= _x + _step < _max_x:
+                    _x += _step
+                elif _x > self.CONFIG_STEP_SIZE:
+                    _x = _max_x - 1
+                    self._set_state(_i, _SCRATCHING_RIGHT, _now)
+                else:
+                    _x = 1
+                    self._set_state(_i, _SCRATCHING_LEFT, _now)
+
+                # take a step or scratch at the top or bottom wall
+                _step = _STEP_Y[_states[_i]] * _scale
+                if 0 <= _y + _step < _max_y:
+                    _y += _step
+                elif _y > self.CONFIG_STEP_SIZE:
+                    _y = _max_y - 1
+                    self._set_state(_i, _SCRATCHING_DOWN, _now)
+                else:
+                    _y = 1
+                    self._set_state(_i, _SCRATCHING_UP, _now)
+
+            # write any changes back to the cat's TileGrid
+            if _x != _xs[_i] or _y != _ys[_i] or _tiles[_i] != _start_tile:
+                _grid = self.grids[_i]
+                if _tiles[_i] != _start_tile:
+                    _grid[0] = _tiles[_i]
+                if _x != _xs[_i]:
+                    _xs[_i] = _x
+                    _grid.x = _x
+                if _y != _ys[_i]:
+                    _ys[_i] = _y
+                    _grid.y = _y
+                if self._grid:
+                    self._grid.move(_i, _x, _y)
+                _changes += 1
+                if moved:
+                    moved(_grid)
+
+        self.frames_animated += _frames
+        return _changes
+
+    def fast_forward(self, elapsed, moved=None):
+        """Advance every cat by a period of time in a single catch-up step; see
+        `NekoAnimatedSprite.fast_forward`.
+
+        :param float elapsed: How much time to skip. Unit is seconds.
+        :param function moved: Called with each TileGrid that was changed.
+        :return: None
+        """
+        _now = self._herd_time(time.monotonic())
+        _max_x = self._display_size[0] - self.TILE_WIDTH - 1
+        _max_y = self._display_size[1] - self.TILE_HEIGHT - 1
+        for _i in range(self._count):
+            _frames = int(elapsed / self._animation_time[_i])
+            if _frames < 1:
+                continue
+            if self._path_count[_i]:
+                # the cat had plenty of time to walk the path; settle at its end
+                _last = _i * self.CONFIG_WAYPOINTS + (
+                    self._path_start[_i] + self._path_count[_i] - 1
+                ) % self.CONFIG_WAYPOINTS
+                _new_x = self._path_x[_last] - self.TILE_WIDTH // 2
+                _new_y = self._path_y[_last] - self.TILE_HEIGHT // 2
+                self.clear_path(_i)
+            else:
+                # anywhere inside the walls within the missed steps' reach
+                _reach = _frames * self.CONFIG_STEP_SIZE
+                _new_x = self._random.randint(
+                    max(self._x[_i] - _reach, 1), min(self._x[_i] + _reach, _max_x)
+                )
+                _new_y = self._random.randint(
+                    max(self._y[_i] - _reach, 1), min(self._y[_i] + _reach, _max_y)
+                )
+            self.set_location(
+                _i, min(max(_new_x, 1), _max_x), min(max(_new_y, 1), _max_y)
+            )
+            self._set_state(_i, self._random.choice(_WAKE_IDS), _now)
+            self.grids[_i][0] = self._tile[_i]
+            self._last_animation[_i] = self._last_state_change[_i] = _now
+            if moved:
+                moved(self.grids[_i])
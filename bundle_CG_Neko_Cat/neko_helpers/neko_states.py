@@ -0,0 +1,100 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# neko_states.py  2022-12-27 1.0.0 Cedar Grove Studios
+
+from array import array
+
+
+class StateTable:
+    """The StateTable class compiles Neko state objects and their animations
+    into integer-indexed lookup tables so that state checks are a single index
+    operation rather than tuple comparisons. Tables are indexed by state ID.
+
+    State object format: (ID, (Step Sizes))
+
+    Animations come from an AnimationBank: each state's animation is a run of
+    entries, each a sprite index and the number of animation frames it is
+    held for (see `entry_start`, `entry_count`, `sprite` and `hold`).
+
+    :param tuple states: Every state object; IDs must be 0 to len(states) - 1.
+    :param tuple moving_states: The state objects that count as moving, in the
+     order used for random choices.
+    :param AnimationBank bank: The animations, one for each state ID."""
+
+    # flag bits
+    MOVING = 0x01
+    # short (two frames or fewer) resting animations: scratching and sitting
+    SCRATCHING = 0x02
+
+    # direction table value for "no change"
+    NO_STATE = 0xFF
+
+    # tan(22.5 degrees) in 8-bit fixed point; headings closer than this to an
+    #   axis walk straight along it
+    _TAN_22_5 = 106
+
+    def __init__(self, states, moving_states, bank):
+        _states = sorted(states)
+        _count = len(_states)
+        if bank.state_count != _count:
+            raise ValueError(f"animation bank has {bank.state_count} states, expected {_count}")
+
+        # the state objects, indexed by ID
+        self.states = tuple(_states)
+
+        # animation entries for all states, concatenated
+        self.entry_start = bank.entry_start
+        self.entry_count = bank.entry_count
+        self.sprite = bank.sprite
+        self.hold = bank.hold
+
+        # movement step vectors
+        self.step_x = array("b", [_state[1][0] for _state in _states])
+        self.step_y = array("b", [_state[1][1] for _state in _states])
+
+        # moving state IDs in random choice order
+        self.moving_ids = bytes(_state[0] for _state in moving_states)
+
+        # state flags
+        self.flags = bytearray(_count)
+        for _state in _states:
+            if _state in moving_states:
+                self.flags[_state[0]] |= self.MOVING
+            elif bank.frame_count(_state[0]) <= 2:
+                self.flags[_state[0]] |= self.SCRATCHING
+
+        # moving state for each direction, indexed by the signs of the
+        #   horizontal and vertical distance: (sign_x + 1) * 3 + (sign_y + 1)
+        self.direction = bytearray([self.NO_STATE] * 9)
+        for _state in moving_states:
+            _sign_x = (_state[1][0] > 0) - (_state[1][0] < 0)
+            _sign_y = (_state[1][1] > 0) - (_state[1][1] < 0)
+            self.direction[(_sign_x + 1) * 3 + _sign_y + 1] = _state[0]
+
+    def heading(self, distance_x, distance_y, dead_zone=0):
+        """The moving state that heads most directly along a distance, chosen
+        with integer fixed-point math. A distance within `dead_zone` counts as
+        zero along that axis; headings within 22.5 degrees of an axis walk
+        straight along it, otherwise diagonally.
+        :param integer distance_x: Horizontal distance to the target.
+        :param integer distance_y: Vertical distance to the target.
+        :param integer dead_zone: Distance that counts as arrived on an axis.
+        :return integer: A moving state ID, or NO_STATE if already there.
+        """
+        _abs_x = distance_x if distance_x >= 0 else -distance_x
+        _abs_y = distance_y if distance_y >= 0 else -distance_y
+        _sign_x = 0 if _abs_x <= dead_zone else (1 if distance_x > 0 else -1)
+        _sign_y = 0 if _abs_y <= dead_zone else (1 if distance_y > 0 else -1)
+        if _sign_x and _sign_y:
+            if _abs_y * 256 < _abs_x * self._TAN_22_5:
+                _sign_y = 0
+            elif _abs_x * 256 < _abs_y * self._TAN_22_5:
+                _sign_x = 0
+        return self.direction[(_sign_x + 1) * 3 + _sign_y + 1]
+
+    def first_sprite(self, state_id):
+        """The sprite index shown when a state begins.
+        :param integer state_id: The state ID.
+        """
+        return self.sprite[self.entry_start[state_id]]
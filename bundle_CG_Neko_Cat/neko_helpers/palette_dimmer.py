@@ -0,0 +1,102 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# palette_dimmer.py  2023-01-12 1.0.0 Cedar Grove Studios
+
+from array import array
+
+
+class PaletteDimmer:
+    """The PaletteDimmer class dims the display by scaling palette colors
+    instead of the backlight, for panels whose brightness can't be adjusted.
+    Each added palette's colors are scaled once to every dim level with
+    integer math and kept in a table, so changing the level only copies
+    table entries into the palettes. Levels are spaced by a perceptual gamma;
+    the top level is the palette's own colors. Transparency is not changed.
+
+    :param integer levels: Number of dim levels above off.
+    :param float gamma: Perceptual gamma of the dim levels."""
+
+    def __init__(self, levels=16, gamma=2.2):
+        self._levels = levels
+        # color scale (0 to 256) of each level
+        self._scale = array("H", [0] * (levels + 1))
+        for _level in range(1, levels + 1):
+            self._scale[_level] = int(256 * (_level / levels) ** gamma + 0.5)
+
+        # the added palettes and their scaled colors; a palette's table holds
+        #   every entry for level 0, then every entry for level 1, and so on
+        self._palettes = []
+        self._tables = []
+        self._level = levels
+
+    @property
+    def levels(self):
+        """The number of dim levels above off."""
+        return self._levels
+
+    @property
+    def bytes_held(self):
+        """Bytes held by the scaled color tables."""
+        return sum(len(_table) for _table in self._tables) * 4
+
+    @property
+    def level(self):
+        """The current dim level, 0 (off) to `levels` (full).
+        :param integer new_level:
+        """
+        return self._level
+
+    @level.setter
+    def level(self, new_level):
+        new_level = min(max(new_level, 0), self._levels)
+        if new_level != self._level:
+            self._level = new_level
+            for _palette, _table in zip(self._palettes, self._tables):
+                self._show(_palette, _table)
+
+    def add(self, palette):
+        """Scale a palette's current colors to every level and show it at the
+        current level.
+        :param displayio.Palette palette: The palette to dim.
+        """
+        _count = len(palette)
+        _table = array("L", [0] * (_count * (self._levels + 1)))
+        for _index in range(_count):
+            self._fill(_table, _count, _index, palette[_index])
+        self._palettes.append(palette)
+        self._tables.append(_table)
+        self._show(palette, _table)
+
+    def recolor(self, palette, index, color):
+        """Change the full-brightness color of an added palette's entry. The
+        entry is rescaled and shown at the current level.
+        :param displayio.Palette palette: The palette.
+        :param integer index: The palette entry.
+        :param integer color: 24-bit RGB full-brightness color.
+        """
+        for _palette, _table in zip(self._palettes, self._tables):
+            if _palette is palette:
+                _count = len(palette)
+                self._fill(_table, _count, index, color)
+                palette[index] = _table[self._level * _count + index]
+                return
+        raise ValueError("palette was not added to the dimmer")
+
+    def _fill(self, table, count, index, color):
+        # scale one color to every level
+        _red = (color >> 16) & 0xFF
+        _green = (color >> 8) & 0xFF
+        _blue = color & 0xFF
+        _scale = self._scale
+        for _level in range(self._levels + 1):
+            _s = _scale[_level]
+            table[_level * count + index] = (
+                (_red * _s >> 8) << 16 | (_green * _s >> 8) << 8 | _blue * _s >> 8
+            )
+
+    def _show(self, palette, table):
+        _count = len(palette)
+        _first = self._level * _count
+        for _index in range(_count):
+            palette[_index] = table[_first + _index]
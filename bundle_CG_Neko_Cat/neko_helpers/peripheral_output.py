@@ -0,0 +1,100 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# peripheral_output.py  2023-01-13 1.0.0 Cedar Grove Studios
+
+import time
+
+
+class PeripheralOutput:
+    """The PeripheralOutput class stands between the code that computes an
+    output value and the peripheral that shows it. Setting `value` only
+    records the value; `flush`, called once per main loop iteration, writes
+    the latest value to the peripheral if it differs from the last value
+    written and the previous write was at least 1/`max_rate` seconds ago.
+    Values set between flushes are coalesced into one write. The `requests`
+    and `writes` counters show how many writes were saved.
+
+    :param function writer: A function that accepts a value and writes it to
+     the peripheral.
+    :param integer max_rate: Most writes per second; 0 for no limit."""
+
+    def __init__(self, writer, max_rate=30):
+        self._write = writer
+        self._min_interval = 1 / max_rate if max_rate else 0
+        self._value = None
+        self._written = None
+        self._last_write = -1
+        # number of values set and of writes made to the peripheral
+        self.requests = 0
+        self.writes = 0
+
+    @property
+    def value(self):
+        """The latest value, written or not.
+        :param integer new_value:
+        """
+        return self._value
+
+    @value.setter
+    def value(self, new_value):
+        self._value = new_value
+        self.requests += 1
+
+    @property
+    def pending(self):
+        """True if the latest value has not been written yet."""
+        return self._value != self._written
+
+    def flush(self, force=False):
+        """Write the latest value if it changed and a write is due.
+        :param bool force: Write a changed value now, ignoring `max_rate`.
+        :return bool: True if the peripheral was written.
+        """
+        if self._value == self._written:
+            return False
+        _now = time.monotonic()
+        if not force and _now < self._last_write + self._min_interval:
+            return False
+        self._write(self._value)
+        self._written = self._value
+        self._last_write = _now
+        self.writes += 1
+        return True
+
+
+class PixelOutput(PeripheralOutput):
+    """A NeoPixel color. Each write is a bit-banged transfer to the strip when
+    the strip's `auto_write` is on.
+
+    :param neopixel.NeoPixel pixel: The NeoPixel strip.
+    :param integer index: The pixel's position in the strip.
+    :param integer max_rate: Most writes per second; 0 for no limit."""
+
+    def __init__(self, pixel, index=0, max_rate=30):
+        super().__init__(self._write_pixel, max_rate)
+        self._pixel = pixel
+        self._index = index
+
+    def _write_pixel(self, value):
+        self._pixel[self._index] = value
+
+
+class BacklightOutput(PeripheralOutput):
+    """The display backlight as a duty cycle from 0 (off) to 0xFFFF (full). The
+    PWM backlight (`display.lite`) is written directly when present, otherwise
+    `display.brightness`.
+
+    :param cedargrove_display.Display display: The display.
+    :param integer max_rate: Most writes per second; 0 for no limit."""
+
+    def __init__(self, display, max_rate=30):
+        super().__init__(self._write_backlight, max_rate)
+        self._display = display
+        self._lite = getattr(display, "lite", None)
+
+    def _write_backlight(self, value):
+        if self._lite:
+            self._lite.duty_cycle = value
+        else:
+            self._display.brightness = value / 0xFFFF
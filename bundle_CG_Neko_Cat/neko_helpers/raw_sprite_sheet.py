@@ -0,0 +1,57 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# raw_sprite_sheet.py  2023-01-04 1.0.0 Cedar Grove Studios
+
+"""Load a raw sprite sheet made by `tools/convert_sprite_sheet.py`. The pixel
+rows are stored in displayio.Bitmap's own memory layout so they are read
+straight from the file into the bitmap without decoding each pixel."""
+
+import struct
+import displayio
+
+MAGIC = b"CGSS"
+VERSION = 1
+# magic, version, bits per value, width, height, palette count, stride, reserved
+_HEADER = "<4sBBHHHHH"
+_HEADER_SIZE = 16
+
+
+def load(path):
+    """Read a raw sprite sheet file into a bitmap and a palette.
+    :param str path: The raw sprite sheet file path.
+    :return tuple: (displayio.Bitmap, displayio.Palette)
+    """
+    _header = bytearray(_HEADER_SIZE)
+    with open(path, "rb") as _file:
+        _file.readinto(_header)
+        _magic, _version, _bits, _width, _height, _count, _stride, _ = struct.unpack(
+            _HEADER, _header
+        )
+        if _magic != MAGIC or _version != VERSION:
+            raise ValueError("not a raw sprite sheet: " + path)
+
+        _colors = bytearray(_count * 4)
+        _file.readinto(_colors)
+        palette = displayio.Palette(_count)
+        for _index in range(_count):
+            palette[_index] = struct.unpack_from("<I", _colors, _index * 4)[0]
+        del _colors
+
+        bitmap = displayio.Bitmap(_width, _height, _count)
+        try:
+            # the bitmap's buffer has the same row layout as the file
+            _file.readinto(memoryview(bitmap))
+        except (TypeError, NotImplementedError):
+            # no buffer protocol; bitmaptools unpacks the rows in C. Each file
+            #   word is little-endian with the first pixel in its top bits.
+            import bitmaptools
+
+            bitmaptools.readinto(
+                bitmap,
+                _file,
+                bits_per_pixel=_bits,
+                element_size=4,
+                swap_bytes_in_element=True,
+            )
+    return bitmap, palette
@@ -0,0 +1,56 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# render_controller.py  2022-12-22 1.0.0 Cedar Grove Studios
+
+import time
+
+
+class RenderController:
+    """The RenderController class takes over display refreshing from displayio's
+    background auto refresh. Anything that changes the screen calls
+    `mark_dirty`; `refresh` is called once per main loop iteration and pushes a
+    single refresh to the panel only when something changed, no more often
+    than `max_fps`. The display bus stays idle while nothing changes.
+
+    This dirty flag and `max_fps` are the only pacing: displayio is given no
+    target frame rate, which would make it skip a refresh called late after an
+    idle stretch and block the next one until the frame period lines up.
+
+    :param cedargrove_display.Display display: The display to refresh.
+    :param integer max_fps: Upper limit of refreshes per second."""
+
+    def __init__(self, display, max_fps=30):
+        self._display = display
+        self._min_interval = 1 / max_fps
+        self._last_refresh = -1
+        self._dirty = True
+        # number of refreshes pushed to the panel
+        self.refreshes = 0
+
+        self._display.auto_refresh = False
+
+    @property
+    def dirty(self):
+        """True if the screen has changed since the last refresh."""
+        return self._dirty
+
+    def mark_dirty(self):
+        """Note that something on the screen changed."""
+        self._dirty = True
+
+    def refresh(self):
+        """Refresh the display if it is dirty and the frame interval has passed.
+        :return bool: True if the display was refreshed.
+        """
+        if not self._dirty:
+            return False
+        _now = time.monotonic()
+        if _now < self._last_refresh + self._min_interval:
+            return False
+        if self._display.refresh(minimum_frames_per_second=0):
+            self._dirty = False
+            self._last_refresh = _now
+            self.refreshes += 1
+            return True
+        return False
@@ -0,0 +1,136 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# spatial_grid.py  2023-01-08 1.0.0 Cedar Grove Studios
+
+from array import array
+
+
+class SpatialGrid:
+    """The SpatialGrid class is a uniform grid index of item locations that
+    answers "which items are near here" by looking only at the grid cells
+    around the location, so a query costs about the number of nearby items
+    rather than the number of items. Items are small integers (e.g. a cat's
+    index in the herd); each cell holds a doubly linked list of its items kept
+    in fixed arrays, so moving an item only relinks it when it crosses into
+    another cell and nothing is allocated after construction.
+
+    :param tuple display_size: Tuple containing width and height of the area.
+    :param integer cell_size: Width and height of a grid cell in pixels.
+    :param integer capacity: The number of items, indexed 0 to capacity - 1."""
+
+    # empty list link
+    _NONE = -1
+
+    def __init__(self, display_size, cell_size=32, capacity=100):
+        self._cell_size = cell_size
+        self._columns = max(1, -(-display_size[0] // cell_size))
+        self._rows = max(1, -(-display_size[1] // cell_size))
+        # first item in each cell
+        self._head = array("h", [self._NONE] * (self._columns * self._rows))
+        # each item's cell and its neighbors in the cell's list
+        self._cell = array("h", [self._NONE] * capacity)
+        self._next = array("h", [self._NONE] * capacity)
+        self._prev = array("h", [self._NONE] * capacity)
+        self._x = array("h", [0] * capacity)
+        self._y = array("h", [0] * capacity)
+        # number of items examined by queries
+        self.visits = 0
+
+    def _cell_of(self, x, y):
+        _column = min(max(x // self._cell_size, 0), self._columns - 1)
+        _row = min(max(y // self._cell_size, 0), self._rows - 1)
+        return _row * self._columns + _column
+
+    def _link(self, item, cell):
+        _head = self._head[cell]
+        self._cell[item] = cell
+        self._prev[item] = self._NONE
+        self._next[item] = _head
+        if _head != self._NONE:
+            self._prev[_head] = item
+        self._head[cell] = item
+
+    def _unlink(self, item):
+        _next = self._next[item]
+        _prev = self._prev[item]
+        if _prev != self._NONE:
+            self._next[_prev] = _next
+        else:
+            self._head[self._cell[item]] = _next
+        if _next != self._NONE:
+            self._prev[_next] = _prev
+        self._cell[item] = self._NONE
+
+    def insert(self, item, x, y):
+        """Add an item at a location.
+        :param integer item: The item, 0 to capacity - 1.
+        :param integer x: The item's x location.
+        :param integer y: The item's y location.
+        """
+        if self._cell[item] != self._NONE:
+            self._unlink(item)
+        self._x[item] = x
+        self._y[item] = y
+        self._link(item, self._cell_of(x, y))
+
+    def move(self, item, x, y):
+        """Update an item's location; the item changes lists only when it
+        crosses into another cell.
+        :param integer item: An item that was inserted.
+        :param integer x: The item's new x location.
+        :param integer y: The item's new y location.
+        """
+        self._x[item] = x
+        self._y[item] = y
+        _cell = self._cell_of(x, y)
+        if _cell != self._cell[item]:
+            self._unlink(item)
+            self._link(item, _cell)
+
+    def remove(self, item):
+        """Remove an item from the index.
+        :param integer item: An item that was inserted.
+        """
+        if self._cell[item] != self._NONE:
+            self._unlink(item)
+
+    def neighbors(self, x, y, radius, found, exclude=_NONE):
+        """Find the items within a square distance of a location.
+        :param integer x: The x location to search around.
+        :param integer y: The y location to search around.
+        :param integer radius: The largest x or y distance to an item.
+        :param array found: Receives the items found; the search stops when
+         it is full.
+        :param integer exclude: An item to leave out, e.g. the one searching.
+        :return integer: The number of items written to `found`.
+        """
+        _size = self._cell_size
+        _column_start = max((x - radius) // _size, 0)
+        _column_end = min((x + radius) // _size, self._columns - 1)
+        _row_start = max((y - radius) // _size, 0)
+        _row_end = min((y + radius) // _size, self._rows - 1)
+        _xs = self._x
+        _ys = self._y
+        _next = self._next
+        _count = 0
+        _visits = 0
+        _limit = len(found)
+        for _row in range(_row_start, _row_end + 1):
+            for _column in range(_column_start, _column_end + 1):
+                _item = self._head[_row * self._columns + _column]
+                while _item != self._NONE:
+                    _visits += 1
+                    if (
+                        _item != exclude
+                        and -radius <= _xs[_item] - x <= radius
+                        and -radius <= _ys[_item] - y <= radius
+                    ):
+                        found[_count] = _item
+                        _count += 1
+                        if _count >= _limit:
+                            self.visits += _visits
+                            return _count
+                    _item = _next[_item]
+        self.visits += _visits
+        return _count
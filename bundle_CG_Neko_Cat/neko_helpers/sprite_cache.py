@@ -0,0 +1,198 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# sprite_cache.py  2022-12-20 1.0.0 Cedar Grove Studios
+
+import gc
+import displayio
+
+
+class SpriteSheetCache:
+    """The SpriteSheetCache class decodes each sprite sheet file once and shares
+    the resulting bitmap with every sprite that asks for it. Each request
+    receives its own copy of the sheet's palette so that sprites can be colored
+    independently. Sheets are reference counted and are released from memory
+    when the last sprite using a sheet gives it back. A sheet may also be
+    cached pre-scaled by an integer factor, made once from the decoded sheet.
+
+    :param function loader: A function that accepts a file path and returns a
+     (bitmap, palette) tuple. Defaults to `raw_sprite_sheet.load` for ``.raw``
+     files and `adafruit_imageload.load` for anything else."""
+
+    # Sheet entry indexes
+    _BITMAP = 0
+    _PALETTE = 1
+    _REFS = 2
+    _BYTES = 3
+    _PRELOADS = 4
+
+    def __init__(self, loader=None):
+        self._loader = loader
+        self._sheets = {}
+
+    def _load(self, path):
+        """Decode a sprite sheet file into a bitmap and a master palette."""
+        if self._loader:
+            return self._loader(path)
+
+        if path.endswith(".raw"):
+            from neko_helpers import raw_sprite_sheet
+
+            return raw_sprite_sheet.load(path)
+
+        import adafruit_imageload
+
+        return adafruit_imageload.load(
+            path,
+            bitmap=displayio.Bitmap,
+            palette=displayio.Palette,
+        )
+
+    @staticmethod
+    def bitmap_bytes(bitmap, value_count):
+        """Estimate the RAM used by a bitmap's pixel buffer. displayio stores
+        pixels packed into 32-bit words per row using the smallest power-of-two
+        bit depth that will hold `value_count` values.
+        :param displayio.Bitmap bitmap: The bitmap to measure.
+        :param integer value_count: The number of values the bitmap can hold.
+        """
+        bits = 1
+        while (1 << bits) < value_count:
+            bits *= 2
+        stride = (bitmap.width * bits + 31) // 32
+        return stride * 4 * bitmap.height
+
+    @staticmethod
+    def scale_bitmap(bitmap, scale):
+        """Make a copy of a bitmap enlarged by an integer factor; each pixel
+        becomes a `scale` x `scale` block. Each source row is expanded once and
+        written to its block of rows with `bitmaptools.arrayblit` when
+        available.
+        :param displayio.Bitmap bitmap: The bitmap to enlarge.
+        :param integer scale: The enlargement factor.
+        """
+        try:
+            from bitmaptools import arrayblit
+        except ImportError:
+            arrayblit = None
+        _width = bitmap.width
+        scaled = displayio.Bitmap(_width * scale, bitmap.height * scale, 1 << bitmap.bits_per_value)
+        _row_size = _width * scale
+        # one expanded row repeated for each row of the block
+        _block = bytearray(_row_size * scale)
+        for _y in range(bitmap.height):
+            for _x in range(_width):
+                _value = bitmap[_x, _y]
+                for _i in range(_x * scale, _x * scale + scale):
+                    _block[_i] = _value
+            for _row in range(1, scale):
+                _block[_row * _row_size:(_row + 1) * _row_size] = _block[0:_row_size]
+            _top = _y * scale
+            if arrayblit:
+                arrayblit(scaled, _block, 0, _top, _row_size, _top + scale)
+            else:
+                for _row in range(scale):
+                    for _x in range(_row_size):
+                        scaled[_x, _top + _row] = _block[_x]
+        return scaled
+
+    @staticmethod
+    def clone_palette(palette):
+        """Create an independent copy of a palette, including transparency.
+        :param displayio.Palette palette: The palette to copy.
+        """
+        clone = displayio.Palette(len(palette))
+        for index in range(len(palette)):
+            clone[index] = palette[index]
+            if palette.is_transparent(index):
+                clone.make_transparent(index)
+        return clone
+
+    def _entry(self, path, scale):
+        """The cache entry for a sprite sheet file, decoding or scaling it
+        first if it isn't cached. A scaled sheet is made from the cached
+        unscaled sheet when there is one."""
+        sheet = self._sheets.get((path, scale))
+        if sheet is None:
+            if scale == 1:
+                bitmap, palette = self._load(path)
+            else:
+                _unscaled = self._sheets.get((path, 1))
+                if _unscaled:
+                    bitmap, palette = _unscaled[self._BITMAP], _unscaled[self._PALETTE]
+                else:
+                    bitmap, palette = self._load(path)
+                bitmap = self.scale_bitmap(bitmap, scale)
+            sheet = [bitmap, palette, 0, self.bitmap_bytes(bitmap, len(palette)), 0]
+            self._sheets[(path, scale)] = sheet
+        return sheet
+
+    def preload(self, path, scale=1):
+        """Decode a sprite sheet file, or scale it, into the cache without
+        making a palette for it, e.g. to measure it before any sprite needs
+        it. Preloading takes a reference like `acquire`; the sheet stays
+        cached until it is given back with `release(..., preload=True)`.
+        :param str path: The sprite sheet file path.
+        :param integer scale: The sheet's enlargement factor.
+        :return displayio.Bitmap: The shared bitmap.
+        """
+        sheet = self._entry(path, scale)
+        sheet[self._REFS] += 1
+        sheet[self._PRELOADS] += 1
+        return sheet[self._BITMAP]
+
+    def acquire(self, path, scale=1):
+        """Get the shared bitmap for a sprite sheet file and a private palette.
+        The file is only decoded the first time it is requested.
+        :param str path: The sprite sheet file path.
+        :param integer scale: The sheet's enlargement factor.
+        :return tuple: (displayio.Bitmap, displayio.Palette)
+        """
+        sheet = self._entry(path, scale)
+        sheet[self._REFS] += 1
+        return sheet[self._BITMAP], self.clone_palette(sheet[self._PALETTE])
+
+    def release(self, path, scale=1, preload=False):
+        """Return a sprite sheet acquired with `acquire` or preloaded with
+        `preload`. The bitmap is freed when no sprites or preloads are using
+        it.
+        :param str path: The sprite sheet file path.
+        :param integer scale: The sheet's enlargement factor.
+        :param bool preload: Give back a `preload` reference rather than a
+         sprite's.
+        """
+        sheet = self._sheets.get((path, scale))
+        if sheet is None:
+            return
+        if preload and sheet[self._PRELOADS]:
+            sheet[self._PRELOADS] -= 1
+        sheet[self._REFS] -= 1
+        if sheet[self._REFS] <= 0:
+            del self._sheets[(path, scale)]
+            gc.collect()
+
+    def references(self, path, scale=1):
+        """The number of references held to a sprite sheet file by sprites
+        and preloads.
+        :param str path: The sprite sheet file path.
+        :param integer scale: The sheet's enlargement factor.
+        """
+        sheet = self._sheets.get((path, scale))
+        if sheet is None:
+            return 0
+        return sheet[self._REFS]
+
+    @property
+    def bytes_held(self):
+        """The estimated number of bitmap bytes held by the cache."""
+        return sum(sheet[self._BYTES] for sheet in self._sheets.values())
+
+    @property
+    def bytes_saved(self):
+        """The estimated number of bitmap bytes saved by sharing sheets rather
+        than loading a copy for each sprite. Preloads are not sprites and save
+        nothing."""
+        return sum(
+            sheet[self._BYTES] * max(sheet[self._REFS] - sheet[self._PRELOADS] - 1, 0)
+            for sheet in self._sheets.values()
+        )
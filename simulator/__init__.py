@@ -0,0 +1,12 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+"""Host-side simulator for the Neko Cat bundle. Runs the device code under
+CPython with fake hardware modules and a virtual clock.
+
+    python -m simulator.benchmark --cats 1 6 --duration 60
+"""
+
+from simulator.clock import SimulationComplete, VirtualClock
+from simulator.hardware import FakeTouchController, Hardware
+from simulator.runner import BUNDLE_ROOT, Report, Simulator
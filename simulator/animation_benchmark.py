@@ -0,0 +1,93 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# animation_benchmark.py  2023-01-11 1.0.0 Cedar Grove Studios
+
+"""Report what the animation bank costs and saves. The RAM held by the
+animations is estimated on CircuitPython's heap (16-byte blocks, 4-byte
+object words) for the bank and for the same animations written out as one
+tuple of sprite indexes per state, with the third state field that held it.
+Each run then reports animation frames, TileGrid tile writes and pixels
+pushed per second; a cat that writes its sprite on every frame makes at
+least one write per frame.
+
+    python -m simulator.animation_benchmark --cats 1 6
+"""
+
+import argparse
+import importlib
+
+from simulator.benchmark import touch_script
+from simulator.runner import Simulator
+
+# CircuitPython heap allocation unit and object word size
+BLOCK = 16
+WORD = 4
+
+
+def heap_bytes(size):
+    """Heap blocks taken by an allocation of `size` bytes, in bytes."""
+    return -(-size // BLOCK) * BLOCK
+
+
+def animation_ram():
+    """Estimated heap bytes of the animations as a bank and as tuples.
+    :return tuple: (bank bytes, tuple bytes, state count, frame count)
+    """
+    sim = Simulator(step=0, duration=None)
+    with sim.installed():
+        neko = importlib.import_module("neko_helpers.neko").NekoAnimatedSprite
+        table = neko.STATE_TABLE
+        states = len(table.states)
+        frames = [
+            sum(table.hold[table.entry_start[state]:table.entry_start[state] + table.entry_count[state]])
+            for state in range(states)
+        ]
+        bank_size = 8 + states + 2 * len(table.sprite)
+
+    # bank: the buffer and its object, three memoryviews and the entry starts
+    bank = (
+        heap_bytes(bank_size) + heap_bytes(4 * WORD)
+        + 3 * heap_bytes(4 * WORD)
+        + heap_bytes(2 * states) + heap_bytes(4 * WORD)
+    )
+    # tuples: an animation tuple and a third state tuple field for each
+    #   state, plus the flat frame table and its start and count tables
+    tuples = (
+        sum(heap_bytes(2 * WORD + WORD * count) for count in frames)
+        + states * (heap_bytes(5 * WORD) - heap_bytes(4 * WORD))
+        + heap_bytes(sum(frames)) + heap_bytes(4 * WORD)
+        + heap_bytes(2 * states) + heap_bytes(4 * WORD)
+        + heap_bytes(states) + heap_bytes(4 * WORD)
+    )
+    return bank, tuples, states, sum(frames)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cats", type=int, nargs="+", default=[1, 6])
+    parser.add_argument("--duration", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    bank, tuples, states, frames = animation_ram()
+    print(
+        f"animations: {states} states, {frames} frames; "
+        f"heap as bank {bank} bytes, as tuples {tuples} bytes"
+    )
+    for cats in args.cats:
+        for engine in ("sprites", "herd"):
+            sim = Simulator(cats=cats, duration=args.duration, seed=args.seed,
+                config={"USE_HERD_ENGINE": engine == "herd"})
+            touch_script(sim.touch, args.duration)
+            report = sim.run()
+            print(
+                f"cats={cats:3d}  {engine:7s}  frames={report.frames:5d}  "
+                f"tile writes={report.stats.tile_writes:5d} "
+                f"({report.stats.tile_writes / max(report.frames, 1):4.2f}/frame)  "
+                f"px/s={report.pixels_per_second:7.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
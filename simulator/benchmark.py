@@ -0,0 +1,73 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# benchmark.py  2022-12-20 1.0.0 Cedar Grove Studios
+
+"""Run the Neko main loop in the host simulator for a fixed simulated
+duration and report loop and animation rates for each herd size.
+
+    python -m simulator.benchmark --cats 1 3 6 --duration 60
+"""
+
+import argparse
+
+from simulator.runner import Simulator
+
+
+def touch_script(touch, duration):
+    """Tap a few spots so that HomeNeko also exercises the moving_to path."""
+    spots = ((60, 60), (260, 180), (160, 40), (40, 200))
+    at = 5.0
+    index = 0
+    while at < duration:
+        touch.tap(at, spots[index % len(spots)])
+        at += 10.0
+        index += 1
+
+
+def run(cats, duration, step=0.0005, seed=0, touch=True, config=None):
+    """Simulate one herd size and return its Report."""
+    sim = Simulator(cats=cats, duration=duration, step=step, seed=seed, config=config)
+    if touch:
+        touch_script(sim.touch, duration)
+    return sim.run()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cats", type=int, nargs="+", default=[1, 3, 6])
+    parser.add_argument("--duration", type=float, default=60.0,
+        help="simulated seconds per run")
+    parser.add_argument("--step", type=float, default=0.0005,
+        help="simulated seconds consumed by each clock read")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-touch", action="store_true",
+        help="do not script any touches")
+    parser.add_argument("--herd", action="store_true",
+        help="animate with the NekoHerd engine")
+    parser.add_argument("--profile", action="store_true",
+        help="enable the frame profiler and show its last report")
+    parser.add_argument("--tick", type=float, default=0,
+        help="animate on a shared tick of this many seconds")
+    parser.add_argument("--boot", action="store_true",
+        help="show the boot-timing report")
+    args = parser.parse_args(argv)
+    config = {"USE_HERD_ENGINE": args.herd, "PROFILE_FRAMES": args.profile}
+    if args.tick:
+        config.update(USE_ANIMATION_TICK=True, ANIMATION_TICK_TIME=args.tick)
+
+    print(f"Neko benchmark: {args.duration:.0f} simulated seconds per run")
+    for cats in args.cats:
+        report = run(cats, args.duration, args.step, args.seed, not args.no_touch, config)
+        print(report.summary())
+        if args.profile:
+            reports = [line for line in report.output.splitlines() if line.startswith("prof ")]
+            print("    " + (reports[-1] if reports else "prof: no report"))
+        if args.boot:
+            for line in report.output.splitlines():
+                if line.startswith("boot "):
+                    print("    " + line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# check_alloc.py  2022-12-28 1.0.0 Cedar Grove Studios
+
+"""Check that NekoAnimatedSprite.update allocates nothing in steady state.
+At each display profile's resolution a sprite following a dragged path, with
+its random choices drawn from the `random` module as in the main loop, is
+stepped through 10,000 updates under tracemalloc. A tracer measures the peak
+traced memory of every opcode executed, so each allocation is charged to the
+line that made it. Any allocating line of the bundle's code that is not in
+ALLOWED_SITES, an allowed line that makes more than one integer in an opcode,
+or any memory retained, fails the check.
+
+Lines of the modules in NATIVE_MODULES are not charged; they stand in for
+CircuitPython modules written in C. Their totals are reported. Objects that
+CPython reuses from its free lists, such as small tuples and floats, are not
+seen by tracemalloc.
+
+    python -m simulator.check_alloc --updates 10000
+"""
+
+import argparse
+import importlib
+import linecache
+import os
+import random
+import sys
+import tracemalloc
+
+from simulator import hardware
+from simulator.runner import BUNDLE_ROOT, Simulator
+
+SPRITE_SHEET = "/neko_helpers/neko_cat_spritesheet.bmp"
+
+# Simulated seconds per update; a binary fraction keeps the clock exact
+FRAME_TIME = 1 / 64
+
+# A dragged zig-zag path of waypoints, queued before tracing so that following
+#   the waypoint ring buffer is part of the traced updates
+DRAG_PATH = tuple((96 + 12 * i, 120 + (i % 3) * 24) for i in range(12))
+
+# Modules whose lines are not charged, and why
+NATIVE_MODULES = {
+    random.__file__: "CircuitPython's random module is native and returns small integers",
+    hardware.__file__: "the simulated displayio and time modules are native on the device",
+}
+
+# CPython only caches the integers -5 to 256 and makes every other integer
+#   result a heap object; CircuitPython keeps integers of up to 30 bits in the
+#   object pointer. These lines work with coordinates past 256 on the real
+#   display sizes, negative steps or fixed-point products, so on CPython each
+#   opcode in them may create one integer, and nothing else.
+_BOXED = "integer arithmetic; a heap object on CPython only"
+ALLOWED_SITES = {
+    ("neko.py", "_target_x - (self.x + self.TILE_WIDTH // 2),"): _BOXED,
+    ("neko.py", "_target_y - (self.y + self.TILE_HEIGHT // 2),"): _BOXED,
+    ("neko.py", "_step = _table.step_x[self._CURRENT_STATE_ID] * self._scale"): _BOXED,
+    ("neko.py", "_step = _table.step_y[self._CURRENT_STATE_ID] * self._scale"): _BOXED,
+    ("neko.py", "if 0 <= self.x + _step < self._display_size[0] - self.TILE_WIDTH:"): _BOXED,
+    ("neko.py", "if 0 <= self.y + _step < self._display_size[1] - self.TILE_HEIGHT:"): _BOXED,
+    ("neko.py", "self.x += _step"): _BOXED,
+    ("neko.py", "self.y += _step"): _BOXED,
+    ("neko.py", "self.x = self._display_size[0] - self.TILE_WIDTH - 1"): _BOXED,
+    ("neko.py", "self.y = self._display_size[1] - self.TILE_HEIGHT - 1"): _BOXED,
+    ("neko_states.py", "if _abs_y * 256 < _abs_x * self._TAN_22_5:"): _BOXED,
+    ("neko_states.py", "elif _abs_x * 256 < _abs_y * self._TAN_22_5:"): _BOXED,
+}
+
+# Updates stepped, following the dragged path, before counting starts, so
+#   that CPython has built the line tables the tracer needs
+WARM_UP_UPDATES = 1000
+
+
+class LineAllocations:
+    """A `sys.settrace` function that charges the peak traced memory reached
+    between trace events to the line that was running. Opcode events are
+    turned on so that the peak is reset before every opcode; the tracer's own
+    objects are released before the baseline is read.
+
+    Tracing makes CPython create a frame object for every Python call, which
+    is released after the call returns. Its size is left out of the calling
+    opcode's charge, and nothing is charged from a return to the caller's next
+    opcode."""
+
+    def __init__(self):
+        self.bytes = {}
+        self.count = {}
+        # the largest charge to a single opcode of each line
+        self.largest = {}
+        self._line = None
+        self._base = 0
+
+    def clear(self):
+        """Forget the charges so far."""
+        self.bytes.clear()
+        self.count.clear()
+        self.largest.clear()
+        self._line = None
+
+    def __call__(self, frame, event, arg):
+        current, peak = tracemalloc.get_traced_memory()
+        if event == "call":
+            # the new frame object was made for the tracer
+            peak -= sys.getsizeof(frame)
+            frame.f_trace_opcodes = True
+        if self._line is not None and peak > self._base:
+            _charge = peak - self._base
+            self.bytes[self._line] = self.bytes.get(self._line, 0) + _charge
+            self.count[self._line] = self.count.get(self._line, 0) + 1
+            self.largest[self._line] = max(self.largest.get(self._line, 0), _charge)
+        del current, peak
+        if event == "return":
+            self._line = None
+        else:
+            self._line = (frame.f_code.co_filename, frame.f_lineno)
+        self._base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        return self
+
+
+def _source(line):
+    return linecache.getline(*line).strip()
+
+
+def _make_integer(value):
+    return value + 1000
+
+
+def boxed_integer_charge():
+    """The charge the tracer makes for an opcode that creates one integer."""
+    lines = LineAllocations()
+    tracemalloc.start(1)
+    try:
+        sys.settrace(lines)
+        _make_integer(1000)
+        sys.settrace(None)
+    finally:
+        sys.settrace(None)
+        tracemalloc.stop()
+    return max(lines.largest.values())
+
+
+def count_allocations(display_size, updates=10000, seed=0):
+    """Step one sprite through `updates` updates with every line's
+    allocations traced.
+    :return tuple: (LineAllocations, retained snapshot statistics)
+    """
+    sim = Simulator(step=0, duration=None)
+    with sim.installed():
+        # A plain float clock; the VirtualClock's own read counters are
+        #   simulator bookkeeping that would otherwise be traced.
+        now = [1000.0]
+        sys.modules["time"].monotonic = lambda: now[0]
+
+        neko = importlib.import_module("neko_helpers.neko")
+        cache = importlib.import_module("neko_helpers.sprite_cache").SpriteSheetCache()
+        sheet, palette = cache.acquire(SPRITE_SHEET)
+        random.seed(seed)
+        sprite = neko.NekoAnimatedSprite(
+            animation_time=0.25,
+            display_size=display_size,
+            sprites=sheet,
+            palette=palette,
+            rng=random,
+        )
+        sprite.x = display_size[0] // 4
+        sprite.y = display_size[1] // 4
+        for x, y in DRAG_PATH:
+            sprite.add_waypoint(x, y)
+        # the timestamps are built before tracing starts so the loop itself
+        #   creates no objects
+        stamps = [now[0] + (_ + 1) * FRAME_TIME for _ in range(WARM_UP_UPDATES + updates)]
+
+        lines = LineAllocations()
+        tracemalloc.start(1)
+        try:
+            sys.settrace(lines)
+            for now[0] in stamps[:WARM_UP_UPDATES]:
+                sprite.update()
+            # drag the path again so the steering path is exercised too
+            sprite.clear_path()
+            for x, y in DRAG_PATH:
+                sprite.add_waypoint(x, y)
+            lines.clear()
+            before = tracemalloc.take_snapshot()
+            for now[0] in stamps[WARM_UP_UPDATES:]:
+                sprite.update()
+            sys.settrace(None)
+            after = tracemalloc.take_snapshot()
+        finally:
+            sys.settrace(None)
+            tracemalloc.stop()
+
+    # only count blocks allocated by the device code
+    device_code = (tracemalloc.Filter(True, os.path.join(BUNDLE_ROOT, "*")),)
+    retained = after.filter_traces(device_code).compare_to(
+        before.filter_traces(device_code), "lineno"
+    )
+    return lines, [stat for stat in retained if stat.size_diff > 0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--updates", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    with Simulator(step=0, duration=None).installed():
+        profiles = importlib.import_module("neko_helpers.cedargrove_display").DISPLAY_PROFILES
+        sizes = sorted({profile["size"] for profile in profiles if profile["size"]})
+    boxed = boxed_integer_charge()
+
+    ok = True
+    for size in sizes:
+        lines, retained = count_allocations(size, args.updates, args.seed)
+        native = dict.fromkeys(NATIVE_MODULES, 0)
+        charged = []
+        for line, size_bytes in lines.bytes.items():
+            if line[0] in native:
+                native[line[0]] += size_bytes
+            elif line[0].startswith(BUNDLE_ROOT):
+                charged.append(line)
+        print(f"{size[0]}x{size[1]}: {args.updates} updates, {len(charged)} allocating lines")
+        for line in sorted(charged):
+            name = os.path.basename(line[0])
+            reason = ALLOWED_SITES.get((name, _source(line)))
+            # an allowed line may only create one integer per opcode
+            allowed = reason and lines.largest[line] <= boxed
+            print(f"  {'allowed' if allowed else 'FAIL   '} {name}:{line[1]} "
+                f"{lines.count[line]} times, {lines.bytes[line]} bytes: {_source(line)}")
+            if reason:
+                print(f"          {reason}")
+            if not allowed:
+                ok = False
+        # an integer held as a sprite's location is not retained by update
+        for stat in retained:
+            if stat.size_diff > boxed or stat.count_diff > 1:
+                print(f"  FAIL    retained {stat}")
+                ok = False
+        for module, size_bytes in native.items():
+            if size_bytes:
+                print(f"  native  {os.path.basename(module)}: {size_bytes} bytes; "
+                    f"{NATIVE_MODULES[module]}")
+    if not ok:
+        print("FAIL: NekoAnimatedSprite.update allocated")
+        return 1
+    print("OK: NekoAnimatedSprite.update is allocation-free")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# check_dimming.py  2023-01-12 1.0.0 Cedar Grove Studios
+
+"""Check the screensaver's palette dimming (`palette_dimmer.PaletteDimmer`).
+Each run lets the screensaver fade the display out, wakes it with a tap and
+lets it fade back in. With palette dimming the cat and laser dot palettes
+must be black when the display is dark and back to their own colors once it
+is awake, and the backlight must not be written; with a backlight the
+palettes must not be touched. Palette entry writes, refreshes and pixels
+pushed during the fades are reported. Exits non-zero on a failure.
+
+    python -m simulator.check_dimming --cats 6
+"""
+
+import argparse
+import sys
+
+from simulator.runner import Simulator
+
+BUILT_IN = {
+    "DISPLAY_NAME": "built-in",
+    "CALIBRATION": ((5200, 59000), (5800, 57000)),
+    "ROTATION": 0,
+}
+
+# (name, built-in display board, built-in backlight, configuration, dimmed
+#   by palettes)
+CASES = (
+    ("built-in, no backlight", True, False, BUILT_IN, True),
+    ("2.4-inch, SOFTWARE_DIMMING", False, True, {"SOFTWARE_DIMMING": True}, True),
+    ("2.4-inch, backlight", False, True, {}, False),
+)
+
+# Screensaver script: dark after ACTIVE_TIME seconds awake, woken by a tap
+ACTIVE_TIME = 5
+WAKE_TAP = 14.0
+DURATION = 19.0
+
+
+class Watcher:
+    """Follows the main loop's screensaver state from a clock listener and
+    checks the palettes at each change of state."""
+
+    def __init__(self, sim, palette_dimming):
+        self.sim = sim
+        self.palette_dimming = palette_dimming
+        self.state = None
+        self.failures = []
+        self.awake = None
+        self.fade_start = None
+        # palette writes, refreshes, pixels and PWM writes over the fades
+        self.fades = [0, 0, 0, 0]
+        self.dimmer = None
+
+    def _palettes(self, code):
+        # every cat palette and the laser dot's; the background changes color
+        #   while the display is dark
+        palettes = list(code.nekos_paletts)
+        if code.circle is not None:
+            palettes.append(code.circle.pixel_shader)
+        return palettes
+
+    def _counts(self):
+        stats = self.sim.hardware.stats
+        return (stats.palette_writes, stats.refreshes, stats.pixels_pushed, stats.pwm_writes)
+
+    def __call__(self, now):
+        code = sys.modules.get("neko_code")
+        state = getattr(code, "_screensaver_state", None)
+        if state == self.state:
+            return
+        self.state = state
+        self.dimmer = code.dimmer
+        if self.palette_dimming != (code.dimmer is not None):
+            self.failures.append(f"palette dimmer is {code.dimmer}")
+            self.palette_dimming = code.dimmer is not None
+
+        # the first fade in is part of startup and isn't counted
+        if state == "DIM" or (state == "RESTORE" and self.awake is not None):
+            self.fade_start = self._counts()
+        elif self.fade_start is not None:
+            for i, (start, end) in enumerate(zip(self.fade_start, self._counts())):
+                self.fades[i] += end - start
+            self.fade_start = None
+
+        palettes = self._palettes(code)
+        colors = [[palette[i] for i in range(len(palette))] for palette in palettes]
+        if state == "DIM" and self.awake is None:
+            self.awake = colors
+        elif state == "DIMMED":
+            lit = [
+                palette[i] for palette in palettes for i in range(len(palette))
+                if palette[i] and not palette.is_transparent(i)
+            ]
+            if self.palette_dimming and lit:
+                self.failures.append(f"{len(lit)} palette entries still lit when dark")
+            if not self.palette_dimming and colors != self.awake:
+                self.failures.append("palettes changed by a backlight fade")
+        elif state == "ACTIVE" and self.awake is not None:
+            if colors != self.awake:
+                self.failures.append("palettes not restored when awake")
+
+
+def run(name, built_in_display, backlight, config, palette_dimming, cats):
+    """Run the screensaver script. :return list: Failure messages."""
+    config = dict(config, DISPLAY_ACTIVE_TIME=ACTIVE_TIME)
+    sim = Simulator(cats=cats, duration=DURATION, config=config,
+        built_in_display=built_in_display)
+    sim.hardware.backlight = backlight
+    # held past a dormant poll so that the resistive touchscreen sees it too
+    sim.touch.tap(WAKE_TAP, (100, 100), hold=0.5)
+    watcher = Watcher(sim, palette_dimming)
+    sim.clock.add_listener(watcher)
+    sim.run()
+
+    failures = watcher.failures
+    if watcher.awake is None or watcher.state != "ACTIVE":
+        failures.append(f"screensaver did not dim and wake (ended {watcher.state})")
+    palette_writes, refreshes, pixels, pwm_writes = watcher.fades
+    if palette_dimming and pwm_writes:
+        failures.append(f"{pwm_writes} backlight writes with palette dimming")
+    held = watcher.dimmer.bytes_held if watcher.dimmer else 0
+    print(
+        f"{name:28s} fades: palette writes={palette_writes:5d}  "
+        f"pwm writes={pwm_writes:4d}  refreshes={refreshes:4d}  "
+        f"px={pixels:8d}  tables={held} bytes"
+    )
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cats", type=int, default=6)
+    args = parser.parse_args(argv)
+
+    ok = True
+    for case in CASES:
+        for failure in run(*case, args.cats):
+            print(f"FAIL {case[0]}: {failure}")
+            ok = False
+    if not ok:
+        return 1
+    print("OK: palettes dim to black and restore; backlight fades leave them alone")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# check_display_profiles.py  2023-01-06 1.0.0 Cedar Grove Studios
+
+"""Check the display profile registry in `cedargrove_display`. Display names
+from `neko_configuration.py` and full profile names must each resolve to one
+profile, ambiguous or unknown names must be rejected, and every FeatherWing
+profile must build a display with its resolution, backlight PWM frequency,
+touch flip and SPI bus clock. Exits non-zero on a failure.
+
+    python -m simulator.check_display_profiles
+"""
+
+import contextlib
+import importlib
+import io
+import sys
+
+from simulator.runner import Simulator
+
+ILI9341 = "TFT FeatherWing - 2.4-inch 320x240 Touchscreen"
+HX8357 = "TFT FeatherWing - 3.5-inch 480x320 Touchscreen"
+
+# Boards: a Feather with a FeatherWing, a board with a built-in resistive
+#   touch display (PyPortal) and one with a display but no touch pins (CLUE)
+FEATHER = "Feather"
+TOUCH_DISPLAY = "PyPortal"
+DISPLAY_ONLY = "CLUE"
+
+# (display name, board, use_built_in, expected profile name or None to reject)
+RESOLUTIONS = (
+    ("2.4-inch", FEATHER, True, ILI9341),
+    ("3.5-inch", FEATHER, True, HX8357),
+    ("320x240", FEATHER, True, ILI9341),
+    (HX8357, FEATHER, True, HX8357),
+    ("built-in", TOUCH_DISPLAY, True, "built-in"),
+    ("", TOUCH_DISPLAY, True, "built-in"),
+    ("2.4-inch", TOUCH_DISPLAY, True, "built-in"),
+    ("3.5-inch", TOUCH_DISPLAY, True, "built-in"),
+    ("2.4-inch", TOUCH_DISPLAY, False, ILI9341),
+    ("", TOUCH_DISPLAY, False, "built-in"),
+    ("2.4-inch", DISPLAY_ONLY, True, ILI9341),
+    ("", DISPLAY_ONLY, True, "built-in"),
+    ("", FEATHER, True, None),
+    ("TFT FeatherWing", FEATHER, True, None),
+    ("5.0-inch", FEATHER, True, None),
+)
+
+REQUIRED_KEYS = ("name", "driver", "size", "touch_flip")
+FEATHERWING_KEYS = ("command", "chip_select", "touch_chip_select", "backlight",
+    "backlight_frequency", "baudrate")
+
+
+def resolve(name, board, use_built_in=True):
+    """Resolve a display name on a simulated board.
+    :return str: The profile name, or None if the name was rejected.
+    """
+    sim = Simulator(built_in_display=board != FEATHER)
+    with sim.installed():
+        if board == DISPLAY_ONLY:
+            for pin in ("TOUCH_XL", "TOUCH_XR", "TOUCH_YD", "TOUCH_YU"):
+                delattr(sys.modules["board"], pin)
+        module = importlib.import_module("neko_helpers.cedargrove_display")
+        try:
+            return module.find_profile(name, use_built_in)["name"]
+        except ValueError:
+            return None
+
+
+def build(name):
+    """Build a display from a profile. :return list: Failure messages."""
+    failures = []
+    sim = Simulator()
+    with sim.installed():
+        module = importlib.import_module("neko_helpers.cedargrove_display")
+        with contextlib.redirect_stdout(io.StringIO()):
+            display = module.Display(name=name, calibration=((0, 4095), (0, 4095)))
+        profile = display.profile
+        bus = display.display.bus
+        default_bus = importlib.import_module("displayio").FourWire(
+            None, command=None, chip_select=None
+        )
+        if (display.width, display.height) != profile["size"]:
+            failures.append(f"size {(display.width, display.height)} != {profile['size']}")
+        if display.lite.frequency != profile["backlight_frequency"]:
+            failures.append(f"backlight {display.lite.frequency} Hz")
+        if display.ts._touch_flip != profile["touch_flip"]:
+            failures.append(f"touch flip {display.ts._touch_flip}")
+        if bus.requested_baudrate != profile["baudrate"]:
+            failures.append(f"baudrate {bus.requested_baudrate} requested")
+        if bus.baudrate <= default_bus.baudrate:
+            failures.append(f"bus clock {bus.baudrate / 1e6:.2f} MHz is not above the default")
+        print(
+            f"{profile['name']:48s} {display.width}x{display.height}  "
+            f"spi={bus.baudrate / 1e6:.2f}MHz (default {default_bus.baudrate / 1e6:.2f})  "
+            f"pwm={display.lite.frequency}Hz  flip={profile['touch_flip']}"
+        )
+    return failures
+
+
+def main():
+    ok = True
+    sim = Simulator()
+    with sim.installed():
+        profiles = importlib.import_module("neko_helpers.cedargrove_display").DISPLAY_PROFILES
+    for profile in profiles:
+        keys = REQUIRED_KEYS + (FEATHERWING_KEYS if profile["driver"] else ())
+        missing = [key for key in keys if key not in profile]
+        if missing:
+            print(f"FAIL {profile.get('name')}: missing {', '.join(missing)}")
+            ok = False
+
+    for name, board, use_built_in, expected in RESOLUTIONS:
+        found = resolve(name, board, use_built_in)
+        if found != expected:
+            print(f"FAIL {name!r} on a {board} (use_built_in={use_built_in}): "
+                f"resolved to {found}, expected {expected}")
+            ok = False
+
+    for profile in profiles:
+        if profile["driver"]:
+            for failure in build(profile["name"]):
+                print(f"FAIL {profile['name']}: {failure}")
+                ok = False
+
+    if not ok:
+        return 1
+    print("OK: display profiles resolve and build as described")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# check_gc.py  2023-01-20 1.0.0 Cedar Grove Studios
+
+"""Check that the GcScheduler backs off when the live data alone holds free
+memory below GC_FREE_WATERMARK. The main loop is simulated with the
+configured watermark and with one above the whole modeled heap, which no
+collection can lift memory over. Collections per second must stay within
+one per GC_IDLE_INTERVAL plus the configured run's rate, rather than one per
+main loop iteration. Exits non-zero on a failure.
+
+    python -m simulator.check_gc --cats 6
+"""
+
+import argparse
+import importlib
+import sys
+
+from simulator.runner import Simulator
+
+# A watermark above the modeled heap; free memory is always below it
+STARVED_WATERMARK = 400000
+
+
+def collections_per_second(cats, duration, watermark=None):
+    """Simulate the main loop. :return tuple: (collections per simulated
+    second, main loop iterations per simulated second)"""
+    config = {"GC_FREE_WATERMARK": watermark} if watermark else None
+    report = Simulator(cats=cats, duration=duration, config=config).run()
+    return (report.stats.gc_collections / report.sim_seconds,
+        report.iterations / report.sim_seconds)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cats", type=int, default=6)
+    parser.add_argument("--duration", type=float, default=30.0)
+    args = parser.parse_args(argv)
+
+    with Simulator(step=0, duration=None).installed():
+        config = importlib.import_module("neko_configuration").Configuration
+        interval = config.GC_IDLE_INTERVAL
+    configured, loops = collections_per_second(args.cats, args.duration)
+    starved, _ = collections_per_second(args.cats, args.duration, STARVED_WATERMARK)
+    print(f"configured watermark  gc/s={configured:5.2f}  loops/s={loops:6.1f}")
+    print(f"starved watermark     gc/s={starved:5.2f}")
+    if starved > configured + 1 / interval + 0.1:
+        print("FAIL: low memory forces a collection on every main loop iteration")
+        return 1
+    print("OK: forced collections back off while live data holds memory low")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# check_touch.py  2022-12-31 1.0.0 Cedar Grove Studios
+
+"""Check the batched touch layer (`cedargrove_display.TouchInput`) against the
+fake STMPE610 driver. A scripted set of taps and a drag is polled through
+`Display.touch_event` and, on a fresh run, through the driver's
+`touch_point`. Taps must be reported within a pixel of the scripted touch and drag events
+within the stretch of the drag covered since the previous poll. SPI
+transactions per poll are reported for both.
+
+The conversion of raw samples to display coordinates by TouchInput and by the
+fake driver is first checked against `touch_point` results recorded from the
+real adafruit_stmpe610 1.3.9 driver for every rotation and touch flip, and
+the fake's raw samples must convert back to the display location they were
+made for. Exits non-zero on a mismatch.
+
+    python -m simulator.check_touch --poll 0.1
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import sys
+
+from simulator.runner import Simulator
+
+# (name, calibration, rotation) as in neko_configuration.py
+DISPLAYS = (
+    ("2.4-inch", ((406, 3607), (412, 3711)), 180),
+    ("3.5-inch", ((214, 3879), (421, 3775)), 0),
+)
+
+# Scripted taps (time, location) and one drag (time, start, end, duration)
+TAPS = ((0.5, (40, 40)), (1.5, (200, 120)), (2.5, (300, 220)), (3.5, (1, 1)))
+DRAG = (4.5, (20, 200), (220, 40), 1.0)
+DURATION = 6.0
+
+# Raw (x, y) samples, and the (x, y) that adafruit_stmpe610 1.3.9's
+#   touch_point returns for them with KNOWN_CALIBRATION on a 320x240 display,
+#   for each (rotation, touch_flip)
+KNOWN_CALIBRATION = ((406, 3607), (412, 3711))
+KNOWN_RAW = ((500, 3000), (2000, 1800), (3500, 600), (100, 4000))
+KNOWN_POINTS = (
+    ((0, (False, False)), ((259, 6), (139, 115), (19, 224), (320, 0))),
+    ((0, (True, False)), ((60, 6), (180, 115), (300, 224), (0, 0))),
+    ((0, (False, True)), ((259, 233), (139, 124), (19, 15), (320, 240))),
+    ((0, (True, True)), ((60, 233), (180, 124), (300, 15), (0, 240))),
+    ((90, (False, False)), ((6, 60), (115, 180), (224, 300), (0, 0))),
+    ((90, (True, False)), ((6, 259), (115, 139), (224, 19), (0, 320))),
+    ((90, (False, True)), ((233, 60), (124, 180), (15, 300), (240, 0))),
+    ((90, (True, True)), ((233, 259), (124, 139), (15, 19), (240, 320))),
+    ((180, (False, False)), ((60, 233), (180, 124), (300, 15), (0, 240))),
+    ((180, (True, False)), ((259, 233), (139, 124), (19, 15), (320, 240))),
+    ((180, (False, True)), ((60, 6), (180, 115), (300, 224), (0, 0))),
+    ((180, (True, True)), ((259, 6), (139, 115), (19, 224), (320, 0))),
+    ((270, (False, False)), ((233, 259), (124, 139), (15, 19), (240, 320))),
+    ((270, (True, False)), ((233, 60), (124, 180), (15, 300), (240, 0))),
+    ((270, (False, True)), ((6, 259), (115, 139), (224, 19), (0, 320))),
+    ((270, (True, True)), ((6, 60), (115, 180), (224, 300), (0, 0))),
+)
+
+
+def touched_since(touch, now, interval):
+    """The bounding box of the scripted locations over the past interval.
+    :return tuple: ((min x, min y), (max x, max y)), or None if untouched.
+    """
+    points = []
+    at = now - interval
+    while at <= now:
+        point = touch.point_at(at)
+        if point is not None:
+            points.append(point)
+        at += 1 / touch.sample_rate
+    if not points:
+        return None
+    return (
+        (min(p[0] for p in points), min(p[1] for p in points)),
+        (max(p[0] for p in points), max(p[1] for p in points)),
+    )
+
+
+def check_mapping():
+    """Convert the known raw samples with TouchInput and the fake driver.
+    :return bool: True if both match touch_point and the fake's raw samples
+     convert back to their display locations."""
+    ok = True
+    with Simulator(step=0, duration=None).installed():
+        stmpe610 = importlib.import_module("adafruit_stmpe610")
+        touch_input = importlib.import_module("neko_helpers.cedargrove_display").TouchInput
+        for (rotation, flip), expected in KNOWN_POINTS:
+            size = (240, 320) if rotation in (90, 270) else (320, 240)
+            driver = stmpe610.Adafruit_STMPE610_SPI(
+                None, None, calibration=KNOWN_CALIBRATION, size=size,
+                disp_rotation=rotation, touch_flip=flip,
+            )
+            batched = touch_input(driver, KNOWN_CALIBRATION, size, rotation=rotation, flip=flip)
+            for raw, point in zip(KNOWN_RAW, expected):
+                for label, got in (("TouchInput", batched._to_display(*raw)),
+                        ("fake touch_point", driver._to_display(*raw))):
+                    if got != point:
+                        print(f"    {label} rotation={rotation} flip={flip} raw={raw}: "
+                            f"expected {point} got {got}")
+                        ok = False
+            for point in ((0, 0), (size[0] // 2, size[1] // 3), (size[0] - 1, size[1] - 1)):
+                got = driver._to_display(*driver._to_raw(point))
+                if got != point:
+                    print(f"    fake raw rotation={rotation} flip={flip}: "
+                        f"made for {point} converts to {got}")
+                    ok = False
+    print(f"mapping   {len(KNOWN_POINTS)} rotation and flip cases  "
+        f"{'match' if ok else 'MISMATCH'} touch_point")
+    return ok
+
+
+def poll(name, calibration, rotation, interval, batched):
+    """Poll the touch overlay every `interval` seconds over the script.
+    :return tuple: (list of (time, (low, high), location) events, polls,
+     SPI transactions); low and high bound the locations touched since the
+     previous poll.
+    """
+    sim = Simulator(step=0, duration=None)
+    touch = sim.touch
+    for at, point in TAPS:
+        touch.tap(at, point, hold=0.2)
+    touch.drag(*DRAG)
+
+    events = []
+    polls = 0
+    with sim.installed():
+        with contextlib.redirect_stdout(io.StringIO()):
+            display = importlib.import_module("neko_helpers.cedargrove_display").Display(
+                name=name, rotation=rotation, calibration=calibration
+            )
+        stats = sim.hardware.stats
+        stats.touch_transactions = 0
+        clock = sim.clock
+        while clock.elapsed < DURATION:
+            clock.advance(interval)
+            polls += 1
+            if batched:
+                location = display.touch_event()
+            else:
+                location = display.ts.touch_point
+            if location:
+                events.append((clock.elapsed, touched_since(touch, clock.now, interval), location[:2]))
+        transactions = stats.touch_transactions
+    return events, polls, transactions
+
+
+def check(interval):
+    """Run every display configuration. :return bool: True if all events matched."""
+    ok = check_mapping()
+    for name, calibration, rotation in DISPLAYS:
+        for batched in (False, True):
+            events, polls, transactions = poll(name, calibration, rotation, interval, batched)
+            misses = [
+                (at, expected, location)
+                for at, expected, location in events
+                if batched and expected is not None and not (
+                    expected[0][0] - 1 <= location[0] <= expected[1][0] + 1
+                    and expected[0][1] - 1 <= location[1] <= expected[1][1] + 1
+                )
+            ]
+            label = "touch_event" if batched else "touch_point"
+            print(
+                f"{name:9s} {label:12s} events={len(events):3d}  "
+                f"spi/poll={transactions / polls:5.2f}  misses={len(misses)}"
+            )
+            for miss in misses[:5]:
+                print("    at {:.2f}s expected {} got {}".format(*miss))
+            ok = ok and not misses and (not batched or events)
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--poll", type=float, default=0.1,
+        help="seconds between polls, as TOUCH_COOLDOWN")
+    args = parser.parse_args(argv)
+    if not check(args.poll):
+        print("FAIL: touch events do not match the scripted touches")
+        return 1
+    print("OK: touch events match the scripted touches")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
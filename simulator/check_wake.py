@@ -0,0 +1,89 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# check_wake.py  2023-01-20 1.0.0 Cedar Grove Studios
+
+"""Check where the cats wake up after the display has been dark. A herd is
+built with each engine and caught up in one `fast_forward` step, after a
+short nap and after a full DISPLAY_SLEEP_TIME. Every cat must stay within
+the missed steps' reach and inside the walls, and no more than MAX_AT_WALL
+of them may wake at a wall (clamped to the edge). Exits non-zero on a failure.
+
+    python -m simulator.check_wake --cats 100
+"""
+
+import argparse
+import sys
+
+from simulator.herd_benchmark import DISPLAY_SIZE, Herd
+from simulator.runner import Simulator
+
+# Dark periods to catch up on (seconds): a short nap and the default
+#   DISPLAY_SLEEP_TIME
+NAPS = (1.0, 20 * 60.0)
+
+# The most cats, as a share of the herd, allowed to wake on a wall; a spot
+#   drawn evenly inside the walls is on one about 1% of the time
+MAX_AT_WALL = 0.1
+
+
+def wake(engine, cats, elapsed, seed):
+    """Fast-forward a herd. :return tuple: (list of (x, y) before, list of
+    (x, y) after, tile size, step size, smallest animation time)"""
+    sim = Simulator(step=0, duration=None)
+    with sim.installed():
+        herd = Herd(sim, engine, cats, seed)
+        for _ in range(200):
+            herd.step()
+        before = [(grid.x, grid.y) for grid in herd.grids]
+        if herd.herd is not None:
+            herd.herd.fast_forward(elapsed)
+            tile = herd.herd.TILE_WIDTH
+            step = herd.herd.CONFIG_STEP_SIZE
+            animation_time = min(herd.herd._animation_time[i] for i in range(cats))
+        else:
+            for grid in herd.grids:
+                grid.fast_forward(elapsed)
+            tile = herd.grids[0].TILE_WIDTH
+            step = herd.grids[0].CONFIG_STEP_SIZE
+            animation_time = min(grid.animation_time for grid in herd.grids)
+        after = [(grid.x, grid.y) for grid in herd.grids]
+    return before, after, tile, step, animation_time
+
+
+def check(cats, seed):
+    """Wake each engine after each nap. :return bool: True if all passed."""
+    ok = True
+    for elapsed in NAPS:
+        for engine in ("sprites", "herd"):
+            before, after, tile, step, animation_time = wake(engine, cats, elapsed, seed)
+            max_x = DISPLAY_SIZE[0] - tile - 1
+            max_y = DISPLAY_SIZE[1] - tile - 1
+            reach = int(elapsed / animation_time) * step
+            at_wall = sum(x in (1, max_x) or y in (1, max_y) for x, y in after)
+            outside = sum(not (1 <= x <= max_x and 1 <= y <= max_y) for x, y in after)
+            too_far = sum(
+                abs(x - x0) > reach or abs(y - y0) > reach
+                for (x0, y0), (x, y) in zip(before, after)
+            )
+            print(f"{engine:7s} after {elapsed:6.0f}s  at a wall={at_wall:3d}/{cats}  "
+                f"outside={outside}  beyond reach={too_far}")
+            if at_wall > cats * MAX_AT_WALL or outside or too_far:
+                ok = False
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cats", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    if not check(args.cats, args.seed):
+        print("FAIL: cats wake at the walls or out of reach")
+        return 1
+    print("OK: cats wake inside the walls within reach")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
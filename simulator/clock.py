@@ -0,0 +1,103 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# clock.py  2022-12-20 1.0.0 Cedar Grove Studios
+
+import time as _host_time
+import types
+
+
+class SimulationComplete(BaseException):
+    """Raised by the virtual clock when the simulated duration has elapsed.
+    Derived from BaseException so that the bare `except:` clauses used in the
+    device code do not swallow it."""
+
+
+class VirtualClock:
+    """A controllable stand-in for `time.monotonic`. Simulated time only moves
+    when the clock is read, when `sleep` is called, or when `advance` is called
+    by the simulator. Each read costs `step` seconds so that a free-running
+    main loop makes progress without depending on host speed.
+
+    :param float start: The initial clock value in seconds.
+    :param float step: The simulated time consumed by each clock read.
+    :param float duration: Seconds of simulated time after which reading the
+     clock raises SimulationComplete. None runs forever."""
+
+    def __init__(self, start=1000.0, step=0.0005, duration=None):
+        self._now = start
+        self._start = start
+        self.step = step
+        self._deadline = None if duration is None else start + duration
+        self._listeners = []
+        self._in_listener = False
+        self.reads = 0
+        self.sleeps = 0
+        self.slept = 0.0
+        # A TraceRecorder or TraceReplayer (see simulator.trace) that sees, or
+        #   supplies, every reading
+        self.trace = None
+
+    @property
+    def now(self):
+        """The current simulated time without consuming a clock read."""
+        return self._now
+
+    @property
+    def elapsed(self):
+        """Seconds of simulated time since the clock was created."""
+        return self._now - self._start
+
+    def add_listener(self, listener):
+        """Register a function that is called with the new time whenever the
+        clock advances. Used to model background tasks such as auto refresh.
+        :param function listener: The function to call.
+        """
+        self._listeners.append(listener)
+
+    def advance(self, seconds):
+        """Move simulated time forward.
+        :param float seconds: The number of seconds to advance.
+        """
+        if seconds > 0:
+            self._now += seconds
+        if self._listeners and not self._in_listener:
+            self._in_listener = True
+            try:
+                for listener in self._listeners:
+                    listener(self._now)
+            finally:
+                self._in_listener = False
+        if self._deadline is not None and self._now >= self._deadline:
+            raise SimulationComplete()
+
+    def monotonic(self):
+        """Read the clock, consuming one `step` of simulated time."""
+        self.reads += 1
+        now = self._now
+        self.advance(self.step)
+        if self.trace is not None:
+            return self.trace.clock(now - self._start) + self._start
+        return now
+
+    def monotonic_ns(self):
+        """Read the clock in integer nanoseconds."""
+        return int(self.monotonic() * 1000000000)
+
+    def sleep(self, seconds):
+        """Advance simulated time without consuming host time."""
+        self.sleeps += 1
+        self.slept += seconds
+        self.advance(seconds)
+
+    def module(self):
+        """Build a `time` module replacement bound to this clock. Functions
+        that are not simulated are passed through to the host module."""
+        fake = types.ModuleType("time")
+        for name in dir(_host_time):
+            if not name.startswith("__"):
+                setattr(fake, name, getattr(_host_time, name))
+        fake.monotonic = self.monotonic
+        fake.monotonic_ns = self.monotonic_ns
+        fake.sleep = self.sleep
+        return fake
@@ -0,0 +1,134 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# drag_benchmark.py  2023-01-09 1.0.0 Cedar Grove Studios
+
+"""Compare how HomeNeko follows a finger dragged across the display when each
+touch replaces its single `moving_to` target and when touches are queued as
+waypoints with `add_waypoint`. The drag is sampled every TOUCH_COOLDOWN
+seconds, as `neko_code.py` reads touches. Reported for each mode: the
+heading changes and reversals (a turn of more than 90 degrees) per step,
+steering decisions per update and per step, how far the cat strays from the
+dragged line and the distance it walks. Neko's random rests are left in, as on
+the device. Both modes steer only when a step is due; following the path
+walks farther and turns more often, so it makes more steering decisions.
+
+    python -m simulator.drag_benchmark --seeds 5
+"""
+
+import argparse
+import importlib
+import math
+import random
+
+from simulator.runner import Simulator
+
+SPRITE_SHEET = "/neko_helpers/neko_cat_spritesheet.raw"
+DISPLAY_SIZE = (480, 320)
+
+# A wavy drag from left to right over DRAG_TIME seconds
+DRAG_TIME = 3.0
+TOUCH_COOLDOWN = 0.1
+FRAME_TIME = 1 / 64
+RUN_TIME = 20.0
+
+
+def drag_point(t):
+    """The finger location `t` seconds into the drag."""
+    fraction = min(t / DRAG_TIME, 1.0)
+    x = 60 + fraction * 360
+    y = 160 + 90 * math.sin(fraction * 2 * math.pi)
+    return int(x), int(y)
+
+
+def line_distance(point, samples):
+    """Distance from a point to the nearest dragged location."""
+    return min(math.hypot(point[0] - x, point[1] - y) for x, y in samples)
+
+
+def follow(mode, seed):
+    """Drag a finger for HomeNeko in one feeding mode.
+    :return tuple: (steps, heading changes, reversals, steering decisions,
+     updates, mean distance from the drag in pixels, pixels walked)
+    """
+    sim = Simulator(step=0, duration=None)
+    with sim.installed():
+        random.seed(seed)
+        neko = importlib.import_module("neko_helpers.neko")
+        cache = importlib.import_module("neko_helpers.sprite_cache").SpriteSheetCache()
+        sheet, palette = cache.acquire(SPRITE_SHEET)
+        cat = neko.NekoAnimatedSprite(animation_time=0.3, display_size=DISPLAY_SIZE,
+            sprites=sheet, palette=palette)
+        start = drag_point(0)
+        cat.x = start[0] - cat.TILE_WIDTH // 2
+        cat.y = start[1] - cat.TILE_HEIGHT // 2
+
+        # count the steering decisions made by the state table
+        table = cat.STATE_TABLE
+        steering = [0]
+        heading = table.heading
+
+        def counted_heading(*args):
+            steering[0] += 1
+            return heading(*args)
+
+        table.heading = counted_heading
+
+        samples = [drag_point(t / 100 * DRAG_TIME) for t in range(101)]
+        clock = sim.clock
+        begin = clock.now
+        next_touch = 0.0
+        steps = 0
+        turns = 0
+        reversals = 0
+        updates = 0
+        walked = 0
+        distances = []
+        heading_x = heading_y = 0
+        try:
+            while clock.now - begin < RUN_TIME:
+                elapsed = clock.now - begin
+                if elapsed >= next_touch and elapsed <= DRAG_TIME:
+                    point = drag_point(elapsed)
+                    if mode == "target":
+                        cat.moving_to = point
+                    else:
+                        cat.add_waypoint(*point)
+                    next_touch += TOUCH_COOLDOWN
+                x, y = cat.x, cat.y
+                cat.update()
+                updates += 1
+                step_x, step_y = cat.x - x, cat.y - y
+                if step_x or step_y:
+                    steps += 1
+                    walked += math.hypot(step_x, step_y)
+                    distances.append(line_distance(cat.center_point, samples))
+                    if (step_x, step_y) != (heading_x, heading_y) and (heading_x or heading_y):
+                        turns += 1
+                        if step_x * heading_x + step_y * heading_y < 0:
+                            reversals += 1
+                    heading_x, heading_y = step_x, step_y
+                clock.advance(FRAME_TIME)
+        finally:
+            del table.heading
+    mean = sum(distances) / len(distances) if distances else 0.0
+    return steps, turns, reversals, steering[0], updates, mean, walked
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seeds", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    for mode in ("target", "path"):
+        totals = [sum(column) for column in zip(*(follow(mode, seed) for seed in range(args.seeds)))]
+        steps, turns, reversals, steering, updates, off_line, walked = totals
+        print(
+            f"{mode:6s}  turns={turns / steps:4.2f}/step  reversals={reversals / steps:4.2f}/step  "
+            f"steering={steering / updates:5.3f}/update {steering / steps:4.2f}/step  "
+            f"off-line={off_line / args.seeds:5.1f}px  walked={walked / args.seeds:5.0f}px"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1235 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# hardware.py  2022-12-20 1.0.0 Cedar Grove Studios
+
+"""In-memory stand-ins for the CircuitPython modules used by the Neko bundle.
+The models are just detailed enough to run the real device code on a host:
+displayio keeps a TileGrid/Group/Palette/Bitmap tree and refreshes it by
+counting dirty pixels, the SPI display drivers model transfer time from the
+bus baudrate, and the touch controller replays a scripted timeline."""
+
+import builtins
+import gc as _host_gc
+from array import array
+import os
+import struct
+import types
+
+# The hardware model shared by every fake module; set by `Hardware.install`
+_hardware = None
+_host_open = builtins.open
+
+
+class Stats:
+    """Counters collected by the fake hardware during a simulation run."""
+
+    def __init__(self):
+        self.refreshes = 0
+        self.pixels_pushed = 0
+        self.refresh_time = 0.0
+        self.neopixel_writes = 0
+        self.pwm_writes = 0
+        self.palette_writes = 0
+        # kept in an array so that counting a tile write leaves no new int
+        #   object behind for check_alloc to find
+        self._tile_writes = array("Q", [0])
+        self.touch_transactions = 0
+        self.gc_collections = 0
+        self.gc_time = 0.0
+        self.load_time = 0.0
+
+    @property
+    def tile_writes(self):
+        """TileGrid tile writes, whether or not they changed the tile."""
+        return self._tile_writes[0]
+
+
+# Board pins and buses ------------------------------------------------------
+
+
+class Pin:
+    """A named microcontroller pin."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return "board." + self.name
+
+
+class SPI:
+    """A shared SPI bus. Only locking and frequency are modeled."""
+
+    def __init__(self, clock=None, MOSI=None, MISO=None):
+        self.frequency = 24000000
+        self._locked = False
+
+    def try_lock(self):
+        if self._locked:
+            return False
+        self._locked = True
+        return True
+
+    def unlock(self):
+        self._locked = False
+
+    def configure(self, baudrate=100000, polarity=0, phase=0, bits=8):
+        self.frequency = baudrate
+
+    def deinit(self):
+        pass
+
+
+class Direction:
+    INPUT = 0
+    OUTPUT = 1
+
+
+class Pull:
+    UP = 1
+    DOWN = 2
+
+
+class DigitalInOut:
+    """A digital pin. Input pins read from the hardware model so that scripted
+    signals, such as a touch interrupt, can be observed by the device code."""
+
+    def __init__(self, pin):
+        self.pin = pin
+        self.direction = Direction.INPUT
+        self.pull = None
+        self._value = False
+
+    @property
+    def value(self):
+        if self.direction == Direction.INPUT and _hardware:
+            level = _hardware.read_pin(self.pin)
+            if level is not None:
+                return level
+        return self._value
+
+    @value.setter
+    def value(self, new_value):
+        self._value = bool(new_value)
+
+    def switch_to_output(self, value=False, drive_mode=None):
+        self.direction = Direction.OUTPUT
+        self._value = bool(value)
+
+    def switch_to_input(self, pull=None):
+        self.direction = Direction.INPUT
+        self.pull = pull
+
+    def deinit(self):
+        pass
+
+
+class PWMOut:
+    """A PWM output. Each duty cycle write is counted."""
+
+    def __init__(self, pin, duty_cycle=0, frequency=500, variable_frequency=False):
+        self.pin = pin
+        self.frequency = frequency
+        self._duty_cycle = duty_cycle
+
+    @property
+    def duty_cycle(self):
+        return self._duty_cycle
+
+    @duty_cycle.setter
+    def duty_cycle(self, new_duty_cycle):
+        if not 0 <= new_duty_cycle <= 0xFFFF:
+            raise ValueError("duty_cycle must be 0-65535")
+        self._duty_cycle = new_duty_cycle
+        if _hardware:
+            _hardware.stats.pwm_writes += 1
+
+    def deinit(self):
+        pass
+
+
+# displayio -----------------------------------------------------------------
+
+
+def _to_rgb888(color):
+    if isinstance(color, int):
+        return color & 0xFFFFFF
+    if isinstance(color, (tuple, list, bytes, bytearray)):
+        return (color[0] << 16) | (color[1] << 8) | color[2]
+    raise TypeError("color must be int or tuple")
+
+
+class Bitmap:
+    """A bitmap stored one value per element. The estimated device storage is
+    charged against the modeled heap so that `gc.mem_free` reflects bitmaps
+    that are alive."""
+
+    def __init__(self, width, height, value_count):
+        self._width = width
+        self._height = height
+        self._value_count = value_count
+        bits = 1
+        while (1 << bits) < value_count:
+            bits *= 2
+        self._bits_per_value = bits
+        self._data = bytearray(width * height) if value_count <= 256 else [0] * (width * height)
+        self._device_bytes = ((width * bits + 31) // 32) * 4 * height
+        # the heap of the run that made the bitmap; a bitmap from an earlier
+        #   run may be collected by the host during a later one
+        self._hardware = _hardware
+        if _hardware:
+            _hardware.heap_used += self._device_bytes
+
+    def __del__(self):
+        if self._hardware:
+            self._hardware.heap_used -= self._device_bytes
+
+    @property
+    def width(self):
+        return self._width
+
+    @property
+    def height(self):
+        return self._height
+
+    @property
+    def bits_per_value(self):
+        return self._bits_per_value
+
+    def _index(self, index):
+        if isinstance(index, tuple):
+            return index[1] * self._width + index[0]
+        return index
+
+    def __getitem__(self, index):
+        return self._data[self._index(index)]
+
+    def __setitem__(self, index, value):
+        if value >= self._value_count:
+            raise ValueError("value out of range for bitmap")
+        self._data[self._index(index)] = value
+
+    def fill(self, value):
+        for i in range(len(self._data)):
+            self._data[i] = value
+
+
+class Palette:
+    """A color palette with per-entry transparency."""
+
+    def __init__(self, color_count):
+        self._colors = [0] * color_count
+        self._transparent = [False] * color_count
+        self._dirty = True
+
+    def __len__(self):
+        return len(self._colors)
+
+    def __getitem__(self, index):
+        return self._colors[index]
+
+    def __setitem__(self, index, color):
+        color = _to_rgb888(color)
+        if _hardware:
+            _hardware.stats.palette_writes += 1
+        if self._colors[index] != color:
+            self._colors[index] = color
+            self._dirty = True
+
+    def make_transparent(self, index):
+        if not self._transparent[index]:
+            self._transparent[index] = True
+            self._dirty = True
+
+    def make_opaque(self, index):
+        if self._transparent[index]:
+            self._transparent[index] = False
+            self._dirty = True
+
+    def is_transparent(self, index):
+        return self._transparent[index]
+
+
+class _Layer:
+    """Position and dirty tracking shared by TileGrid and vectorio shapes."""
+
+    def _init_layer(self, x, y):
+        self._x = x
+        self._y = y
+        self._hidden = False
+        self._dirty = True
+        self._last_area = None
+
+    @property
+    def x(self):
+        return self._x
+
+    @x.setter
+    def x(self, new_x):
+        if new_x != self._x:
+            self._x = new_x
+            self._dirty = True
+
+    @property
+    def y(self):
+        return self._y
+
+    @y.setter
+    def y(self, new_y):
+        if new_y != self._y:
+            self._y = new_y
+            self._dirty = True
+
+    @property
+    def hidden(self):
+        return self._hidden
+
+    @hidden.setter
+    def hidden(self, new_hidden):
+        if new_hidden != self._hidden:
+            self._hidden = new_hidden
+            self._dirty = True
+
+
+class TileGrid(_Layer):
+    """A grid of tiles drawn from a bitmap through a pixel shader. Position
+    writes that do not change anything are ignored, as on device; a tile write
+    marks the tile for refresh even when the index is unchanged, as
+    CircuitPython 7's TileGrid does."""
+
+    def __init__(self, bitmap, *, pixel_shader, width=1, height=1,
+        tile_width=None, tile_height=None, default_tile=0, x=0, y=0,
+        ):
+        self._bitmap = bitmap
+        self._pixel_shader = pixel_shader
+        self._width = width
+        self._height = height
+        self._tile_width = bitmap.width if tile_width is None else tile_width
+        self._tile_height = bitmap.height if tile_height is None else tile_height
+        self._tiles = bytearray([default_tile] * (width * height))
+        self._tile_count = (bitmap.width // self._tile_width) * (
+            bitmap.height // self._tile_height
+        )
+        self.flip_x = False
+        self.flip_y = False
+        self.transpose_xy = False
+        self._init_layer(x, y)
+
+    @property
+    def bitmap(self):
+        return self._bitmap
+
+    @property
+    def pixel_shader(self):
+        return self._pixel_shader
+
+    @property
+    def width(self):
+        return self._width
+
+    @property
+    def height(self):
+        return self._height
+
+    @property
+    def tile_width(self):
+        return self._tile_width
+
+    @property
+    def tile_height(self):
+        return self._tile_height
+
+    def _index(self, index):
+        if isinstance(index, tuple):
+            return index[1] * self._width + index[0]
+        return index
+
+    def __getitem__(self, index):
+        return self._tiles[self._index(index)]
+
+    def __setitem__(self, index, value):
+        if not 0 <= value < self._tile_count:
+            raise ValueError("Tile index out of bounds")
+        index = self._index(index)
+        self._tiles[index] = value
+        self._dirty = True
+        if _hardware:
+            _hardware.stats._tile_writes[0] += 1
+
+    def _size(self):
+        return self._width * self._tile_width, self._height * self._tile_height
+
+
+class Group:
+    """A list-like container of layers with position and integer scale."""
+
+    def __init__(self, *, scale=1, x=0, y=0):
+        self._layers = []
+        self.scale = scale
+        self.x = x
+        self.y = y
+        self.hidden = False
+
+    def __len__(self):
+        return len(self._layers)
+
+    def __getitem__(self, index):
+        return self._layers[index]
+
+    def __setitem__(self, index, layer):
+        self._layers[index]._dirty = True
+        self._layers[index] = layer
+        layer._dirty = True
+
+    def __delitem__(self, index):
+        self.pop(index)
+
+    def __iter__(self):
+        return iter(self._layers)
+
+    def __contains__(self, layer):
+        return layer in self._layers
+
+    def append(self, layer):
+        self.insert(len(self._layers), layer)
+
+    def insert(self, index, layer):
+        if isinstance(layer, Group) and layer is self:
+            raise ValueError("Layer already in a group")
+        self._layers.insert(index, layer)
+        layer._dirty = True
+
+    def index(self, layer):
+        return self._layers.index(layer)
+
+    def pop(self, index=-1):
+        layer = self._layers.pop(index)
+        layer._dirty = True
+        if _hardware:
+            _hardware.removed_areas.append(getattr(layer, "_last_area", None))
+        return layer
+
+    def remove(self, layer):
+        self.pop(self._layers.index(layer))
+
+    def sort(self, key=None, reverse=False):
+        before = list(self._layers)
+        self._layers.sort(key=key, reverse=reverse)
+        if _hardware:
+            _hardware.group_sorts += 1
+        for old, new in zip(before, self._layers):
+            if old is not new:
+                new._dirty = True
+
+    @property
+    def _dirty(self):
+        return False
+
+    @_dirty.setter
+    def _dirty(self, value):
+        # A group changes when its layers change; mark all of them
+        if value:
+            for layer in self._layers:
+                layer._dirty = True
+
+
+def release_displays():
+    pass
+
+
+class FourWire:
+    """An SPI display bus. The baudrate sets the modeled transfer time. As on
+    the RP2040, the bus runs at the fastest rate at or below the requested one
+    that the peripheral clock divided by an even number gives."""
+
+    # RP2040 peripheral clock (Hz)
+    PERIPHERAL_CLOCK = 125000000
+
+    def __init__(self, spi_bus, *, command, chip_select, reset=None,
+        baudrate=24000000, polarity=0, phase=0,
+        ):
+        self.spi_bus = spi_bus
+        self.requested_baudrate = baudrate
+        divider = -(-self.PERIPHERAL_CLOCK // baudrate)
+        divider += divider % 2
+        self.baudrate = self.PERIPHERAL_CLOCK / max(divider, 2)
+
+
+class Display:
+    """A display that refreshes by finding the area changed by each layer in
+    the shown group, as displayio does, and charging the modeled SPI transfer
+    time for those pixels to the virtual clock."""
+
+    # Modeled cost per refreshed area for window commands (seconds)
+    AREA_OVERHEAD = 0.00005
+
+    # Modeled cost to compose one pixel on the microcontroller (seconds)
+    PIXEL_FILL_TIME = 0.0000002
+
+    # Bits sent over the bus for each pixel (RGB565)
+    BITS_PER_PIXEL = 16
+
+    def __init__(self, display_bus, init_sequence=b"", *, width, height,
+        rotation=0, auto_refresh=True, **kwargs
+        ):
+        self.bus = display_bus
+        self._native_width = width
+        self._native_height = height
+        self._rotation = rotation
+        self.auto_refresh = auto_refresh
+        self.root_group = None
+        self._full_refresh = True
+        self._last_refresh = None
+        self._last_refresh_call = None
+        self.refreshes = 0
+        self.pixels_pushed = 0
+        if _hardware:
+            _hardware.add_display(self)
+
+    @property
+    def width(self):
+        if self._rotation in (90, 270):
+            return self._native_height
+        return self._native_width
+
+    @property
+    def height(self):
+        if self._rotation in (90, 270):
+            return self._native_width
+        return self._native_height
+
+    @property
+    def rotation(self):
+        return self._rotation
+
+    @rotation.setter
+    def rotation(self, new_rotation):
+        if new_rotation % 90:
+            raise ValueError("rotation must be 0, 90, 180, or 270")
+        self._rotation = new_rotation % 360
+
+    @property
+    def brightness(self):
+        raise RuntimeError("Brightness not adjustable")
+
+    @brightness.setter
+    def brightness(self, new_brightness):
+        raise RuntimeError("Brightness not adjustable")
+
+    def show(self, group):
+        if group is not self.root_group:
+            self.root_group = group
+            self._full_refresh = True
+
+    def _collect(self, group, ox, oy, scale, areas, palettes):
+        if group.hidden:
+            return
+        for layer in group:
+            if isinstance(layer, Group):
+                self._collect(
+                    layer, ox + layer.x * scale, oy + layer.y * scale,
+                    scale * layer.scale, areas, palettes,
+                )
+                continue
+            if layer.hidden:
+                if layer._dirty and layer._last_area is not None:
+                    areas.append(layer._last_area)
+                layer._dirty = False
+                layer._last_area = None
+                continue
+            width, height = layer._size()
+            area = (
+                ox + layer.x * scale,
+                oy + layer.y * scale,
+                width * scale,
+                height * scale,
+            )
+            shader = layer.pixel_shader
+            changed = layer._dirty or (shader is not None and shader._dirty)
+            if shader is not None:
+                palettes.add(shader)
+            if self._full_refresh or changed or area != layer._last_area:
+                areas.append(area)
+                if layer._last_area is not None and layer._last_area != area:
+                    areas.append(layer._last_area)
+            layer._dirty = False
+            layer._last_area = area
+
+    def _clip(self, area):
+        x, y, w, h = area
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, self.width), min(y + h, self.height)
+        if x1 <= x0 or y1 <= y0:
+            return 0
+        return (x1 - x0) * (y1 - y0)
+
+    def refresh(self, *, target_frames_per_second=None, minimum_frames_per_second=0):
+        """Push all changed areas of the shown group to the panel. With a
+        target frame rate, as displayio does, a call made more than a frame
+        period after the previous call is skipped and returns False, and
+        otherwise waits until the frame period since the last refresh lines up."""
+        if _hardware is None:
+            return True
+        clock = _hardware.clock
+        if target_frames_per_second:
+            frame_time = 1 / target_frames_per_second
+            last_call = self._last_refresh_call
+            self._last_refresh_call = clock.now
+            if last_call is not None and clock.now - last_call > frame_time:
+                return False
+            if self._last_refresh is not None:
+                remaining = frame_time - (clock.now - self._last_refresh) % frame_time
+                clock.advance(remaining)
+        self._last_refresh = clock.now
+        areas = []
+        palettes = set()
+        if self.root_group is not None:
+            self._collect(self.root_group, 0, 0, 1, areas, palettes)
+        for palette in palettes:
+            palette._dirty = False
+        areas.extend(area for area in _hardware.removed_areas if area)
+        _hardware.removed_areas.clear()
+        self._full_refresh = False
+        pixels = sum(self._clip(area) for area in areas)
+        if not pixels:
+            return True
+        seconds = (
+            len(areas) * self.AREA_OVERHEAD
+            + pixels * self.PIXEL_FILL_TIME
+            + pixels * self.BITS_PER_PIXEL / self.bus.baudrate
+        )
+        self.refreshes += 1
+        self.pixels_pushed += pixels
+        stats = _hardware.stats
+        stats.refreshes += 1
+        stats.pixels_pushed += pixels
+        stats.refresh_time += seconds
+        if clock.trace is not None:
+            clock.trace.frame(pixels, areas, clock.elapsed + seconds)
+        clock.advance(seconds)
+        return True
+
+
+class BuiltInDisplay(Display):
+    """A board display with a controllable backlight, like the PyPortal."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._brightness = 1.0
+
+    @property
+    def brightness(self):
+        return self._brightness
+
+    @brightness.setter
+    def brightness(self, new_brightness):
+        if not 0 <= new_brightness <= 1.0:
+            raise ValueError("brightness must be 0.0-1.0")
+        self._brightness = new_brightness
+        if _hardware:
+            _hardware.stats.pwm_writes += 1
+
+
+# vectorio ------------------------------------------------------------------
+
+
+class Circle(_Layer):
+    """A filled circle drawn with the first color of its palette."""
+
+    def __init__(self, *, pixel_shader, radius, x=0, y=0):
+        self.pixel_shader = pixel_shader
+        self.radius = radius
+        self._init_layer(x, y)
+
+    def _size(self):
+        return 2 * self.radius + 1, 2 * self.radius + 1
+
+
+# neopixel ------------------------------------------------------------------
+
+
+class NeoPixel:
+    """A NeoPixel strip. Each transfer to the pixels is counted."""
+
+    def __init__(self, pin, n, *, bpp=3, brightness=1.0, auto_write=True,
+        pixel_order=None,
+        ):
+        self.pin = pin
+        self.n = n
+        self.brightness = brightness
+        self.auto_write = auto_write
+        self._pixels = [0] * n
+        self.writes = 0
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, index):
+        color = self._pixels[index]
+        return ((color >> 16) & 0xFF, (color >> 8) & 0xFF, color & 0xFF)
+
+    def __setitem__(self, index, color):
+        self._pixels[index] = _to_rgb888(color)
+        if self.auto_write:
+            self.show()
+
+    def fill(self, color):
+        for index in range(self.n):
+            self._pixels[index] = _to_rgb888(color)
+        if self.auto_write:
+            self.show()
+
+    def show(self):
+        self.writes += 1
+        if _hardware:
+            _hardware.stats.neopixel_writes += 1
+
+    def deinit(self):
+        pass
+
+
+# Display and touch drivers -------------------------------------------------
+
+
+class ILI9341(Display):
+    def __init__(self, bus, **kwargs):
+        kwargs.setdefault("width", 240)
+        kwargs.setdefault("height", 320)
+        super().__init__(bus, b"", **kwargs)
+
+
+class HX8357(Display):
+    def __init__(self, bus, **kwargs):
+        kwargs.setdefault("width", 480)
+        kwargs.setdefault("height", 320)
+        super().__init__(bus, b"", **kwargs)
+
+
+class FakeTouchController:
+    """A scripted touch panel. Touches are given in display coordinates as a
+    timeline of taps and drags on the virtual clock. While touched, samples
+    accumulate in a FIFO at `sample_rate` like the STMPE610 does.
+
+    :param VirtualClock clock: The simulation clock.
+    :param int sample_rate: Samples per second queued while touched.
+    :param int fifo_size: Maximum samples held by the FIFO."""
+
+    def __init__(self, clock, sample_rate=100, fifo_size=128):
+        self.clock = clock
+        self.sample_rate = sample_rate
+        self.fifo_size = fifo_size
+        self._segments = []
+        self._fifo = []
+        self._last_sample = None
+        # A TraceRecorder or TraceReplayer (see simulator.trace) that sees, or
+        #   supplies, every reading of the panel
+        self.trace = None
+
+    def tap(self, at, point, hold=0.2):
+        """Touch a single point.
+        :param float at: Simulated time of the touch, relative to clock start.
+        :param tuple point: The (x, y) display location.
+        :param float hold: How long the touch lasts in seconds.
+        """
+        self.drag(at, point, point, hold)
+
+    def drag(self, at, start, end, duration):
+        """Drag linearly from one point to another."""
+        begin = self.clock._start + at
+        self._segments.append((begin, begin + duration, start, end))
+        self._segments.sort()
+
+    def point_at(self, now):
+        """The (x, y) location being touched at a simulated time, or None."""
+        for begin, end, start, finish in self._segments:
+            if begin <= now <= end:
+                span = end - begin
+                t = (now - begin) / span if span else 0
+                return (
+                    int(start[0] + (finish[0] - start[0]) * t),
+                    int(start[1] + (finish[1] - start[1]) * t),
+                )
+            if begin > now:
+                break
+        return None
+
+    def _sample(self):
+        now = self.clock.now
+        if self._last_sample is None:
+            self._last_sample = now
+        interval = 1 / self.sample_rate
+        while self._last_sample + interval <= now:
+            self._last_sample += interval
+            point = self.point_at(self._last_sample)
+            if point is not None and len(self._fifo) < self.fifo_size:
+                self._fifo.append(point)
+
+    def _traced(self, kind, value):
+        if self.trace is None:
+            return value
+        return self.trace.touch(kind, value)
+
+    @property
+    def touched(self):
+        return self._traced("touched", self.point_at(self.clock.now) is not None)
+
+    def current_point(self):
+        """The (x, y) location being touched now, or None."""
+        return self._traced("point", self.point_at(self.clock.now))
+
+    def fifo_count(self):
+        self._sample()
+        return self._traced("count", len(self._fifo))
+
+    def pop(self):
+        self._sample()
+        return self._traced("pop", self._fifo.pop(0) if self._fifo else None)
+
+    def flush(self):
+        self._fifo.clear()
+
+
+def map_range(x, in_min, in_max, out_min, out_max):
+    """adafruit_stmpe610.map_range, as in the driver: maps a value from one
+    range to another, limited to the output range."""
+    in_range = in_max - in_min
+    in_delta = x - in_min
+    if in_range != 0:
+        mapped = in_delta / in_range
+    elif in_delta != 0:
+        mapped = in_delta
+    else:
+        mapped = 0.5
+    mapped *= out_max - out_min
+    mapped += out_min
+    if out_min <= out_max:
+        return max(min(mapped, out_max), out_min)
+    return min(max(mapped, out_max), out_min)
+
+
+class Adafruit_STMPE610_SPI:
+    """The STMPE610 resistive touch controller. Every register access is one
+    SPI transaction on the shared bus and costs `TRANSACTION_TIME`. Samples
+    are queued as raw ADC values; `touch_point` converts the latest one to
+    display coordinates with the driver's own calibration, rotation and flip
+    mapping (adafruit_stmpe610 1.3.9)."""
+
+    # A register access at the 1 MHz touch controller SPI clock (seconds)
+    TRANSACTION_TIME = 0.00004
+
+    def __init__(self, spi, cs, *, calibration=None, size=None,
+        disp_rotation=0, touch_flip=(False, False), baudrate=1000000,
+        ):
+        self._spi = spi
+        self._cs = cs
+        self._calib = calibration or ((0, 4095), (0, 4095))
+        self._disp_size = size or (4095, 4095)
+        self._disp_rotation = disp_rotation
+        self._touch_flip = touch_flip
+
+    def _transaction(self):
+        _hardware.stats.touch_transactions += 1
+        _hardware.clock.advance(self.TRANSACTION_TIME)
+
+    def _axis_ranges(self):
+        """The calibration ranges after the driver's touch_flip swap.
+        :return tuple: (x_c, y_c) as named in the driver's touch_point."""
+        if self._disp_rotation in (0, 180):
+            if self._touch_flip and self._touch_flip[0]:
+                x_c = (self._calib[0][1], self._calib[0][0])
+            else:
+                x_c = (self._calib[0][0], self._calib[0][1])
+            if self._touch_flip and self._touch_flip[1]:
+                y_c = (self._calib[1][1], self._calib[1][0])
+            else:
+                y_c = (self._calib[1][0], self._calib[1][1])
+        if self._disp_rotation in (90, 270):
+            if self._touch_flip[1]:
+                x_c = (self._calib[1][1], self._calib[1][0])
+            else:
+                x_c = (self._calib[1][0], self._calib[1][1])
+            if self._touch_flip[0]:
+                y_c = (self._calib[0][1], self._calib[0][0])
+            else:
+                y_c = (self._calib[0][0], self._calib[0][1])
+        return x_c, y_c
+
+    def _to_display(self, x_loc, y_loc):
+        """A raw sample to display coordinates, as the driver's touch_point."""
+        x_c, y_c = self._axis_ranges()
+        if self._disp_rotation == 0:
+            x = int(map_range(y_loc, x_c[0], x_c[1], 0, self._disp_size[0]))
+            y = int(map_range(x_loc, y_c[0], y_c[1], 0, self._disp_size[1]))
+        elif self._disp_rotation == 90:
+            x = int(map_range(x_loc, x_c[0], x_c[1], 0, self._disp_size[0]))
+            y = int(map_range(y_loc, y_c[0], y_c[1], self._disp_size[1], 0))
+        elif self._disp_rotation == 180:
+            x = int(map_range(y_loc, x_c[0], x_c[1], self._disp_size[0], 0))
+            y = int(map_range(x_loc, y_c[0], y_c[1], self._disp_size[1], 0))
+        elif self._disp_rotation == 270:
+            x = int(map_range(x_loc, x_c[0], x_c[1], self._disp_size[0], 0))
+            y = int(map_range(y_loc, y_c[0], y_c[1], 0, self._disp_size[1]))
+        return x, y
+
+    def _to_raw(self, point):
+        """The raw ADC values the panel reports for a display location: the
+        inverse of `_to_display` at the center of the pixel."""
+        x_c, y_c = self._axis_ranges()
+        width, height = self._disp_size
+        rotation = self._disp_rotation
+        x_out = (width, 0) if rotation in (180, 270) else (0, width)
+        y_out = (height, 0) if rotation in (90, 180) else (0, height)
+
+        def unmap(value, in_range, out_range):
+            fraction = (value + 0.5 - out_range[0]) / (out_range[1] - out_range[0])
+            return round(in_range[0] + fraction * (in_range[1] - in_range[0]))
+
+        raw_for_x = unmap(point[0], x_c, x_out)
+        raw_for_y = unmap(point[1], y_c, y_out)
+        # at 0 and 180 degrees the display's x axis is the raw y axis
+        if rotation in (0, 180):
+            return raw_for_y, raw_for_x
+        return raw_for_x, raw_for_y
+
+    @property
+    def touched(self):
+        self._transaction()
+        return _hardware.touch.touched
+
+    @property
+    def buffer_size(self):
+        self._transaction()
+        return _hardware.touch.fifo_count()
+
+    @property
+    def buffer_empty(self):
+        self._transaction()
+        return _hardware.touch.fifo_count() == 0
+
+    def read_data(self):
+        self._transaction()
+        point = _hardware.touch.pop()
+        if point is None:
+            return None
+        raw_x, raw_y = self._to_raw(point)
+        return raw_x, raw_y, 128
+
+    @property
+    def touch_point(self):
+        if self.touched:
+            sample = None
+            while not self.buffer_empty:
+                sample = self.read_data()
+            if sample is None:
+                return None
+            x, y = self._to_display(sample[0], sample[1])
+            return x, y, sample[2]
+        _hardware.touch.flush()
+        return None
+
+
+class Touchscreen:
+    """A resistive touchscreen read directly through analog pins."""
+
+    def __init__(self, x1_pin, x2_pin, y1_pin, y2_pin, *, x_resistance=None,
+        samples=4, z_threshold=10000, calibration=None, size=None,
+        ):
+        self._size = size
+
+    @property
+    def touch_point(self):
+        point = _hardware.touch.current_point()
+        if point is None:
+            return None
+        return point[0], point[1], 128
+
+
+# Libraries ------------------------------------------------------------------
+
+
+def imageload_load(file_or_filename, *, bitmap=None, palette=None):
+    """Decode an indexed BMP file the way `adafruit_imageload.load` does."""
+    path = file_or_filename
+    if _hardware:
+        path = _hardware.device_path(path)
+    with open(path, "rb") as file:
+        data = file.read()
+    if data[:2] != b"BM":
+        raise NotImplementedError("Only BMP files are simulated")
+    data_start = struct.unpack_from("<I", data, 10)[0]
+    header_size = struct.unpack_from("<I", data, 14)[0]
+    width, height = struct.unpack_from("<ii", data, 18)
+    bits = struct.unpack_from("<H", data, 28)[0]
+    colors = struct.unpack_from("<I", data, 46)[0] or 1 << bits
+    bitmap_obj = bitmap(width, abs(height), colors)
+    palette_obj = palette(colors)
+    if _hardware:
+        _hardware.charge_load(len(data), width * abs(height), _hardware.IMAGELOAD_PIXEL_TIME)
+    table = 14 + header_size
+    for index in range(colors):
+        b, g, r = data[table + index * 4: table + index * 4 + 3]
+        palette_obj[index] = (r << 16) | (g << 8) | b
+    row_bytes = ((width * bits + 31) // 32) * 4
+    mask = (1 << bits) - 1
+    per_byte = 8 // bits
+    for row in range(abs(height)):
+        y = abs(height) - 1 - row if height > 0 else row
+        offset = data_start + row * row_bytes
+        for x in range(width):
+            byte = data[offset + x // per_byte]
+            shift = 8 - bits * (x % per_byte + 1)
+            bitmap_obj[x, y] = (byte >> shift) & mask
+    return bitmap_obj, palette_obj
+
+
+def bitmaptools_readinto(bitmap, file, bits_per_pixel, element_size=1,
+    reverse_pixels_in_element=False, swap_bytes_in_element=False, reverse_rows=False):
+    """Fill a bitmap from packed rows the way `bitmaptools.readinto` does. Each
+    row is padded to whole elements; after the optional byte swap, pixels are
+    taken from each byte most significant bits first."""
+    width = bitmap.width
+    height = bitmap.height
+    row_bytes = (width * bits_per_pixel + element_size * 8 - 1) // (element_size * 8) * element_size
+    per_byte = 8 // bits_per_pixel if bits_per_pixel < 8 else 1
+    mask = (1 << bits_per_pixel) - 1
+    for row in range(height):
+        data = bytearray(file.read(row_bytes))
+        if len(data) < row_bytes:
+            raise EOFError("file ended before the bitmap was filled")
+        if swap_bytes_in_element and element_size > 1:
+            for start in range(0, row_bytes, element_size):
+                data[start:start + element_size] = data[start:start + element_size][::-1]
+        y = height - 1 - row if reverse_rows else row
+        for x in range(width):
+            if bits_per_pixel < 8:
+                shift = bits_per_pixel * (x % per_byte)
+                if not reverse_pixels_in_element:
+                    shift = 8 - bits_per_pixel - shift
+                value = (data[x // per_byte] >> shift) & mask
+            else:
+                size = bits_per_pixel // 8
+                value = int.from_bytes(data[x * size:(x + 1) * size], "little")
+            bitmap[x, y] = value
+    if _hardware:
+        _hardware.charge_load(row_bytes * height, width * height, _hardware.READINTO_PIXEL_TIME)
+
+
+def bitmaptools_arrayblit(bitmap, data, x1=0, y1=0, x2=-1, y2=-1, skip_index=None):
+    """Write a rectangle of a bitmap from one value per element of `data`,
+    row by row, the way `bitmaptools.arrayblit` does."""
+    x2 = bitmap.width if x2 == -1 else x2
+    y2 = bitmap.height if y2 == -1 else y2
+    width = x2 - x1
+    if len(data) < width * (y2 - y1):
+        raise ValueError("data is too short for the rectangle")
+    for y in range(y1, y2):
+        for x in range(x1, x2):
+            value = data[(y - y1) * width + x - x1]
+            if value != skip_index:
+                bitmap[x, y] = value
+    if _hardware:
+        _hardware.charge_load(0, width * (y2 - y1), _hardware.READINTO_PIXEL_TIME)
+
+
+class Spectrum:
+    """A continuous color spectrum that blends linearly between its colors
+    and wraps from the last color back to the first."""
+
+    def __init__(self, colors, mode="continuous", gamma=0.5):
+        self._colors = list(colors)
+        self._mode = mode
+        self._gamma = gamma
+
+    def color(self, index=0):
+        count = len(self._colors)
+        position = (index % 1.0) * count
+        first = int(position) % count
+        if self._mode != "continuous":
+            return self._colors[first]
+        second = (first + 1) % count
+        fraction = position - int(position)
+        a = self._colors[first]
+        b = self._colors[second]
+        color = 0
+        for shift in (16, 8, 0):
+            ca = (a >> shift) & 0xFF
+            cb = (b >> shift) & 0xFF
+            color |= int(ca + (cb - ca) * fraction) << shift
+        return color
+
+
+# Hardware model and module assembly ------------------------------------------
+
+
+class Hardware:
+    """Holds the simulated device state and builds the replacement modules.
+
+    :param VirtualClock clock: The simulation clock.
+    :param str root: Host directory that stands in for the CIRCUITPY drive.
+    :param bool built_in_display: Model a board with `board.DISPLAY` and
+     `board.TOUCH_*` pins instead of a FeatherWing.
+    :param bool backlight: The built-in display's brightness is adjustable.
+    :param int heap_size: Modeled free heap at boot in bytes."""
+
+    # Modeled gc.collect pause: a fixed cost plus a sweep of the whole heap and
+    #   a mark of the live part of it (seconds)
+    GC_BASE_TIME = 0.0002
+    GC_SWEEP_TIME_PER_BYTE = 0.000000005
+    GC_MARK_TIME_PER_BYTE = 0.00000001
+
+    # Modeled image loading: reading the file from flash plus unpacking each
+    #   pixel, in Python for adafruit_imageload and in C for bitmaptools
+    FLASH_READ_TIME_PER_BYTE = 0.000002
+    IMAGELOAD_PIXEL_TIME = 0.000025
+    READINTO_PIXEL_TIME = 0.0000002
+
+    def __init__(self, clock, root, built_in_display=False, heap_size=190000,
+        backlight=True,
+        ):
+        self.clock = clock
+        self.root = root
+        self.built_in_display = built_in_display
+        self.backlight = backlight
+        self.heap_size = heap_size
+        self.heap_used = 0
+        self.stats = Stats()
+        self.touch = FakeTouchController(clock)
+        self.displays = []
+        self.removed_areas = []
+        self.group_sorts = 0
+        self.pin_levels = {}
+        self.spi = SPI()
+        clock.add_listener(self._auto_refresh)
+        self._next_auto_refresh = clock.now
+
+    def device_path(self, path):
+        """Map an absolute CIRCUITPY path onto the host root directory. Host
+        paths that are not on the simulated drive are returned unchanged."""
+        if isinstance(path, str) and path.startswith("/"):
+            mapped = os.path.join(self.root, path.lstrip("/"))
+            if os.path.exists(mapped):
+                return mapped
+        return path
+
+    def open(self, file, *args, **kwargs):
+        """`open` for device code; absolute paths are on the simulated drive."""
+        return _host_open(self.device_path(file), *args, **kwargs)
+
+    def charge_load(self, file_bytes, pixels, pixel_time):
+        """Charge reading an image file and unpacking its pixels to the clock."""
+        load_time = file_bytes * self.FLASH_READ_TIME_PER_BYTE + pixels * pixel_time
+        self.stats.load_time += load_time
+        self.clock.advance(load_time)
+
+    def read_pin(self, pin):
+        """The scripted level of an input pin, or None if not scripted."""
+        level = self.pin_levels.get(pin.name)
+        if callable(level):
+            return level(self.clock.now)
+        return level
+
+    def add_display(self, display):
+        self.displays.append(display)
+
+    def _auto_refresh(self, now):
+        # displayio refreshes in the background at 60 frames per second
+        if now < self._next_auto_refresh:
+            return
+        self._next_auto_refresh = now + 1 / 60
+        for display in self.displays:
+            if display.auto_refresh:
+                display.refresh()
+
+    def _mem_free(self):
+        return max(self.heap_size - self.heap_used, 0)
+
+    def _collect(self):
+        pause = (
+            self.GC_BASE_TIME
+            + self.heap_size * self.GC_SWEEP_TIME_PER_BYTE
+            + self.heap_used * self.GC_MARK_TIME_PER_BYTE
+        )
+        self.stats.gc_collections += 1
+        self.stats.gc_time += pause
+        self.clock.advance(pause)
+
+    def modules(self):
+        """Build the dictionary of replacement modules keyed by import name."""
+        mods = {}
+
+        def module(name, **attrs):
+            mod = types.ModuleType(name)
+            for key, value in attrs.items():
+                setattr(mod, key, value)
+            mods[name] = mod
+            return mod
+
+        board_pins = {
+            name: Pin(name)
+            for name in ("D4", "D5", "D6", "D9", "D10", "D11", "D12", "D13",
+                "NEOPIXEL", "SCK", "MOSI", "MISO")
+        }
+        board = module("board", SPI=lambda: self.spi, **board_pins)
+        if self.built_in_display:
+            for name in ("TOUCH_XL", "TOUCH_XR", "TOUCH_YD", "TOUCH_YU"):
+                setattr(board, name, Pin(name))
+            board.DISPLAY = (BuiltInDisplay if self.backlight else Display)(
+                FourWire(self.spi, command=None, chip_select=None),
+                width=320,
+                height=240,
+            )
+
+        module("busio", SPI=SPI)
+        module("digitalio", DigitalInOut=DigitalInOut, Direction=Direction, Pull=Pull)
+        module("pwmio", PWMOut=PWMOut)
+        module(
+            "displayio",
+            Bitmap=Bitmap,
+            Palette=Palette,
+            TileGrid=TileGrid,
+            Group=Group,
+            Display=Display,
+            FourWire=FourWire,
+            release_displays=release_displays,
+        )
+        module("vectorio", Circle=Circle)
+        module("neopixel", NeoPixel=NeoPixel)
+        module("adafruit_ili9341", ILI9341=ILI9341)
+        module("adafruit_hx8357", HX8357=HX8357)
+        module("adafruit_stmpe610", Adafruit_STMPE610_SPI=Adafruit_STMPE610_SPI,
+            map_range=map_range)
+        module("adafruit_touchscreen", Touchscreen=Touchscreen)
+        module("adafruit_imageload", load=imageload_load)
+        module("bitmaptools", readinto=bitmaptools_readinto, arrayblit=bitmaptools_arrayblit)
+        tools = module("cedargrove_rgb_spectrumtools")
+        tools.__path__ = []
+        tools.n_color = module("cedargrove_rgb_spectrumtools.n_color", Spectrum=Spectrum)
+        module("micropython", const=lambda value: value)
+
+        # gc gains the CircuitPython memory functions; collection is counted and
+        #   its pause charged to the clock rather than run because the host heap
+        #   says nothing about the device
+        fake_gc = module("gc")
+        for name in dir(_host_gc):
+            if not name.startswith("__"):
+                setattr(fake_gc, name, getattr(_host_gc, name))
+        fake_gc.collect = self._collect
+        fake_gc.mem_free = self._mem_free
+        fake_gc.mem_alloc = lambda: self.heap_used
+
+        mods["time"] = self.clock.module()
+        return mods
+
+    def install(self):
+        """Make this the hardware model used by the fake modules and map
+        absolute file paths onto the simulated drive."""
+        global _hardware
+        _hardware = self
+        builtins.open = self.open
+
+    @staticmethod
+    def uninstall():
+        global _hardware
+        _hardware = None
+        builtins.open = _host_open
@@ -0,0 +1,184 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# herd_benchmark.py  2022-12-23 1.0.0 Cedar Grove Studios
+
+"""Compare the per-frame cost of animating the herd with individual
+NekoAnimatedSprite objects and with the NekoHerd engine. Before timing, the
+two engines are run side by side from the same seed to check that NekoHerd
+reproduces NekoAnimatedSprite.update exactly, following single targets and
+dragged waypoint paths, with and without the shared animation tick, and after
+days of uptime.
+
+    python -m simulator.herd_benchmark --cats 6 24 100
+"""
+
+import argparse
+import importlib
+import random
+import time
+
+from simulator.runner import Simulator
+
+SPRITE_SHEET = "/neko_helpers/neko_cat_spritesheet.bmp"
+DISPLAY_SIZE = (480, 320)
+
+# Simulated seconds per frame; a binary fraction keeps float32 timestamps exact
+FRAME_TIME = 1 / 64
+
+# Shared animation tick for the tick-mode check; also a binary fraction
+TICK_TIME = 1 / 8
+
+# Clock reading for the long-uptime check; a float32 timestamp this large
+#   resolves only a quarter of a second
+UPTIME = 30 * 24 * 3600.0 + 0.3
+
+
+class Herd:
+    """Builds a herd with either engine inside an installed Simulator and
+    steps it one frame at a time, optionally on a shared animation tick."""
+
+    def __init__(self, sim, engine, cats, seed, tick=None):
+        self.sim = sim
+        self.engine = engine
+        self.tick = None
+        if tick:
+            self.tick = importlib.import_module("neko_helpers.animation_tick").AnimationTick(tick)
+        displayio = importlib.import_module("displayio")
+        neko = importlib.import_module("neko_helpers.neko")
+        neko_herd = importlib.import_module("neko_helpers.neko_herd")
+        cache = importlib.import_module("neko_helpers.sprite_cache").SpriteSheetCache()
+        random.seed(seed)
+        self.grids = []
+        self.herd = None
+        if engine == "herd":
+            self.herd = neko_herd.NekoHerd(cats, DISPLAY_SIZE)
+        for i in range(cats):
+            sheet, palette = cache.acquire(SPRITE_SHEET)
+            animation_time = 0.3 + random.randrange(-15, 15) / 100
+            if self.tick:
+                animation_time = self.tick.animation_time(animation_time)
+            x = DISPLAY_SIZE[0] // 2 - 16 + (i % 10) * 12 - 60
+            y = DISPLAY_SIZE[1] // 2 - 16 + (i // 10) * 12 - 60
+            if self.herd is not None:
+                grid = displayio.TileGrid(sheet, pixel_shader=palette, width=1,
+                    height=1, tile_width=32, tile_height=32)
+                grid.x = x
+                grid.y = y
+                self.herd.add(grid, animation_time=animation_time)
+            else:
+                grid = neko.NekoAnimatedSprite(animation_time=animation_time,
+                    display_size=DISPLAY_SIZE, sprites=sheet, palette=palette)
+                grid.x = x
+                grid.y = y
+            self.grids.append(grid)
+
+    def send_home_neko(self, location):
+        if self.herd is not None:
+            self.herd.set_moving_to(0, location)
+        else:
+            self.grids[0].moving_to = location
+
+    def drag_home_neko(self, path):
+        if self.herd is not None:
+            self.herd.clear_path(0)
+            for x, y in path:
+                self.herd.add_waypoint(0, x, y)
+        else:
+            self.grids[0].clear_path()
+            for x, y in path:
+                self.grids[0].add_waypoint(x, y)
+
+    def home_path(self):
+        if self.herd is not None:
+            return self.herd.path_head(0), self.herd.waypoints(0), self.herd.path_changes(0)
+        home = self.grids[0]
+        return home.path_head, home.waypoints, home.path_changes
+
+    def step(self):
+        self.sim.clock.advance(FRAME_TIME)
+        now = self.tick.now() if self.tick else None
+        if self.herd is not None:
+            self.herd.update(now=now)
+        else:
+            for grid in self.grids:
+                grid.update(now)
+
+    def snapshot(self):
+        return [(grid.x, grid.y, grid[0]) for grid in self.grids]
+
+
+def _trace(engine, cats, frames, seed, tick=None, uptime=0):
+    sim = Simulator(step=0, duration=None)
+    sim.clock.advance(uptime)
+    with sim.installed():
+        herd = Herd(sim, engine, cats, seed, tick)
+        trace = []
+        for frame in range(frames):
+            if frame % 400 == 100:
+                herd.send_home_neko(((frame * 37) % 480, (frame * 53) % 320))
+            elif frame % 400 == 300:
+                # a zig-zag drag longer than the path holds
+                herd.drag_home_neko(
+                    [(40 + k * 20, 60 + (k % 3) * 60 + frame % 100) for k in range(20)]
+                )
+            herd.step()
+            trace.append((herd.snapshot(), herd.home_path()))
+    return trace
+
+
+def verify(cats=6, frames=4000, seed=1, tick=None, uptime=0):
+    """Run both engines from the same seed and compare every cat's location
+    and sprite on every frame.
+    :param float uptime: Seconds the clock has run before the herd is built.
+    :return integer: The first frame that differs, or -1 if none do.
+    """
+    sprites = _trace("sprites", cats, frames, seed, tick, uptime)
+    herd = _trace("herd", cats, frames, seed, tick, uptime)
+    for frame, (expected, actual) in enumerate(zip(sprites, herd)):
+        if expected != actual:
+            return frame
+    return -1
+
+
+def frame_cost(engine, cats, frames=2000, seed=0):
+    """Host microseconds to update the whole herd for one frame."""
+    sim = Simulator(step=0, duration=None)
+    with sim.installed():
+        herd = Herd(sim, engine, cats, seed)
+        for _ in range(50):
+            herd.step()
+        start = time.perf_counter()
+        for _ in range(frames):
+            herd.step()
+        return (time.perf_counter() - start) / frames * 1000000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cats", type=int, nargs="+", default=[6, 24, 100])
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    for tick, uptime in ((None, 0), (TICK_TIME, 0), (None, UPTIME)):
+        mode = f" on a {tick}s tick" if tick else ""
+        if uptime:
+            mode += f" after {uptime / 86400:.0f} days of uptime"
+        mismatch = verify(seed=args.seed + 1, tick=tick, uptime=uptime)
+        if mismatch >= 0:
+            print(f"NekoHerd differs from NekoAnimatedSprite{mode} at frame {mismatch}")
+            raise SystemExit(1)
+        print(f"NekoHerd matches NekoAnimatedSprite.update{mode}")
+
+    for cats in args.cats:
+        sprites = frame_cost("sprites", cats, args.frames, args.seed)
+        herd = frame_cost("herd", cats, args.frames, args.seed)
+        print(
+            f"cats={cats:4d}  sprites={sprites:8.1f}us/frame  "
+            f"herd={herd:8.1f}us/frame  speedup={sprites / herd:5.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
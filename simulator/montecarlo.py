@@ -0,0 +1,490 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# montecarlo.py  2023-01-15 1.0.0 Cedar Grove Studios
+
+"""Monte Carlo model of wandering cats for tuning `NekoAnimatedSprite`'s
+behavior parameters on the host. Every cat of a large population is a row of
+NumPy arrays stepped with the same rules as `NekoAnimatedSprite.update()`
+when no one is touching the display; every parameter set of a sweep is
+stepped together and the population is split across a process pool. For
+each parameter set the share of time spent moving, scratching, sitting,
+cleaning and sleeping, the wall hits per cat per minute and how evenly the
+cats cover the display are reported, with an optional heatmap of where they
+spend their time. Requires NumPy.
+
+`--check` first drives the vectorized model and real `NekoAnimatedSprite`
+instances with the same random draws and compares every cat on every loop;
+exits non-zero if they differ.
+
+    python -m simulator.montecarlo --cats 20000 --duration 300 --heatmap
+    python -m simulator.montecarlo --sweep CONFIG_STOP_CHANCE_FACTOR=10,30,60 CONFIG_MIN_SCRATCH_TIME=1,2,4
+    python -m simulator.montecarlo --check
+"""
+
+import argparse
+import concurrent.futures
+import importlib
+import itertools
+import os
+import sys
+import time
+
+import numpy as np
+
+from simulator.runner import Simulator
+
+# NekoAnimatedSprite class attributes that may be swept
+PARAMETERS = (
+    "CONFIG_STEP_SIZE",
+    "CONFIG_STOP_CHANCE_FACTOR",
+    "CONFIG_START_CHANCE_FACTOR",
+    "CONFIG_MIN_SCRATCH_TIME",
+)
+
+# main loop interval; a binary fraction so that loop times add up exactly
+FRAME_TIME = 1 / 64
+
+# heatmap cell size in pixels
+CELL = 16
+
+# heatmap shades, least to most visited
+SHADES = " .:-=+*#%@"
+
+
+def load_model():
+    """Read the state tables, state groups and default parameters from
+    `NekoAnimatedSprite` and the configuration.
+    :return dict: NumPy tables and plain values; small enough to send to
+     each worker process.
+    """
+    sim = Simulator(step=0, duration=None)
+    with sim.installed():
+        neko = importlib.import_module("neko_helpers.neko").NekoAnimatedSprite
+        config = importlib.import_module("neko_configuration").Configuration
+        table = neko.STATE_TABLE
+        step_x = np.array(list(table.step_x), dtype=np.int64)
+        step_y = np.array(list(table.step_y), dtype=np.int64)
+        flags = np.array(list(table.flags), dtype=np.int64)
+        moving = (flags & table.MOVING) != 0
+        scratching_ids = [neko.STATE_SCRATCHING_LEFT[0], neko.STATE_SCRATCHING_RIGHT[0],
+            neko.STATE_SCRATCHING_DOWN[0], neko.STATE_SCRATCHING_UP[0]]
+        return {
+            "entry_start": np.array(list(table.entry_start), dtype=np.int64),
+            "entry_count": np.array(list(table.entry_count), dtype=np.int64),
+            "sprite": np.array(list(table.sprite), dtype=np.int64),
+            "hold": np.array(list(table.hold), dtype=np.int64),
+            "moving": moving,
+            "scratching": (flags & table.SCRATCHING) != 0,
+            # step directions; the step lengths come from CONFIG_STEP_SIZE
+            "direction_x": np.sign(step_x),
+            "direction_y": np.sign(step_y),
+            "moving_ids": np.array(list(table.moving_ids), dtype=np.int64),
+            "rest_ids": np.array(neko._REST_IDS, dtype=np.int64),
+            "scratch_left": neko.STATE_SCRATCHING_LEFT[0],
+            "scratch_right": neko.STATE_SCRATCHING_RIGHT[0],
+            "scratch_down": neko.STATE_SCRATCHING_DOWN[0],
+            "scratch_up": neko.STATE_SCRATCHING_UP[0],
+            "groups": {
+                "moving": list(np.nonzero(moving)[0]),
+                "scratching": scratching_ids,
+                "sitting": [neko.STATE_SITTING[0]],
+                "cleaning": [neko.STATE_CLEANING[0]],
+                "sleeping": [neko.STATE_SLEEPING[0]],
+            },
+            "tile": (neko.TILE_WIDTH, neko.TILE_HEIGHT),
+            "animation_time": config.ANIMATION_TIME,
+            "defaults": {name: getattr(neko, name) for name in PARAMETERS},
+        }
+
+
+class Cats:
+    """A population of cats as NumPy arrays, one row per cat. `update` takes
+    one main loop step for every cat with the rules of
+    `NekoAnimatedSprite.update()` without a path to follow. Every parameter
+    set gets `count` rows, so a whole sweep steps together.
+
+    Each loop draws two uniform numbers per cat that is `due()` to animate, a
+    roll and a pick. A cat that animates rolls `randint(0, factor - 1)` as
+    `int(roll * factor)` and chooses `choice(ids)` as `ids[int(pick * len(ids))]`; no update needs
+    more than one of each, so `SlotRandom` replays the same draws into a
+    `NekoAnimatedSprite`.
+
+    :param dict model: The `load_model()` tables.
+    :param list param_sets: A dict of the CONFIG_ parameters by name for
+     each group of cats.
+    :param integer count: The number of cats in each group.
+    :param tuple display_size: The display (width, height).
+    :param numpy.random.Generator rng: Draws the cats' animation times.
+    :param bool center: Start the cats at the display center, as the main
+     loop does, rather than at random locations."""
+
+    def __init__(self, model, param_sets, count, display_size, rng, center=True):
+        self.model = model
+        self.group = np.repeat(np.arange(len(param_sets)), count)
+        step_size = np.array([params["CONFIG_STEP_SIZE"] for params in param_sets])
+        self.step_size = step_size[self.group]
+        self.stop_factor = np.array(
+            [params["CONFIG_STOP_CHANCE_FACTOR"] for params in param_sets])[self.group]
+        self.start_factor = np.array(
+            [params["CONFIG_START_CHANCE_FACTOR"] for params in param_sets])[self.group]
+        self.min_scratch_time = np.array(
+            [params["CONFIG_MIN_SCRATCH_TIME"] for params in param_sets])[self.group]
+        count *= len(param_sets)
+        self.display_size = display_size
+        self.tile = model["tile"]
+
+        # step vectors by group and state as the state definitions compute
+        #   them: diagonal steps are half steps, floor divided
+        diagonal = (model["direction_x"] != 0) & (model["direction_y"] != 0)
+        step_size = step_size[:, np.newaxis]
+        self.step_x = np.where(diagonal, model["direction_x"] * step_size // 2,
+            model["direction_x"] * step_size)
+        self.step_y = np.where(diagonal, model["direction_y"] * step_size // 2,
+            model["direction_y"] * step_size)
+
+        width, height = display_size
+        if center:
+            self.x = np.full(count, width // 2 - self.tile[0] // 2, dtype=np.int64)
+            self.y = np.full(count, height // 2 - self.tile[1] // 2, dtype=np.int64)
+        else:
+            self.x = rng.integers(1, width - self.tile[0] - 1, count)
+            self.y = rng.integers(1, height - self.tile[1] - 1, count)
+        # the main loop's animation time spread
+        self.animation_time = model["animation_time"] + rng.integers(-15, 15, count) / 100
+
+        self.state = np.zeros(count, dtype=np.int64)
+        self.index = np.zeros(count, dtype=np.int64)
+        self.hold_count = np.zeros(count, dtype=np.int64)
+        # a new TileGrid shows tile 0
+        self.tile_index = np.zeros(count, dtype=np.int64)
+        self.last_animation = np.full(count, -1.0)
+        self.last_state_change = np.full(count, -1.0)
+        # by group
+        self.wall_hits = np.zeros(len(param_sets), dtype=np.int64)
+
+    def _set_state(self, cats, state_ids, now):
+        # as NekoAnimatedSprite._set_state for the rows `cats`
+        state_ids = np.broadcast_to(state_ids, cats.shape)
+        changed = self.state[cats] != state_ids
+        cats = cats[changed]
+        state_ids = state_ids[changed]
+        self.state[cats] = state_ids
+        self.index[cats] = 0
+        self.hold_count[cats] = 0
+        self.tile_index[cats] = self.model["sprite"][self.model["entry_start"][state_ids]]
+        self.last_state_change[cats] = now
+
+    def due(self, now):
+        """The cats that animate on the loop at `now`; no other cat changes.
+        :param float now: The loop time.
+        :return numpy.ndarray: Their rows.
+        """
+        return np.nonzero(now > self.last_animation + self.animation_time)[0]
+
+    def update(self, now, cats, roll, pick):
+        """Take one main loop step.
+        :param float now: The loop time.
+        :param numpy.ndarray cats: The `due()` rows.
+        :param numpy.ndarray roll: A uniform [0, 1) draw per due cat.
+        :param numpy.ndarray pick: A uniform [0, 1) draw per due cat.
+        """
+        model = self.model
+        if not cats.size:
+            return
+
+        # animate: show the entry's sprite and count a frame of its hold
+        state = self.state[cats]
+        entry = model["entry_start"][state] + self.index[cats]
+        self.tile_index[cats] = model["sprite"][entry]
+        hold_count = self.hold_count[cats] + 1
+        held = hold_count >= model["hold"][entry]
+        hold_count[held] = 0
+        index = self.index[cats] + held
+        index[index >= model["entry_count"][state]] = 0
+        self.hold_count[cats] = hold_count
+        self.index[cats] = index
+        self.last_animation[cats] = now
+
+        # change states
+        moving = model["moving"][state]
+        scratching = ~moving & model["scratching"][state]
+        rested = ~moving & ~scratching & (index == 0) & (hold_count == 0)
+        stop = moving & ((roll * self.stop_factor[cats]).astype(np.int64) == 0)
+        start = (
+            scratching
+            & (now >= self.last_state_change[cats] + self.min_scratch_time[cats])
+            & ((roll * self.start_factor[cats]).astype(np.int64) == 0)
+        )
+        rest_ids, moving_ids = model["rest_ids"], model["moving_ids"]
+        new_state = state.copy()
+        new_state[stop] = rest_ids[(pick[stop] * len(rest_ids)).astype(np.int64)]
+        go = start | rested
+        new_state[go] = moving_ids[(pick[go] * len(moving_ids)).astype(np.int64)]
+        self._set_state(cats, new_state, now)
+
+        # step horizontally, then vertically; a wall starts scratching
+        group = self.group[cats]
+        for position, steps, limit, tile, near, far in (
+            (self.x, self.step_x, self.display_size[0], self.tile[0],
+                model["scratch_left"], model["scratch_right"]),
+            (self.y, self.step_y, self.display_size[1], self.tile[1],
+                model["scratch_up"], model["scratch_down"]),
+        ):
+            current = position[cats]
+            moved = current + steps[group, self.state[cats]]
+            fits = (moved >= 0) & (moved < limit - tile)
+            position[cats[fits]] = moved[fits]
+            far_wall = ~fits & (current > self.step_size[cats])
+            near_wall = ~fits & ~far_wall
+            position[cats[far_wall]] = limit - tile - 1
+            position[cats[near_wall]] = 1
+            self._set_state(cats[far_wall], far, now)
+            self._set_state(cats[near_wall], near, now)
+            self.wall_hits += np.bincount(group[~fits], minlength=self.wall_hits.size)
+
+
+def simulate(task):
+    """Run one share of a population; a process pool task.
+    :param tuple task: (model, parameter sets, cats per set, duration,
+     display size, seed, center start).
+    :return dict: Summed state loop counts, wall hits and heatmaps, each by
+     parameter set, and the loops.
+
+    A cat's state and cell only change on the loops it animates, so the loops
+    it spent in the old ones are counted then, and once more at the end,
+    rather than every cat on every loop.
+    """
+    model, param_sets, count, duration, display_size, seed, center = task
+    rng = np.random.default_rng(seed)
+    cats = Cats(model, param_sets, count, display_size, rng, center)
+    tile_x, tile_y = model["tile"]
+    columns = -(-display_size[0] // CELL)
+    rows = -(-display_size[1] // CELL)
+    states = len(model["entry_start"])
+    state_loops = np.zeros(len(param_sets) * states, dtype=np.int64)
+    heat = np.zeros(len(param_sets) * rows * columns, dtype=np.int64)
+
+    def tally(which, until):
+        # count the loops from `since` up to `until` in each cat's state and cell
+        held = until - since[which]
+        group = cats.group[which]
+        cells = ((cats.y[which] + tile_y // 2) // CELL * columns
+            + (cats.x[which] + tile_x // 2) // CELL)
+        state_loops[:] += np.bincount(group * states + cats.state[which], held,
+            state_loops.size).astype(np.int64)
+        heat[:] += np.bincount(group * rows * columns + cells, held,
+            heat.size).astype(np.int64)
+        since[which] = until
+
+    # the first loop each cat's current state and cell were counted from
+    since = np.ones(cats.group.size, dtype=np.int64)
+    loops = int(duration / FRAME_TIME)
+    for loop in range(1, loops + 1):
+        now = loop * FRAME_TIME
+        due = cats.due(now)
+        if not due.size:
+            continue
+        tally(due, loop)
+        draws = rng.random((2, due.size))
+        cats.update(now, due, draws[0], draws[1])
+    tally(np.arange(cats.group.size), loops + 1)
+    return {
+        "state_loops": state_loops.reshape(len(param_sets), states),
+        "wall_hits": cats.wall_hits,
+        "loops": loops,
+        "cats": count,
+        "heat": heat.reshape(len(param_sets), rows, columns),
+    }
+
+
+def merge(model, results, index, duration, display_size):
+    """Combine the workers' results for the parameter set at `index`.
+    :return dict: Time shares by state group, wall hits per cat per minute,
+     coverage and the heatmap. Coverage is the entropy of the cats' time over
+     the cells a cat's center can reach, as a share of the entropy of an even
+     spread: 1.0 when every cell holds the same time, 0.0 when one holds it
+     all.
+    """
+    state_loops = sum(result["state_loops"][index] for result in results)
+    total = state_loops.sum()
+    shares = {
+        group: state_loops[ids].sum() / total for group, ids in model["groups"].items()
+    }
+    cats = sum(result["cats"] for result in results)
+    heat = sum(result["heat"][index] for result in results)
+    tile_x, tile_y = model["tile"]
+    reachable = heat[
+        (tile_y // 2 + 1) // CELL:(display_size[1] - tile_y // 2 - 1) // CELL + 1,
+        (tile_x // 2 + 1) // CELL:(display_size[0] - tile_x // 2 - 1) // CELL + 1,
+    ]
+    visits = reachable[reachable > 0] / reachable.sum()
+    coverage = -np.sum(visits * np.log(visits)) / np.log(reachable.size)
+    return {
+        "shares": shares,
+        "wall_rate": sum(result["wall_hits"][index] for result in results) / cats
+            / (duration / 60),
+        "coverage": coverage,
+        "heat": heat,
+    }
+
+
+def run_all(model, param_sets, cats, duration, display_size, seed, workers, center=True):
+    """Simulate every parameter set on `workers` processes; each process
+    steps its share of the cats of all the sets together.
+    :return list: A `merge()` result for each parameter set, in order.
+    """
+    shares = [cats // workers + (i < cats % workers) for i in range(workers)]
+    shares = [share for share in shares if share]
+    seeds = np.random.SeedSequence(seed).spawn(len(shares))
+    tasks = [
+        (model, param_sets, share, duration, display_size, seeds[i], center)
+        for i, share in enumerate(shares)
+    ]
+    if workers == 1:
+        results = [simulate(task) for task in tasks]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(simulate, tasks))
+    return [
+        merge(model, results, p, duration, display_size) for p in range(len(param_sets))
+    ]
+
+
+class SlotRandom:
+    """A `random` stand-in for `NekoAnimatedSprite` that answers from the
+    current loop's roll and pick draws, as `Cats` does."""
+
+    def __init__(self):
+        self.roll = 0.0
+        self.pick = 0.0
+
+    def randint(self, low, high):
+        return low + int(self.roll * (high - low + 1))
+
+    def choice(self, sequence):
+        return sequence[int(self.pick * len(sequence))]
+
+
+def check(model, params, count, duration, display_size, seed):
+    """Step `Cats` and `NekoAnimatedSprite` instances side by side from the
+    same draws and compare every cat after every loop.
+    :return str: The first difference, or None if there is none.
+    """
+    rng = np.random.default_rng(seed)
+    cats = Cats(model, [params], count, display_size, rng, center=False)
+    sim = Simulator(step=0, duration=None)
+    with sim.installed():
+        neko = importlib.import_module("neko_helpers.neko")
+        config = importlib.import_module("neko_configuration").Configuration
+        cache = importlib.import_module("neko_helpers.sprite_cache").SpriteSheetCache()
+        sheet, palette = cache.acquire(config.SPRITE_SHEET)
+        sprites = []
+        for i in range(count):
+            slot = SlotRandom()
+            sprite = neko.NekoAnimatedSprite(animation_time=float(cats.animation_time[i]),
+                display_size=display_size, sprites=sheet, palette=palette,
+                rng=slot)
+            for name in PARAMETERS[1:]:
+                setattr(sprite, name, params[name])
+            sprite.x = int(cats.x[i])
+            sprite.y = int(cats.y[i])
+            sprites.append((sprite, slot))
+
+        for loop in range(1, int(duration / FRAME_TIME) + 1):
+            now = loop * FRAME_TIME
+            draws = rng.random((2, count))
+            due = cats.due(now)
+            cats.update(now, due, draws[0, due], draws[1, due])
+            for i, (sprite, slot) in enumerate(sprites):
+                slot.roll = float(draws[0, i])
+                slot.pick = float(draws[1, i])
+                sprite.update(now)
+                expected = (sprite.x, sprite.y, sprite._CURRENT_STATE_ID,
+                    sprite.CURRENT_ANIMATION_INDEX, sprite._hold_count, sprite[0])
+                actual = (int(cats.x[i]), int(cats.y[i]), int(cats.state[i]),
+                    int(cats.index[i]), int(cats.hold_count[i]), int(cats.tile_index[i]))
+                if expected != actual:
+                    return (f"cat {i} at {now:.3f}s: (x, y, state, index, hold, tile) "
+                        f"is {actual}, NekoAnimatedSprite has {expected}")
+    return None
+
+
+def parse_sweep(items, defaults):
+    """Expand NAME=V1,V2 items into every combination of parameter sets."""
+    axes = []
+    for item in items:
+        name, _, values = item.partition("=")
+        if name not in PARAMETERS:
+            raise SystemExit(f"cannot sweep {name!r}; choose from {', '.join(PARAMETERS)}")
+        kind = type(defaults[name])
+        axes.append([(name, kind(value)) for value in values.split(",")])
+    return [dict(defaults, **dict(combination)) for combination in itertools.product(*axes)]
+
+
+def print_heatmap(heat):
+    """Print the heatmap, one character per cell, shaded by visits."""
+    scaled = heat * (len(SHADES) - 1) // max(int(heat.max()), 1)
+    for row in scaled:
+        print("|" + "".join(SHADES[value] for value in row) + "|")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cats", type=int,
+        help="cats per parameter set (default 20000, or 2000 with --sweep)")
+    parser.add_argument("--duration", type=float,
+        help="simulated seconds (default 300, or 120 with --sweep)")
+    parser.add_argument("--display", default="320x240", help="display WIDTHxHEIGHT")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--sweep", nargs="+", default=[], metavar="NAME=V1,V2",
+        help="parameter values to try in every combination")
+    parser.add_argument("--random-start", action="store_true",
+        help="start cats at random locations rather than the display center")
+    parser.add_argument("--heatmap", action="store_true", help="print each heatmap")
+    parser.add_argument("--check", action="store_true",
+        help="compare the model with NekoAnimatedSprite first")
+    args = parser.parse_args(argv)
+    # a sweep steps every parameter set's cats together; keep it to seconds
+    if args.cats is None:
+        args.cats = 2000 if args.sweep else 20000
+    if args.duration is None:
+        args.duration = 120.0 if args.sweep else 300.0
+    display_size = tuple(int(size) for size in args.display.split("x"))
+
+    model = load_model()
+    param_sets = parse_sweep(args.sweep, model["defaults"])
+
+    if args.check:
+        # the defaults, then quick state changes to exercise every branch
+        for params in (model["defaults"], dict(model["defaults"], CONFIG_STOP_CHANCE_FACTOR=4,
+                CONFIG_START_CHANCE_FACTOR=2, CONFIG_MIN_SCRATCH_TIME=1)):
+            difference = check(model, params, 48, 120.0, display_size, args.seed)
+            if difference:
+                print(f"FAIL: {difference}")
+                return 1
+        print("OK: the vectorized model matches NekoAnimatedSprite.update() loop for loop")
+
+    start = time.perf_counter()
+    results = run_all(model, param_sets, args.cats, args.duration, display_size,
+        args.seed, args.workers, not args.random_start)
+    elapsed = time.perf_counter() - start
+
+    print(f"cats={args.cats}  duration={args.duration:.0f}s  display={args.display}  "
+        f"workers={args.workers}")
+    for params, result in zip(param_sets, results):
+        swept = [item.partition("=")[0] for item in args.sweep]
+        changed = [f"{name[7:]}={params[name]}" for name in PARAMETERS if name in swept]
+        shares = "  ".join(f"{group}={share * 100:5.1f}%" for group, share in result["shares"].items())
+        print(f"{' '.join(changed) or 'defaults':40s} {shares}  "
+            f"walls={result['wall_rate']:5.2f}/cat/min  coverage={result['coverage'] * 100:5.1f}%")
+        if args.heatmap:
+            print_heatmap(result["heat"])
+    print(f"{len(param_sets) * args.cats * args.duration / 3600:.0f} cat-hours "
+        f"in {elapsed:.1f}s host time")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
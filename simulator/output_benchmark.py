@@ -0,0 +1,79 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# output_benchmark.py  2023-01-13 1.0.0 Cedar Grove Studios
+
+"""Compare the NeoPixel and backlight values set by the screensaver fades
+with the writes that reach the hardware through `peripheral_output`, for
+several `OUTPUT_MAX_RATE` settings. Each run fades the display in at startup
+and out after `DISPLAY_ACTIVE_TIME`, then ends while the display is dark;
+the NeoPixel and backlight must both be off by then. Exits non-zero if a
+dark value was never written.
+
+    python -m simulator.output_benchmark --rates 0 30 15
+"""
+
+import argparse
+import sys
+
+from simulator.runner import Simulator
+
+# Screensaver script: awake for ACTIVE_TIME seconds, then dark until the end
+ACTIVE_TIME = 5
+DURATION = 12.0
+
+
+def run(cats, rate):
+    """Run the screensaver script with an output rate limit.
+    :return tuple: (pixel output, backlight output, stats, failure messages)
+    """
+    sim = Simulator(cats=cats, duration=DURATION,
+        config={"DISPLAY_ACTIVE_TIME": ACTIVE_TIME, "OUTPUT_MAX_RATE": rate})
+    modules = []
+
+    def watch(now):
+        if not modules and hasattr(sys.modules.get("neko_code"), "backlight_output"):
+            modules.append(sys.modules["neko_code"])
+
+    sim.clock.add_listener(watch)
+    report = sim.run()
+
+    code = modules[0]
+    failures = []
+    if code._screensaver_state != "DIMMED":
+        failures.append(f"ended {code._screensaver_state}, not dark")
+    if code.neo._pixels[0]:
+        failures.append(f"NeoPixel left at {code.neo._pixels[0]:06x}")
+    if code.display.lite.duty_cycle:
+        failures.append(f"backlight left at duty cycle {code.display.lite.duty_cycle}")
+    return code.pixel_output, code.backlight_output, report.stats, failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cats", type=int, default=6)
+    parser.add_argument("--rates", type=int, nargs="+", default=[0, 30, 15])
+    args = parser.parse_args(argv)
+
+    ok = True
+    for rate in args.rates:
+        pixel, backlight, stats, failures = run(args.cats, rate)
+        # the hardware counts include writes made outside the outputs, such
+        #   as the backlight's initial duty cycle
+        print(
+            f"rate={rate:3d}/s  neopixel: set={pixel.requests:4d} "
+            f"written={pixel.writes:4d} (hardware {stats.neopixel_writes:4d})  "
+            f"backlight: set={backlight.requests:4d} "
+            f"written={backlight.writes:4d} (hardware {stats.pwm_writes:4d})"
+        )
+        for failure in failures:
+            print(f"FAIL rate={rate}: {failure}")
+            ok = False
+    if not ok:
+        return 1
+    print("OK: the dark NeoPixel and backlight values were written")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
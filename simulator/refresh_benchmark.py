@@ -0,0 +1,87 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# refresh_benchmark.py  2023-01-06 1.0.0 Cedar Grove Studios
+
+"""Report the simulated display refresh time against the SPI bus clock for
+each FeatherWing display profile: a full-screen refresh (a background color
+change) and a single cat step (one 32x32 sprite moving 4 pixels). Requested
+baudrates are rounded down to what the RP2040 can divide its 125MHz
+peripheral clock to; the profile's own baudrate is marked with `*`.
+
+    python -m simulator.refresh_benchmark --mhz 12 24 32 40 64
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+
+from simulator.runner import Simulator
+
+NAMES = ("2.4-inch", "3.5-inch")
+
+
+def refresh_times(name, baudrate):
+    """Time a full-screen refresh and a cat step on one display profile.
+    :return tuple: (bus clock in Hz, full refresh seconds, cat step seconds,
+     profile baudrate)
+    """
+    sim = Simulator(step=0, duration=None)
+    with sim.installed():
+        displayio = importlib.import_module("displayio")
+        module = importlib.import_module("neko_helpers.cedargrove_display")
+        with contextlib.redirect_stdout(io.StringIO()):
+            display = module.Display(name=name, baudrate=baudrate)
+        display.auto_refresh = False
+
+        # the background and a cat, as neko_code builds them
+        group = displayio.Group()
+        background_palette = displayio.Palette(1)
+        background = displayio.Group(scale=max(display.width, display.height) // 20)
+        background.append(
+            displayio.TileGrid(displayio.Bitmap(20, 15, 1), pixel_shader=background_palette)
+        )
+        group.append(background)
+        cat = displayio.TileGrid(
+            displayio.Bitmap(32, 32, 2), pixel_shader=displayio.Palette(2)
+        )
+        group.append(cat)
+        display.show(group)
+        display.refresh()
+
+        clock = sim.clock
+        start = clock.elapsed
+        background_palette[0] = 0x3CB371
+        display.refresh()
+        full = clock.elapsed - start
+
+        start = clock.elapsed
+        cat.x += 4
+        display.refresh()
+        step = clock.elapsed - start
+        return display.display.bus.baudrate, full, step, display.profile["baudrate"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mhz", type=float, nargs="+", default=[12, 24, 32, 40, 64],
+        help="requested SPI baudrates in MHz; the profile's own is added")
+    args = parser.parse_args(argv)
+
+    for name in NAMES:
+        profile_baudrate = refresh_times(name, None)[3]
+        baudrates = sorted({int(mhz * 1000000) for mhz in args.mhz} | {profile_baudrate})
+        print(f"{name} display")
+        for baudrate in baudrates:
+            clock, full, step, _ = refresh_times(name, baudrate)
+            mark = "*" if baudrate == profile_baudrate else " "
+            print(
+                f"  {mark}{baudrate / 1e6:5.1f}MHz -> {clock / 1e6:5.2f}MHz  "
+                f"full={full * 1000:6.1f}ms ({1 / full:5.1f} fps)  "
+                f"cat step={step * 1000:5.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# replay.py  2023-01-10 1.0.0 Cedar Grove Studios
+
+"""Record a simulated Neko session to a trace file, then replay it so that
+two versions of the code (or two configurations) can be compared on exactly
+the same workload, frame by frame. The replay reads back the recorded clock
+and touch readings and the session's random seed; it reports the first frame
+that differs from the recording and the change in simulated cost per frame.
+
+    python -m simulator.replay record session.cgtr --cats 6 --duration 60
+    python -m simulator.replay play session.cgtr
+    python -m simulator.replay play session.cgtr --set REFRESH_MAX_FPS=30
+"""
+
+import argparse
+import ast
+import os
+
+from simulator.benchmark import touch_script
+from simulator.runner import Simulator
+from simulator.trace import ReplayDiverged, TraceRecorder, TraceReplayer
+
+
+def record(path, cats, duration, seed, config):
+    """Run a session with scripted taps and a drag and save its trace.
+    :return Report: The recorded run's measurements.
+    """
+    trace = TraceRecorder()
+    sim = Simulator(cats=cats, duration=duration, seed=seed, config=config, trace=trace)
+    touch_script(sim.touch, duration)
+    sim.touch.drag(12.0, (60, 200), (260, 60), 1.5)
+    report = sim.run()
+    trace.save(path)
+    return report
+
+
+def play(path, overrides=None):
+    """Replay a trace file, optionally with Configuration overrides.
+    :return tuple: (Report, TraceReplayer)
+    """
+    trace = TraceReplayer.load(path)
+    session = trace.session
+    config = dict(session["config"])
+    config.update(overrides or {})
+    sim = Simulator(
+        cats=session["cats"],
+        duration=None,
+        step=session["step"],
+        seed=session["seed"],
+        config=config,
+        built_in_display=session["built_in_display"],
+        trace=trace,
+    )
+    return sim.run(), trace
+
+
+def compare(trace):
+    """Summarize the replayed frames against the recorded ones."""
+    recorded = trace.recorded
+    replayed = trace.replayed
+    matched = min(len(recorded), len(replayed))
+    first = trace.first_mismatch
+    if first is None and len(recorded) != len(replayed):
+        first = matched
+    lines = [f"frames: recorded {len(recorded)}, replayed {len(replayed)}"]
+    if first is None:
+        lines.append("frames: every replayed frame matches the recording")
+    else:
+        lines.append(f"frames: identical through frame {first - 1}, first difference at frame {first}")
+    # compare costs over the frames that match the recording
+    same = matched if first is None else first
+    if same:
+        before = sum(frame[2] for frame in recorded[:same])
+        after = sum(frame[2] for frame in replayed[:same])
+        slower = sum(1 for a, b in zip(recorded[:same], replayed[:same]) if b[2] > a[2])
+        faster = sum(1 for a, b in zip(recorded[:same], replayed[:same]) if b[2] < a[2])
+        lines.append(
+            f"cost over {same} frames: recorded {before / same / 1000:.3f}ms/frame, "
+            f"replayed {after / same / 1000:.3f}ms/frame ({(after - before) / before * 100:+.1f}%), "
+            f"{slower} slower, {faster} faster"
+        )
+    return lines
+
+
+def _setting(text):
+    name, _, value = text.partition("=")
+    try:
+        return name, ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return name, value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    recorder = commands.add_parser("record", help="record a session")
+    recorder.add_argument("path")
+    recorder.add_argument("--cats", type=int, default=6)
+    recorder.add_argument("--duration", type=float, default=60.0)
+    recorder.add_argument("--seed", type=int, default=0)
+    recorder.add_argument("--herd", action="store_true",
+        help="animate with the NekoHerd engine")
+    player = commands.add_parser("play", help="replay a recorded session")
+    player.add_argument("path")
+    player.add_argument("--set", type=_setting, action="append", default=[],
+        metavar="NAME=VALUE", help="override a Configuration setting")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        report = record(args.path, args.cats, args.duration, args.seed,
+            {"USE_HERD_ENGINE": args.herd})
+        print(report.summary())
+        print(f"trace: {args.path}, {os.path.getsize(args.path)} bytes")
+        return 0
+
+    try:
+        report, trace = play(args.path, dict(args.set))
+    except ReplayDiverged as error:
+        print(f"replay diverged: {error}")
+        return 1
+    print(report.summary())
+    for line in compare(trace):
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
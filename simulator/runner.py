@@ -0,0 +1,245 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# runner.py  2022-12-20 1.0.0 Cedar Grove Studios
+
+import contextlib
+import importlib
+import io
+import os
+import sys
+import time
+
+from simulator.clock import SimulationComplete, VirtualClock
+from simulator.hardware import Hardware
+
+# The directory copied to the CIRCUITPY drive
+BUNDLE_ROOT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bundle_CG_Neko_Cat"
+)
+
+# Device modules that are reloaded fresh for every simulation run
+_DEVICE_MODULES = ("neko_code", "neko_configuration", "neko_helpers")
+
+
+class Report:
+    """The results of one simulation run. Rates are per simulated second;
+    update cost is measured in host time."""
+
+    def __init__(self, cats, sim_seconds, host_seconds, stats, counters, output):
+        self.cats = cats
+        self.sim_seconds = sim_seconds
+        self.host_seconds = host_seconds
+        self.stats = stats
+        self.boot_time = counters["boot_time"]
+        self.iterations = counters["iterations"]
+        self.updates = counters["updates"]
+        self.frames = counters["frames"]
+        self.update_time = counters["update_time"]
+        self.output = output
+
+    @property
+    def run_seconds(self):
+        """Simulated seconds spent in the main loop after boot."""
+        return max(self.sim_seconds - self.boot_time, 1e-9)
+
+    @property
+    def iterations_per_second(self):
+        return self.iterations / self.run_seconds
+
+    @property
+    def frames_per_second(self):
+        return self.frames / self.run_seconds
+
+    @property
+    def refreshes_per_second(self):
+        return self.stats.refreshes / self.run_seconds
+
+    @property
+    def pixels_per_second(self):
+        return self.stats.pixels_pushed / self.run_seconds
+
+    @property
+    def collections_per_second(self):
+        return self.stats.gc_collections / self.run_seconds
+
+    @property
+    def gc_pause_ms(self):
+        """Mean simulated milliseconds per garbage collection."""
+        if not self.stats.gc_collections:
+            return 0.0
+        return self.stats.gc_time / self.stats.gc_collections * 1000
+
+    @property
+    def update_cost_us(self):
+        """Mean host microseconds to update one cat."""
+        if not self.updates:
+            return 0.0
+        return self.update_time / self.updates * 1000000
+
+    def summary(self):
+        return (
+            f"cats={self.cats:4d}  loops/s={self.iterations_per_second:9.1f}  "
+            f"frames/s={self.frames_per_second:7.1f}  "
+            f"update={self.update_cost_us:7.2f}us/cat  "
+            f"refresh/s={self.refreshes_per_second:6.1f}  "
+            f"px/s={self.pixels_per_second:9.0f}  "
+            f"gc/s={self.collections_per_second:5.1f} ({self.gc_pause_ms:.1f}ms)  "
+            f"host={self.host_seconds:6.2f}s"
+        )
+
+
+class Simulator:
+    """Runs the unmodified `neko_code.py` main loop on the host against the
+    fake hardware in `simulator.hardware` and a virtual clock. The run ends
+    when `duration` seconds of simulated time have elapsed.
+
+    :param int cats: Number of cats; overrides `Configuration.CAT_QUANTITY`.
+    :param float duration: Simulated seconds to run, including boot.
+    :param float step: Simulated seconds consumed by each clock read.
+    :param int seed: The device's `RANDOM_SEED` so runs are repeatable.
+    :param dict config: Additional `Configuration` attribute overrides.
+    :param bool built_in_display: Model a board with a built-in display.
+    :param bool quiet: Capture the device's serial output instead of printing.
+    :param str root: Directory that stands in for the CIRCUITPY drive.
+    :param trace: A `simulator.trace` TraceRecorder to record the session's
+     clock and touch readings, or a TraceReplayer to supply them."""
+
+    def __init__(self, cats=6, duration=60.0, step=0.0005, seed=0, config=None,
+        built_in_display=False, quiet=True, root=BUNDLE_ROOT, trace=None,
+        ):
+        self.cats = cats
+        self.root = root
+        self.seed = seed
+        self.quiet = quiet
+        self.config = dict(config or {})
+        self.clock = VirtualClock(step=step, duration=duration)
+        self.hardware = Hardware(self.clock, root, built_in_display=built_in_display)
+        # Scripted touches; see FakeTouchController.tap and drag
+        self.touch = self.hardware.touch
+        self.trace = trace
+        self.clock.trace = trace
+        self.touch.trace = trace
+        self._counters = {
+            "boot_time": 0.0,
+            "iterations": 0,
+            "updates": 0,
+            "frames": 0,
+            "update_time": 0.0,
+        }
+
+    @staticmethod
+    def _is_device_module(name):
+        return any(name == mod or name.startswith(mod + ".") for mod in _DEVICE_MODULES)
+
+    def _instrument(self, sprite_class):
+        """Wrap the sprite's update and animate methods with counters."""
+        counters = self._counters
+        clock = self.clock
+        perf_counter = time.perf_counter
+        original_update = sprite_class.update
+        original_animate = sprite_class.animate
+        first = []
+
+        def update(sprite, *args, **kwargs):
+            if not first:
+                first.append(sprite)
+                counters["boot_time"] = clock.elapsed
+            if sprite is first[0]:
+                counters["iterations"] += 1
+            start = perf_counter()
+            try:
+                return original_update(sprite, *args, **kwargs)
+            finally:
+                counters["update_time"] += perf_counter() - start
+                counters["updates"] += 1
+
+        def animate(sprite, *args, **kwargs):
+            did_animate = original_animate(sprite, *args, **kwargs)
+            if did_animate:
+                counters["frames"] += 1
+            return did_animate
+
+        sprite_class.update = update
+        sprite_class.animate = animate
+
+    def _instrument_herd(self, herd_class):
+        """Wrap the herd engine's update method with counters."""
+        counters = self._counters
+        clock = self.clock
+        perf_counter = time.perf_counter
+        original_update = herd_class.update
+
+        def update(herd, *args, **kwargs):
+            if not counters["iterations"]:
+                counters["boot_time"] = clock.elapsed
+            counters["iterations"] += 1
+            frames = herd.frames_animated
+            start = perf_counter()
+            try:
+                return original_update(herd, *args, **kwargs)
+            finally:
+                counters["update_time"] += perf_counter() - start
+                counters["updates"] += len(herd)
+                counters["frames"] += herd.frames_animated - frames
+
+        herd_class.update = update
+
+    @contextlib.contextmanager
+    def installed(self):
+        """Install the fake modules and a fresh copy of the device code for the
+        duration of the context."""
+        fakes = self.hardware.modules()
+        saved = {
+            name: mod
+            for name, mod in sys.modules.items()
+            if name in fakes or self._is_device_module(name)
+        }
+        for name in list(sys.modules):
+            if self._is_device_module(name):
+                del sys.modules[name]
+        sys.modules.update(fakes)
+        sys.path.insert(0, self.root)
+        self.hardware.install()
+        try:
+            yield
+        finally:
+            self.hardware.uninstall()
+            sys.path.remove(self.root)
+            for name in list(sys.modules):
+                if name in fakes or self._is_device_module(name):
+                    del sys.modules[name]
+            sys.modules.update(saved)
+
+    def run(self):
+        """Run `neko_code.py` until the simulated duration has elapsed.
+        :return Report: The measurements for the run.
+        """
+        output = io.StringIO()
+        host_start = time.perf_counter()
+        if self.trace is not None:
+            self.trace.begin(self)
+        with self.installed():
+            config = importlib.import_module("neko_configuration").Configuration
+            config.CAT_QUANTITY = self.cats
+            config.RANDOM_SEED = self.seed
+            for name, value in self.config.items():
+                setattr(config, name, value)
+            neko = importlib.import_module("neko_helpers.neko")
+            self._instrument(neko.NekoAnimatedSprite)
+            herd = importlib.import_module("neko_helpers.neko_herd")
+            self._instrument_herd(herd.NekoHerd)
+            redirect = contextlib.redirect_stdout(output) if self.quiet else contextlib.nullcontext()
+            try:
+                with redirect:
+                    importlib.import_module("neko_code")
+            except SimulationComplete:
+                pass
+        return Report(
+            self.cats,
+            self.clock.elapsed,
+            time.perf_counter() - host_start,
+            self.hardware.stats,
+            self._counters,
+            output.getvalue(),
+        )
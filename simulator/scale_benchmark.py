@@ -0,0 +1,164 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# scale_benchmark.py  2023-01-14 1.0.0 Cedar Grove Studios
+
+"""Compare the two ways of drawing larger cats on the 3.5-inch 480x320
+FeatherWing (see `neko_helpers.cat_scale`): scaling the cat group and
+enlarging the sprite sheet once at startup. The enlarged sheet must match
+the sheet pixel for pixel, and a preloaded sheet must stay cached while a
+sprite acquires and releases it without counting as a sprite in the bytes
+saved. For each herd size and method the sprite sheet bytes held, free memory once started, boot time, pixels pushed per second
+and mean refresh time are reported next to unscaled cats; every cat must
+stay on the display. Exits non-zero on a failure.
+
+    python -m simulator.scale_benchmark --cats 1 6 --scale 2
+"""
+
+import argparse
+import importlib
+import sys
+
+from simulator.benchmark import touch_script
+from simulator.runner import Simulator
+
+HX8357 = {
+    "DISPLAY_NAME": "3.5-inch",
+    "CALIBRATION": ((214, 3879), (421, 3775)),
+    "ROTATION": 0,
+    "GC_FREE_WATERMARK": 32000,
+    "GC_IDLE_SLACK": 0.020,
+}
+
+
+def check_sheet(scale):
+    """Enlarge the sprite sheet and compare it with the original.
+    :return tuple: (mismatched pixels, simulated milliseconds to enlarge)
+    """
+    sim = Simulator(step=0, duration=None)
+    with sim.installed():
+        config = importlib.import_module("neko_configuration").Configuration
+        cache = importlib.import_module("neko_helpers.sprite_cache").SpriteSheetCache()
+        sheet, _ = cache.acquire(config.SPRITE_SHEET)
+        start = sim.clock.elapsed
+        scaled, _ = cache.acquire(config.SPRITE_SHEET, scale)
+        milliseconds = (sim.clock.elapsed - start) * 1000
+        mismatched = sum(
+            scaled[x, y] != sheet[x // scale, y // scale]
+            for y in range(scaled.height) for x in range(scaled.width)
+        )
+        if (scaled.width, scaled.height) != (sheet.width * scale, sheet.height * scale):
+            mismatched += 1
+    return mismatched, milliseconds
+
+
+def check_preload(scale):
+    """Preload a sheet, acquire and release it as a sprite would, then give
+    back the preload. :return list: Failure messages."""
+    failures = []
+    sim = Simulator(step=0, duration=None)
+    with sim.installed():
+        config = importlib.import_module("neko_configuration").Configuration
+        cache = importlib.import_module("neko_helpers.sprite_cache").SpriteSheetCache()
+        for sheet_scale in (1, scale):
+            bitmap = cache.preload(config.SPRITE_SHEET, sheet_scale)
+            acquired, _ = cache.acquire(config.SPRITE_SHEET, sheet_scale)
+            if cache.bytes_saved:
+                failures.append(f"x{sheet_scale} preload counted as a sprite in bytes_saved")
+            cache.release(config.SPRITE_SHEET, sheet_scale)
+            if acquired is not bitmap or cache.references(config.SPRITE_SHEET, sheet_scale) != 1:
+                failures.append(f"x{sheet_scale} sheet was not kept by its preload")
+            cache.release(config.SPRITE_SHEET, sheet_scale, preload=True)
+            if cache.references(config.SPRITE_SHEET, sheet_scale):
+                failures.append(f"x{sheet_scale} sheet was kept after its preload was released")
+        if cache.bytes_held:
+            failures.append(f"{cache.bytes_held} bytes held with nothing referenced")
+    return failures
+
+
+class Bounds:
+    """Samples the cats' display locations from a clock listener and counts
+    cats found partly off the display."""
+
+    INTERVAL = 0.25
+
+    def __init__(self, sim):
+        self.sim = sim
+        self.code = None
+        self.samples = 0
+        self.outside = 0
+        self._next = 0
+
+    def __call__(self, now):
+        if now < self._next:
+            return
+        self._next = now + self.INTERVAL
+        code = sys.modules.get("neko_code")
+        if not hasattr(code, "render"):
+            return
+        self.code = code
+        group = code.GROUP_SCALE
+        tile = code.herd.TILE_WIDTH if code.herd else code.nekos[0].TILE_WIDTH
+        width, height = code.display.width, code.display.height
+        for cat in code.cat_group:
+            self.samples += 1
+            if not (
+                0 <= cat.x * group and (cat.x + tile) * group <= width
+                and 0 <= cat.y * group and (cat.y + tile) * group <= height
+            ):
+                self.outside += 1
+
+
+def run(cats, scale, mode, duration, herd):
+    """Simulate a herd with a cat scale method. :return tuple: (Report,
+    Bounds, sheet bytes held, free bytes, method)"""
+    config = dict(HX8357, CAT_SCALE=scale, CAT_SCALE_MODE=mode, USE_HERD_ENGINE=herd)
+    sim = Simulator(cats=cats, duration=duration, config=config)
+    touch_script(sim.touch, duration)
+    bounds = Bounds(sim)
+    sim.clock.add_listener(bounds)
+    report = sim.run()
+    code = bounds.code
+    method = "sheet" if code.SHEET_SCALE > 1 else "group" if code.GROUP_SCALE > 1 else "none"
+    return report, bounds, code.sprite_cache.bytes_held, sim.hardware._mem_free(), method
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cats", type=int, nargs="+", default=[1, 6])
+    parser.add_argument("--scale", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=60.0)
+    parser.add_argument("--herd", action="store_true", help="use the herd engine")
+    args = parser.parse_args(argv)
+
+    ok = True
+    mismatched, milliseconds = check_sheet(args.scale)
+    print(f"sheet x{args.scale}: enlarged in {milliseconds:.1f} ms, {mismatched} pixels differ")
+    if mismatched:
+        print("FAIL: the enlarged sprite sheet does not match the sheet")
+        ok = False
+    for failure in check_preload(args.scale):
+        print(f"FAIL: {failure}")
+        ok = False
+
+    for cats in args.cats:
+        for scale, mode in ((1, "auto"), (args.scale, "group"), (args.scale, "sheet"), (args.scale, "auto")):
+            report, bounds, held, free, method = run(cats, scale, mode, args.duration, args.herd)
+            refresh_ms = report.stats.refresh_time / max(report.stats.refreshes, 1) * 1000
+            print(
+                f"cats={cats:3d}  scale={scale} {mode:5s} -> {method:5s}  "
+                f"sheet={held / 1000:6.1f}kb  free={free / 1000:6.1f}kb  "
+                f"boot={report.boot_time * 1000:4.0f}ms  px/s={report.pixels_per_second:7.0f}  "
+                f"refresh={refresh_ms:5.2f}ms"
+            )
+            if bounds.outside:
+                print(f"FAIL: {bounds.outside} of {bounds.samples} cat samples were off the display")
+                ok = False
+    if not ok:
+        return 1
+    print("OK: cats stay on the display with either method")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
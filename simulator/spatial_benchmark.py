@@ -0,0 +1,140 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# spatial_benchmark.py  2023-01-08 1.0.0 Cedar Grove Studios
+
+"""Show that the NekoHerd behaviors (avoid, follow, gather) scale linearly
+with the herd size. Each herd walks a field sized to keep the number of cats
+per screen area constant, as if the herd were spread over more displays. For
+each size the host cost per cat per frame is reported without and with the
+behaviors, together with the cats visited per neighbor query and the time of
+a SpatialGrid query against a scan of the whole herd.
+
+    python -m simulator.spatial_benchmark --cats 6 25 50 100 200
+"""
+
+import argparse
+import importlib
+import random
+import time
+
+from simulator.runner import Simulator
+
+# Screen area per cat: 24 cats on the 3.5-inch display
+AREA_PER_CAT = 480 * 320 // 24
+
+# Simulated seconds per frame
+FRAME_TIME = 1 / 64
+
+
+def field_size(cats):
+    """A 3:2 field with AREA_PER_CAT pixels for each cat."""
+    width = int((cats * AREA_PER_CAT * 3 / 2) ** 0.5)
+    return max(width, 96), max(width * 2 // 3, 64)
+
+
+def build_herd(cats, behaviors, seed):
+    """Create a herd of plain TileGrids scattered over the field."""
+    displayio = importlib.import_module("displayio")
+    neko_herd = importlib.import_module("neko_helpers.neko_herd")
+    size = field_size(cats)
+    random.seed(seed)
+    herd = neko_herd.NekoHerd(cats, size, behaviors=behaviors)
+    sheet = displayio.Bitmap(256, 192, 6)
+    palette = displayio.Palette(6)
+    for _ in range(cats):
+        grid = displayio.TileGrid(sheet, pixel_shader=palette, width=1, height=1,
+            tile_width=32, tile_height=32)
+        grid.x = random.randrange(1, size[0] - 33)
+        grid.y = random.randrange(1, size[1] - 33)
+        herd.add(grid, animation_time=0.3 + random.randrange(-15, 15) / 100)
+    return herd, size
+
+
+def update_cost(cats, behaviors, frames, seed):
+    """Host microseconds per cat per frame to update the herd.
+    :return tuple: (microseconds, the herd)
+    """
+    sim = Simulator(step=0, duration=None)
+    with sim.installed():
+        herd, size = build_herd(cats, behaviors, seed)
+        for frame in range(50):
+            sim.clock.advance(FRAME_TIME)
+            herd.update()
+        start = time.perf_counter()
+        for frame in range(frames):
+            sim.clock.advance(FRAME_TIME)
+            herd.update()
+            if frame % 200 == 0:
+                herd.gather((size[0] // 2, size[1] // 2), 96)
+        cost = (time.perf_counter() - start) / frames / cats * 1000000
+    return cost, herd
+
+
+def query_costs(herd, radius, rounds=20):
+    """Host microseconds per neighbor query with the herd's SpatialGrid and
+    with a scan of every cat, over every cat's location.
+    :return tuple: (grid microseconds, scan microseconds, cats visited per
+     grid query)
+    """
+    grid = herd._grid
+    found = herd._found
+    cats = len(herd)
+    locations = [herd.location(i) for i in range(cats)]
+    visits = grid.visits
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for i, (x, y) in enumerate(locations):
+            grid.neighbors(x, y, radius, found, i)
+    grid_cost = (time.perf_counter() - start) / rounds / cats * 1000000
+    visited = (grid.visits - visits) / rounds / cats
+
+    xs = herd._x
+    ys = herd._y
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for i, (x, y) in enumerate(locations):
+            count = 0
+            for j in range(cats):
+                if j != i and -radius <= xs[j] - x <= radius and -radius <= ys[j] - y <= radius:
+                    if count < len(found):
+                        found[count] = j
+                    count += 1
+    scan_cost = (time.perf_counter() - start) / rounds / cats * 1000000
+    return grid_cost, scan_cost, visited
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cats", type=int, nargs="+", default=[6, 12, 25, 50, 100, 200])
+    parser.add_argument("--frames", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    sim = Simulator(step=0, duration=None)
+    with sim.installed():
+        neko_herd = importlib.import_module("neko_helpers.neko_herd").NekoHerd
+        all_behaviors = neko_herd.AVOID | neko_herd.FOLLOW | neko_herd.GATHER
+        radius = neko_herd.CONFIG_NEIGHBOR_DISTANCE
+
+    costs = []
+    for cats in args.cats:
+        plain, _ = update_cost(cats, 0, args.frames, args.seed)
+        aware, herd = update_cost(cats, all_behaviors, args.frames, args.seed)
+        grid_cost, scan_cost, visited = query_costs(herd, radius)
+        costs.append(aware)
+        width, height = field_size(cats)
+        print(
+            f"cats={cats:4d}  field={width}x{height}  "
+            f"update={plain:5.2f}us/cat  with behaviors={aware:5.2f}us/cat  "
+            f"query: grid={grid_cost:6.2f}us ({visited:4.1f} visited)  scan={scan_cost:7.2f}us"
+        )
+    if len(costs) > 1:
+        print(
+            f"per-cat cost with behaviors at {args.cats[-1]} cats is "
+            f"{costs[-1] / costs[0]:.2f}x the cost at {args.cats[0]} cats"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# sprite_load_benchmark.py  2023-01-04 1.0.0 Cedar Grove Studios
+
+"""Compare loading the cat sprite sheet from the BMP file with
+`adafruit_imageload` and from the preconverted raw file with
+`neko_helpers.raw_sprite_sheet`. Both loaders must produce the same pixels and
+palette; the simulated load time and the simulated time from power-up to the
+first main loop iteration are reported for each. Exits non-zero on a mismatch.
+
+    python -m simulator.sprite_load_benchmark --cats 6
+"""
+
+import argparse
+import importlib
+import sys
+import time
+
+from simulator.runner import Simulator
+
+SHEETS = (
+    ("bmp", "/neko_helpers/neko_cat_spritesheet.bmp"),
+    ("raw", "/neko_helpers/neko_cat_spritesheet.raw"),
+)
+
+
+def load(path):
+    """Load a sprite sheet through SpriteSheetCache's loader selection.
+    :return tuple: (pixel rows, palette colors, simulated seconds, host seconds)
+    """
+    sim = Simulator(step=0, duration=None)
+    with sim.installed():
+        cache = importlib.import_module("neko_helpers.sprite_cache").SpriteSheetCache()
+        start = sim.clock.elapsed
+        host_start = time.perf_counter()
+        bitmap, palette = cache._load(path)
+        host_seconds = time.perf_counter() - host_start
+        sim_seconds = sim.clock.elapsed - start
+        pixels = [
+            bytes(bitmap[x, y] for x in range(bitmap.width)) for y in range(bitmap.height)
+        ]
+        colors = [palette[index] for index in range(len(palette))]
+    return pixels, colors, sim_seconds, host_seconds
+
+
+def boot_time(path, cats):
+    """Simulated seconds from power-up to the first main loop iteration."""
+    report = Simulator(cats=cats, duration=10.0, config={"SPRITE_SHEET": path}).run()
+    return report.boot_time
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cats", type=int, default=6, help="number of cats at boot")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, path in SHEETS:
+        pixels, colors, sim_seconds, host_seconds = load(path)
+        results[name] = (pixels, colors)
+        print(
+            f"{name}  load={sim_seconds * 1000:8.1f}ms  "
+            f"boot={boot_time(path, args.cats):6.3f}s  host={host_seconds * 1000:6.1f}ms"
+        )
+
+    if results["bmp"] != results["raw"]:
+        print("FAIL: the raw sprite sheet does not match the BMP")
+        return 1
+    print("OK: the raw sprite sheet matches the BMP")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
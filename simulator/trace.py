@@ -0,0 +1,255 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# trace.py  2023-01-10 1.0.0 Cedar Grove Studios
+
+"""Record a simulated session's inputs and replay them exactly.
+
+A TraceRecorder handed to the Simulator sees every clock reading and every
+touch panel reading made by the device code, and a digest of every display
+refresh. A TraceReplayer loaded from the saved trace supplies the recorded
+readings back in the same order, so the replayed session makes the same
+decisions even when the code under test costs more or less simulated time;
+its frames are compared one by one with the recorded ones.
+
+Trace file layout (little-endian):
+
+    header  "CGTR", version, flags, cats, seed, step, input length,
+            frame length, configuration length (HEADER)
+    body    zlib-compressed:
+      config  JSON object of Configuration overrides
+      inputs  clock and touch readings in the order they were made
+      frames  one entry per display refresh
+
+Inputs and frames are a stream of unsigned LEB128 varints. Each input is
+`payload << 3 | kind`; clock payloads are the microseconds since the previous
+reading. A frame is three varints: pixels pushed, the CRC-32 of its refresh
+areas and its simulated cost in microseconds since the previous frame.
+"""
+
+import json
+import struct
+import zlib
+
+from simulator.clock import SimulationComplete
+
+MAGIC = b"CGTR"
+VERSION = 1
+HEADER = struct.Struct("<4sBBHIdIIH")
+
+# flags
+BUILT_IN_DISPLAY = 0x01
+
+# input kinds
+CLOCK, TOUCHED, COUNT, POP, POINT = range(5)
+_KIND_NAMES = ("clock", "touched", "count", "pop", "point")
+_TOUCH_KINDS = {"touched": TOUCHED, "count": COUNT, "pop": POP, "point": POINT}
+
+
+class ReplayDiverged(BaseException):
+    """Raised when the code under test reads an input the recorded session did
+    not read at that point, e.g. the touch panel where the clock was read.
+    Derived from BaseException like SimulationComplete so that the device
+    code's bare `except:` clauses do not swallow it."""
+
+
+def _put(buffer, value):
+    while value > 0x7F:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _get(buffer, offset):
+    """Read a varint. :return tuple: (value, next offset)"""
+    value = 0
+    shift = 0
+    while True:
+        byte = buffer[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def _pack_point(point):
+    if point is None:
+        return 0
+    return ((point[0] & 0xFFF) << 12 | (point[1] & 0xFFF)) + 1
+
+
+def _unpack_point(payload):
+    if not payload:
+        return None
+    payload -= 1
+    return payload >> 12, payload & 0xFFF
+
+
+def _digest(areas):
+    return zlib.crc32(repr(sorted(areas)).encode())
+
+
+class _Trace:
+    """The session settings and recorded streams shared by the recorder and
+    the replayer."""
+
+    def __init__(self):
+        self.session = {}
+        self.inputs = bytearray()
+        self.frames = bytearray()
+
+    def frame_list(self):
+        """The recorded frames as (pixels, digest, cost microseconds) tuples."""
+        frames = []
+        offset = 0
+        while offset < len(self.frames):
+            pixels, offset = _get(self.frames, offset)
+            digest, offset = _get(self.frames, offset)
+            cost, offset = _get(self.frames, offset)
+            frames.append((pixels, digest, cost))
+        return frames
+
+
+class TraceRecorder(_Trace):
+    """Records a session run by the Simulator it is passed to. Clock readings
+    are rounded to the microsecond, as they are when replayed."""
+
+    def __init__(self):
+        super().__init__()
+        self._micros = 0
+        self._frame_micros = 0
+
+    def begin(self, sim):
+        """Note the settings that the replay needs; called by Simulator.run."""
+        self.session = {
+            "cats": sim.cats,
+            "seed": sim.seed,
+            "step": sim.clock.step,
+            "config": dict(sim.config),
+            "built_in_display": sim.hardware.built_in_display,
+        }
+
+    def clock(self, offset):
+        micros = max(int(round(offset * 1000000)), self._micros)
+        _put(self.inputs, (micros - self._micros) << 3 | CLOCK)
+        self._micros = micros
+        return micros / 1000000
+
+    def touch(self, name, value):
+        kind = _TOUCH_KINDS[name]
+        if kind in (POP, POINT):
+            _put(self.inputs, _pack_point(value) << 3 | kind)
+            return _unpack_point(_pack_point(value))
+        _put(self.inputs, int(value) << 3 | kind)
+        return value
+
+    def frame(self, pixels, areas, elapsed):
+        micros = int(round(elapsed * 1000000))
+        _put(self.frames, pixels)
+        _put(self.frames, _digest(areas))
+        _put(self.frames, max(micros - self._frame_micros, 0))
+        self._frame_micros = micros
+
+    def save(self, path):
+        """Write the trace file."""
+        config = json.dumps(self.session["config"], sort_keys=True).encode()
+        flags = BUILT_IN_DISPLAY if self.session["built_in_display"] else 0
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(
+                MAGIC, VERSION, flags, self.session["cats"],
+                self.session["seed"] & 0xFFFFFFFF, self.session["step"],
+                len(self.inputs), len(self.frames), len(config),
+            ))
+            file.write(zlib.compress(config + self.inputs + self.frames, 9))
+
+
+class TraceReplayer(_Trace):
+    """Supplies the readings of a recorded session to a Simulator built from
+    its `session` settings and compares the replayed frames with the recorded
+    ones. The replay completes when the recorded readings run out."""
+
+    def __init__(self):
+        super().__init__()
+        self._offset = 0
+        self._micros = 0
+        self._frame_micros = 0
+        self._recorded = []
+        # the replayed frames as (pixels, digest, cost microseconds) tuples
+        self.replayed = []
+        self.first_mismatch = None
+
+    @classmethod
+    def load(cls, path):
+        """Read a trace file written by TraceRecorder.save."""
+        trace = cls()
+        with open(path, "rb") as file:
+            data = file.read()
+        (magic, version, flags, cats, seed, step, input_length, frame_length,
+            config_length) = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} Neko trace")
+        data = zlib.decompress(data[HEADER.size:])
+        offset = 0
+        trace.session = {
+            "cats": cats,
+            "seed": seed,
+            "step": step,
+            "config": json.loads(data[offset:offset + config_length]),
+            "built_in_display": bool(flags & BUILT_IN_DISPLAY),
+        }
+        offset += config_length
+        trace.inputs = bytearray(data[offset:offset + input_length])
+        offset += input_length
+        trace.frames = bytearray(data[offset:offset + frame_length])
+        return trace
+
+    def begin(self, sim):
+        """Rewind to the start of the recording; called by Simulator.run."""
+        self._offset = 0
+        self._micros = 0
+        self._frame_micros = 0
+        self._recorded = self.frame_list()
+        self.replayed = []
+        self.first_mismatch = None
+
+    def _next(self, kind):
+        if self._offset >= len(self.inputs):
+            raise SimulationComplete()
+        value, offset = _get(self.inputs, self._offset)
+        if value & 7 != kind:
+            raise ReplayDiverged(
+                f"input byte {self._offset}: the recording read the {_KIND_NAMES[value & 7]}"
+                f" where the replay read the {_KIND_NAMES[kind]}"
+            )
+        self._offset = offset
+        return value >> 3
+
+    def clock(self, offset):
+        self._micros += self._next(CLOCK)
+        return self._micros / 1000000
+
+    def touch(self, name, value):
+        kind = _TOUCH_KINDS[name]
+        payload = self._next(kind)
+        if kind in (POP, POINT):
+            return _unpack_point(payload)
+        if kind == TOUCHED:
+            return bool(payload)
+        return payload
+
+    def frame(self, pixels, areas, elapsed):
+        micros = int(round(elapsed * 1000000))
+        frame = (pixels, _digest(areas), max(micros - self._frame_micros, 0))
+        self._frame_micros = micros
+        index = len(self.replayed)
+        self.replayed.append(frame)
+        if self.first_mismatch is None and (
+            index >= len(self._recorded) or self._recorded[index][:2] != frame[:2]
+        ):
+            self.first_mismatch = index
+
+    @property
+    def recorded(self):
+        """The recorded frames as (pixels, digest, cost microseconds) tuples."""
+        return self._recorded
@@ -0,0 +1,113 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# compile_animations.py  2023-01-11 1.0.0 Cedar Grove Studios
+
+"""Compile a readable animation definition into the animation bank read by
+`neko_helpers.animation_bank`. Runs on the host with CPython.
+
+    python tools/compile_animations.py neko_animations.txt [out.bank]
+
+Definition format: one state per line, `#` starts a comment.
+
+    <state ID> <name> <sprite>[*<hold>] ...
+
+Each sprite sheet index is shown for one animation frame, or for `hold`
+frames when written `sprite*hold`. Repeated neighboring indexes are merged
+into one held entry. Every state ID from 0 up must be defined once.
+
+Animation bank format, little-endian:
+
+    offset  size  field
+         0     4  magic b"CGAB"
+         4     1  format version (1)
+         5     1  state count (s)
+         6     2  entry count (e)
+         8     s  entry count of each state, by state ID
+       8+s     e  sprite index of each entry, state after state
+     8+s+e     e  hold of each entry in animation frames (1 to 255)
+"""
+
+import os
+import struct
+import sys
+
+MAGIC = b"CGAB"
+VERSION = 1
+HEADER = struct.Struct("<4sBBH")
+
+
+def parse(path):
+    """Read an animation definition.
+    :return list: For each state ID, (name, list of (sprite, hold) entries)
+    """
+    states = {}
+    with open(path, "r", encoding="utf-8") as file:
+        for number, line in enumerate(file, 1):
+            fields = line.split("#", 1)[0].split()
+            if not fields:
+                continue
+            where = f"{path}:{number}"
+            if len(fields) < 3:
+                raise ValueError(f"{where}: expected an ID, a name and at least one sprite")
+            state_id = int(fields[0])
+            if state_id in states:
+                raise ValueError(f"{where}: state {state_id} is defined twice")
+            entries = []
+            for field in fields[2:]:
+                sprite, _, hold = field.partition("*")
+                sprite = int(sprite)
+                hold = int(hold) if hold else 1
+                if not 0 <= sprite <= 255 or hold < 1:
+                    raise ValueError(f"{where}: bad frame {field!r}")
+                # merge a repeat of the previous sprite into its hold
+                if entries and entries[-1][0] == sprite:
+                    hold += entries.pop()[1]
+                while hold > 255:
+                    entries.append((sprite, 255))
+                    hold -= 255
+                entries.append((sprite, hold))
+            states[state_id] = (fields[1], entries)
+    if sorted(states) != list(range(len(states))):
+        raise ValueError(f"{path}: state IDs must run from 0 to {len(states) - 1}")
+    if len(states) > 255 or sum(len(entries) for _, entries in states.values()) > 0xFFFF:
+        raise ValueError(f"{path}: too many states or entries for a bank")
+    for state_id, (name, entries) in states.items():
+        if len(entries) > 255:
+            raise ValueError(f"{path}: state {state_id} ({name}) has more than 255 entries")
+    return [states[state_id] for state_id in range(len(states))]
+
+
+def compile_bank(states):
+    """Build the animation bank bytes for parsed states."""
+    entries = [entry for _, state_entries in states for entry in state_entries]
+    return (
+        HEADER.pack(MAGIC, VERSION, len(states), len(entries))
+        + bytes(len(state_entries) for _, state_entries in states)
+        + bytes(sprite for sprite, _ in entries)
+        + bytes(hold for _, hold in entries)
+    )
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or len(argv) > 2:
+        print(__doc__.splitlines()[3].strip())
+        return 2
+    source = argv[0]
+    destination = argv[1] if len(argv) > 1 else os.path.splitext(source)[0] + ".bank"
+    states = parse(source)
+    bank = compile_bank(states)
+    with open(destination, "wb") as file:
+        file.write(bank)
+    frames = sum(hold for _, entries in states for _, hold in entries)
+    entries = sum(len(entries) for _, entries in states)
+    print(
+        f"{source} -> {destination} ({len(bank)} bytes): {len(states)} states, "
+        f"{frames} frames in {entries} entries"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
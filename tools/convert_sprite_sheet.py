@@ -0,0 +1,134 @@
+# SPDX-FileCopyrightText: 2022 Cedar Grove Maker Studios
+# SPDX-License-Identifier: MIT
+
+# convert_sprite_sheet.py  2023-01-04 1.0.0 Cedar Grove Studios
+
+"""Convert an indexed BMP sprite sheet into the raw sprite sheet format read
+by `neko_helpers.raw_sprite_sheet`. Runs on the host with CPython.
+
+    python tools/convert_sprite_sheet.py neko_cat_spritesheet.bmp [out.raw]
+
+Raw sprite sheet format, little-endian:
+
+    offset  size  field
+         0     4  magic b"CGSS"
+         4     1  format version (1)
+         5     1  bits per value (1, 2, 4 or 8)
+         6     2  width in pixels
+         8     2  height in pixels
+        10     2  palette color count
+        12     2  row stride in 32-bit words
+        14     2  reserved (0)
+        16   4*n  palette colors, 0x00RRGGBB
+         .     .  pixel rows, top row first
+
+Pixel rows are stored exactly as displayio.Bitmap holds them in memory:
+each row is `stride` 32-bit little-endian words and the first pixel of a word
+is in its most significant bits. The bit depth is the smallest power of two
+that holds the palette color count, as displayio chooses for a Bitmap.
+"""
+
+import os
+import struct
+import sys
+
+MAGIC = b"CGSS"
+VERSION = 1
+HEADER = struct.Struct("<4sBBHHHHH")
+
+
+def read_bmp(path):
+    """Decode an uncompressed indexed BMP file.
+    :return tuple: (width, height, list of 0xRRGGBB colors, list of pixel rows
+     top row first)
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    if data[:2] != b"BM":
+        raise ValueError(f"{path} is not a BMP file")
+    data_start = struct.unpack_from("<I", data, 10)[0]
+    header_size = struct.unpack_from("<I", data, 14)[0]
+    width, height = struct.unpack_from("<ii", data, 18)
+    bits = struct.unpack_from("<H", data, 28)[0]
+    compression = struct.unpack_from("<I", data, 30)[0]
+    if bits not in (1, 2, 4, 8) or compression:
+        raise ValueError(f"{path} is not an uncompressed indexed BMP")
+    count = struct.unpack_from("<I", data, 46)[0] or 1 << bits
+
+    table = 14 + header_size
+    colors = []
+    for index in range(count):
+        blue, green, red = data[table + index * 4: table + index * 4 + 3]
+        colors.append((red << 16) | (green << 8) | blue)
+
+    # BMP rows are padded to 32 bits and stored bottom-up unless height < 0
+    row_bytes = ((width * bits + 31) // 32) * 4
+    per_byte = 8 // bits
+    mask = (1 << bits) - 1
+    rows = []
+    for row in range(abs(height)):
+        offset = data_start + row * row_bytes
+        rows.append([
+            (data[offset + x // per_byte] >> (8 - bits * (x % per_byte + 1))) & mask
+            for x in range(width)
+        ])
+    if height > 0:
+        rows.reverse()
+    return width, abs(height), colors, rows
+
+
+def bits_per_value(value_count):
+    """The bit depth displayio uses for a Bitmap holding `value_count` values."""
+    bits = 1
+    while (1 << bits) < value_count:
+        bits *= 2
+    return bits
+
+
+def pack_rows(width, rows, bits):
+    """Pack pixel rows into displayio's in-memory word layout.
+    :return tuple: (stride in 32-bit words, bytes)
+    """
+    per_word = 32 // bits
+    stride = (width * bits + 31) // 32
+    packed = bytearray()
+    for row in rows:
+        for word_index in range(stride):
+            word = 0
+            for slot in range(per_word):
+                x = word_index * per_word + slot
+                value = row[x] if x < width else 0
+                word |= value << (32 - bits * (slot + 1))
+            packed += struct.pack("<I", word)
+    return stride, bytes(packed)
+
+
+def convert(source, destination):
+    """Write the raw sprite sheet for a BMP file.
+    :return int: The size of the raw file in bytes.
+    """
+    width, height, colors, rows = read_bmp(source)
+    bits = bits_per_value(len(colors))
+    stride, pixels = pack_rows(width, rows, bits)
+    with open(destination, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, bits, width, height, len(colors), stride, 0))
+        for color in colors:
+            file.write(struct.pack("<I", color))
+        file.write(pixels)
+    return os.path.getsize(destination)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or len(argv) > 2:
+        print(__doc__.splitlines()[3].strip())
+        return 2
+    source = argv[0]
+    destination = argv[1] if len(argv) > 1 else os.path.splitext(source)[0] + ".raw"
+    size = convert(source, destination)
+    print(f"{source} -> {destination} ({size} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())